@@ -0,0 +1,64 @@
+"""Measure memory the geometry of one chart takes, using tracemalloc.
+
+For a chart of synthetic candles at the narrowest candle offset (the most
+candles on screen), reports:
+
+    * update peak: bytes allocated at peak while panning (GeoCandles.shift)
+    * snapshot: bytes held by the GeoSnapshot handed to the canvases
+    * geometry: bytes held by the derived Xandles and Yrids state
+
+Candles themselves are left out, they are the same either way.
+
+    python -m benchmarks.bench_geo_memory
+"""
+
+
+import tracemalloc
+
+from forex_types import Pair
+from oanda_candles import CandleMeister
+
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from tests.conftest import FakeCollector, make_candles
+
+WIDTHS = [800, 1600, 3200]
+
+
+def measure(width: int):
+    collector = FakeCollector(make_candles(20_000))
+    CandleMeister.get_collector = classmethod(lambda cls, pair, gran: collector)
+    geo = GeoCandles(pair=Pair.EUR_USD, width=width, height=900, offset=CandleOffset(1))
+    geo.shift(-width, 0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    geo.shift(-width // 2, 0)
+    update_peak = tracemalloc.get_traced_memory()[1] - before
+    before = tracemalloc.get_traced_memory()[0]
+    snapshot = GeoSnapshot.take(geo)
+    snapshot_size = tracemalloc.get_traced_memory()[0] - before
+    candles = len(snapshot.candles)
+    del snapshot
+    before = tracemalloc.get_traced_memory()[0]
+    geo.xandles.clear()
+    geo.yrids.clear()
+    geometry_size = before - tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return candles, update_peak, snapshot_size, geometry_size
+
+
+def main():
+    print(
+        f"{'candles':>8} {'update peak KB':>15} {'snapshot KB':>12} {'geometry KB':>12}"
+    )
+    for width in WIDTHS:
+        candles, peak, snapshot, geometry = measure(width)
+        print(
+            f"{candles:>8} {peak / 1024:>15.1f} {snapshot / 1024:>12.1f}"
+            f" {geometry / 1024:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
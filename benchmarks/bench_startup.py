@@ -0,0 +1,95 @@
+"""Time importing oanda_chart and starting up a first chart.
+
+Import times are measured in fresh interpreters (best of several runs):
+
+    * lazy    : import oanda_chart, with nothing used yet.
+    * headless: import the tkinter free geometry modules.
+    * eager   : import oanda_chart and touch every export (what importing
+                oanda_chart used to cost).
+
+Startup needs a display. It times creating a ChartManager and a chart
+without flags, how many flag images that decoded, and what decoding all of
+them (as was done on the first widget before) costs on top.
+
+    python -m benchmarks.bench_startup
+"""
+
+
+import subprocess
+import sys
+from time import perf_counter
+from tkinter import TclError, Tk
+
+RUNS = 7
+
+IMPORTS = [
+    ("lazy", "import oanda_chart"),
+    ("headless", "import oanda_chart.geo.geo_snapshot"),
+    (
+        "eager",
+        "import oanda_chart; [getattr(oanda_chart, _) for _ in oanda_chart.__all__]",
+    ),
+]
+
+TIMED = """
+import sys
+from time import perf_counter
+start = perf_counter()
+{statement}
+print(perf_counter() - start, len(sys.modules), "tkinter" in sys.modules)
+"""
+
+
+def time_import(statement: str):
+    """Best time of RUNS fresh interpreters, with module count and tkinter use."""
+    best = None
+    for _ in range(RUNS):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMED.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        seconds, modules, tkinter = float(output[0]), int(output[1]), output[2]
+        if best is None or seconds < best[0]:
+            best = (seconds, modules, tkinter == "True")
+    return best
+
+
+def bench_imports():
+    print(f"{'import':>10} {'ms':>8} {'modules':>8} {'tkinter':>8}")
+    for name, statement in IMPORTS:
+        seconds, modules, tkinter = time_import(statement)
+        print(f"{name:>10} {seconds * 1000:>8.1f} {modules:>8} {str(tkinter):>8}")
+
+
+def bench_startup():
+    try:
+        root = Tk()
+    except TclError:
+        print("\nstartup: skipped (no display)")
+        return
+    import tk_oddbox
+    from oanda_chart import ChartManager
+    from oanda_chart.env.initializer import Initializer
+
+    start = perf_counter()
+    manager = ChartManager("no-token")
+    chart = manager.create_chart(root, flags=False, width=800, height=500)
+    chart.pack()
+    root.update()
+    startup = perf_counter() - start
+    decoded = len(tk_oddbox.ImageLoader.images)
+    start = perf_counter()
+    for path in Initializer.IMAGE_DATA_PATH.glob("*.png"):
+        Initializer.get_image(path.stem)
+    all_images = perf_counter() - start
+    print(f"\nstartup (chart without flags): {startup * 1000:.1f} ms")
+    print(f"flag images decoded          : {decoded}")
+    print(f"decoding all flag images     : {all_images * 1000:.1f} ms more")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    bench_imports()
+    bench_startup()
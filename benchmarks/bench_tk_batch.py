@@ -0,0 +1,105 @@
+"""Compare per-call canvas rendering with one Tcl script per frame.
+
+Renders a scene of candles (a wick line and body rectangle each) through a
+CanvasDiffer twice: once making a tkinter call per item, once batching the
+frame into a single tk.eval. Two frames are timed for each: the first draw
+(every item created) and a scroll (every item moved).
+
+Uses a real Canvas when a display is available. Otherwise the canvas is a
+Tcl command that just counts items, which still measures the Python to Tcl
+marshalling that batching saves (but not the drawing itself).
+
+    python -m benchmarks.bench_tk_batch
+"""
+
+
+from time import perf_counter
+from tkinter import Canvas, TclError, Tcl, Tk
+from typing import List
+
+from oanda_chart.env.const import CandleColor, Tag
+from oanda_chart.render.differ import CanvasDiffer
+from oanda_chart.render.prim import Prim
+
+COUNTS = [1_000, 2_000, 5_000, 10_000]
+
+
+def make_canvas():
+    """Get a canvas and a description of what kind it is."""
+    try:
+        root = Tk()
+    except TclError:
+        interp = Tcl()
+        interp.eval(
+            'set n 0; proc .bench {cmd args} {if {$cmd eq "create"} {incr ::n}}'
+        )
+        canvas = Canvas.__new__(Canvas)
+        canvas.tk = interp
+        canvas._w = ".bench"
+        return canvas, "Tcl stand-in (no display)"
+    canvas = Canvas(root, width=1600, height=900)
+    canvas.pack()
+    return canvas, "tkinter Canvas"
+
+
+def candle_scene(count: int, shift: int) -> List[Prim]:
+    scene = []
+    for ndx in range(count):
+        x = ndx * 6 + shift
+        y = 300 + (ndx % 40) * 5
+        scene.append(
+            Prim.line(
+                (Tag.CANDLE, ndx, "wick"),
+                x + 2,
+                y - 20,
+                x + 2,
+                y + 20,
+                fill=CandleColor.WICK,
+            )
+        )
+        scene.append(
+            Prim.rectangle(
+                (Tag.CANDLE, ndx, "body"),
+                x,
+                y - 10,
+                x + 4,
+                y + 10,
+                fill=CandleColor.BULL,
+                width=0.0,
+            )
+        )
+    return scene
+
+
+def time_frames(canvas, count: int, batch: bool):
+    canvas.delete("all")
+    differ = CanvasDiffer(canvas, batch=batch)
+    first, scrolled = candle_scene(count, 0), candle_scene(count, 6)
+    start = perf_counter()
+    differ.apply(first)
+    canvas.update_idletasks()
+    created = perf_counter() - start
+    start = perf_counter()
+    differ.apply(scrolled)
+    canvas.update_idletasks()
+    moved = perf_counter() - start
+    return created, moved
+
+
+def main():
+    canvas, kind = make_canvas()
+    print(f"Canvas: {kind}")
+    print(
+        f"{'candles':>8} {'frame':>7} {'per call ms':>12} {'batch ms':>9} {'speedup':>8}"
+    )
+    for count in COUNTS:
+        direct = time_frames(canvas, count, batch=False)
+        batched = time_frames(canvas, count, batch=True)
+        for name, a, b in zip(["create", "scroll"], direct, batched):
+            print(
+                f"{count:>8} {name:>7} {a * 1000:>12.1f} {b * 1000:>9.1f} {a / b:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,9 @@ class App:
         self.chart = self.manager.create_chart(
             self.root, flags=True, width=700, height=400,
         )
-        self.manager.set_gran(LinkColor.ChartDefault, Gran.H1)
-        self.manager.set_quote_kind(LinkColor.ChartDefault, QuoteKind.BID)
+        with self.manager.batch():
+            self.manager.set_gran(LinkColor.ChartDefault, Gran.H1)
+            self.manager.set_quote_kind(LinkColor.ChartDefault, QuoteKind.BID)
         grid(self.chart, 0, 0)
         self.root.rowconfigure(0, weight=1)
         self.root.columnconfigure(0, weight=1)
@@ -1,8 +1,45 @@
+"""Tkinter candle charts of Oanda forex data.
+
+The names below are imported on first use, so that importing oanda_chart (or
+one of its tkinter free modules, like oanda_chart.geo for headless geometry)
+does not pull in tkinter, the widgets, and the Oanda client up front.
+"""
+
+
 __version__ = "0.1.3"
 
-from oanda_candles.gran import Gran
-from forex_types.pair import Pair
-from oanda_candles.quote_kind import QuoteKind
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from forex_types.pair import Pair
+    from oanda_candles.gran import Gran
+    from oanda_candles.quote_kind import QuoteKind
+
+    from .chart_manager import ChartManager
+    from .env.link_color import LinkColor
+
+# Name exported to the module it is imported from.
+_EXPORTS = {
+    "Gran": "oanda_candles.gran",
+    "Pair": "forex_types.pair",
+    "QuoteKind": "oanda_candles.quote_kind",
+    "LinkColor": "oanda_chart.env.link_color",
+    "ChartManager": "oanda_chart.chart_manager",
+}
+
+__all__ = ["__version__"] + list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    # Cache it, so __getattr__ is only called the first time.
+    globals()[name] = value
+    return value
+
 
-from .env.link_color import LinkColor
-from .chart_manager import ChartManager
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,58 @@
+"""Annotations a user puts on the chart of a pair.
+
+Annotations are anchored in price and time rather than in pixels: a price
+in frac pips, and a time in epoch seconds (like candle times). That way they
+stay put through panning, zooming, and switching grans, and the same
+annotations can be drawn on every chart of their pair.
+
+Synopsis:
+    level = Annotation.level(FracPips(110250))
+    trend = Annotation.trend(candle_a.time, fp_a, candle_b.time, fp_b)
+"""
+
+
+from typing import NamedTuple, Optional, Tuple
+from uuid import uuid4
+
+
+class AnnotationKind:
+    LEVEL = "level"  # horizontal line at a price, across all time
+    TREND = "trend"  # line from one (time, price) to another
+
+
+class Annotation(NamedTuple):
+
+    id: str
+    kind: str
+    time1: int
+    fp1: int
+    time2: int
+    fp2: int
+    # Line color, None for Color.ANNOTATION.
+    color: Optional[str] = None
+
+    @classmethod
+    def level(cls, fp: int, color: Optional[str] = None) -> "Annotation":
+        """Make horizontal level at frac pips price fp."""
+        return cls(uuid4().hex, AnnotationKind.LEVEL, 0, int(fp), 0, int(fp), color)
+
+    @classmethod
+    def trend(
+        cls, time1: int, fp1: int, time2: int, fp2: int, color: Optional[str] = None
+    ) -> "Annotation":
+        """Make trend line from (time1, fp1) to (time2, fp2), in either order."""
+        if time2 < time1:
+            time1, fp1, time2, fp2 = time2, fp2, time1, fp1
+        return cls(
+            uuid4().hex,
+            AnnotationKind.TREND,
+            int(time1),
+            int(fp1),
+            int(time2),
+            int(fp2),
+            color,
+        )
+
+    def price_range(self) -> Tuple[int, int]:
+        """Get lowest and highest price of annotation in frac pips."""
+        return min(self.fp1, self.fp2), max(self.fp1, self.fp2)
@@ -0,0 +1,118 @@
+"""Annotations shared by every chart of a pair, and saved between sessions.
+
+The AnnotationHub hands all charts of a pair the same PairAnnotations, so a
+level drawn on the H1 chart of EUR_USD shows up on its D chart as well. Each
+change is saved right away, to a JSON file per pair under PathConst.WORK_DIR,
+from where the annotations of a pair are loaded the first time it is asked
+for.
+
+PairAnnotations are read by GeoWorker threads taking snapshots while the
+tkinter thread changes them, so they guard themselves with a lock.
+"""
+
+
+import json
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+from forex_types import Pair
+
+from oanda_chart.annotations.annotation import Annotation
+from oanda_chart.annotations.annotation_index import AnnotationIndex
+from oanda_chart.env.const import PathConst
+
+
+class PairAnnotations:
+    def __init__(self, pair: Pair, path: Optional[Path] = None):
+        """Initialize annotations of pair, loading them from path if it exists.
+
+        Args:
+            pair: the pair annotated.
+            path: JSON file annotations are saved to, None to not save them.
+        """
+        self.pair: Pair = pair
+        self.path: Optional[Path] = path
+        self.index: AnnotationIndex = AnnotationIndex(self._load())
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def add(self, annotation: Annotation):
+        """Add (or replace) annotation, and save."""
+        with self._lock:
+            self.index.add(annotation)
+            self._save()
+
+    def remove(self, annotation_id: str) -> bool:
+        """Remove annotation with id and save, False if there was none."""
+        with self._lock:
+            removed = self.index.remove(annotation_id)
+            if removed:
+                self._save()
+        return removed
+
+    def get_all(self) -> List[Annotation]:
+        with self._lock:
+            return list(self.index)
+
+    def query(
+        self, time1: int, time2: int, fp_low: int, fp_high: int
+    ) -> List[Annotation]:
+        """Get annotations crossing the window (see AnnotationIndex.query)."""
+        with self._lock:
+            return self.index.query(time1, time2, fp_low, fp_high)
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _save(self):
+        if self.path is None:
+            return
+        data = [list(_) for _ in self.index]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write aside and swap in, so a crash never leaves half a file.
+        temp = self.path.with_suffix(".tmp")
+        with open(temp, "w") as file:
+            json.dump(data, file)
+        temp.replace(self.path)
+
+    def _load(self) -> List[Annotation]:
+        if self.path is None or not self.path.exists():
+            return []
+        with open(self.path) as file:
+            return [Annotation(*_) for _ in json.load(file)]
+
+
+class AnnotationHub:
+
+    DIRECTORY = PathConst.WORK_DIR.joinpath("annotations")
+
+    _directory: Optional[Path] = DIRECTORY
+    _annotations: Dict[Pair, PairAnnotations] = {}
+    _guard: Lock = Lock()
+
+    @classmethod
+    def get(cls, pair: Pair) -> PairAnnotations:
+        """Get the annotations of pair (loaded from disk the first time)."""
+        with cls._guard:
+            annotations = cls._annotations.get(pair)
+            if annotations is None:
+                path = None
+                if cls._directory is not None:
+                    path = cls._directory.joinpath(f"{pair}.json")
+                annotations = cls._annotations[pair] = PairAnnotations(pair, path)
+            return annotations
+
+    @classmethod
+    def set_directory(cls, directory: Optional[Path]):
+        """Set folder annotations are saved in (None to not save them).
+
+        Annotations already loaded are dropped, to be loaded again from the
+        new folder.
+        """
+        with cls._guard:
+            cls._directory = directory
+            cls._annotations = {}
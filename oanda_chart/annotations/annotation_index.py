@@ -0,0 +1,134 @@
+"""Find the annotations that fall in a window of price and time.
+
+A chart may have hundreds of annotations of which only a few cross its
+scroll region, so rather than project every one of them for every frame,
+an AnnotationIndex is asked for those in the region:
+
+    * levels : kept in an array sorted by price, so those between the bottom
+               and top price of the region are a bisect away.
+    * trends : kept in a grid of time buckets of several sizes. A line goes
+               in the smallest size bucket that holds its whole time span,
+               so each size only has a few buckets (the existing ones found
+               by bisect) overlapping the region's time span, and a long line
+               is not copied into many small buckets.
+"""
+
+
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Tuple
+
+from oanda_chart.annotations.annotation import Annotation, AnnotationKind
+
+
+class AnnotationIndex:
+
+    # Seconds of smallest time bucket, each level of buckets doubles it.
+    BUCKET = 60
+    LEVELS = 32
+
+    def __init__(self, annotations: Iterable[Annotation] = ()):
+        self.annotations: Dict[str, Annotation] = {}
+        # Level prices (sorted) with their ids in parallel.
+        self.level_fps: array = array("q")
+        self.level_ids: List[str] = []
+        # Per bucket level: sorted bucket numbers, and ids in each bucket.
+        self.bucket_keys: List[List[int]] = [[] for _ in range(self.LEVELS)]
+        self.buckets: List[Dict[int, List[str]]] = [{} for _ in range(self.LEVELS)]
+        for annotation in annotations:
+            self.add(annotation)
+
+    def __len__(self) -> int:
+        return len(self.annotations)
+
+    def __iter__(self):
+        return iter(self.annotations.values())
+
+    def add(self, annotation: Annotation):
+        """Add annotation (replacing one of the same id)."""
+        if annotation.id in self.annotations:
+            self.remove(annotation.id)
+        self.annotations[annotation.id] = annotation
+        if annotation.kind == AnnotationKind.LEVEL:
+            ndx = bisect_right(self.level_fps, annotation.fp1)
+            self.level_fps.insert(ndx, annotation.fp1)
+            self.level_ids.insert(ndx, annotation.id)
+        else:
+            level, key = self._bucket(annotation)
+            bucket = self.buckets[level].get(key)
+            if bucket is None:
+                bucket = self.buckets[level][key] = []
+                insort(self.bucket_keys[level], key)
+            bucket.append(annotation.id)
+
+    def remove(self, annotation_id: str) -> bool:
+        """Remove annotation with id, returns False if there is none."""
+        annotation = self.annotations.pop(annotation_id, None)
+        if annotation is None:
+            return False
+        if annotation.kind == AnnotationKind.LEVEL:
+            ndx = bisect_left(self.level_fps, annotation.fp1)
+            while self.level_ids[ndx] != annotation_id:
+                ndx += 1
+            del self.level_fps[ndx]
+            del self.level_ids[ndx]
+        else:
+            level, key = self._bucket(annotation)
+            bucket = self.buckets[level][key]
+            bucket.remove(annotation_id)
+            if not bucket:
+                del self.buckets[level][key]
+                keys = self.bucket_keys[level]
+                del keys[bisect_left(keys, key)]
+        return True
+
+    def query(
+        self, time1: int, time2: int, fp_low: int, fp_high: int
+    ) -> List[Annotation]:
+        """Get annotations crossing the window of time and price.
+
+        Levels are included when their price is in the window (whatever the
+        time), trend lines when their bounding box overlaps it.
+        """
+        found = []
+        annotations = self.annotations
+        fps = self.level_fps
+        start = bisect_left(fps, fp_low)
+        end = bisect_right(fps, fp_high)
+        found.extend(annotations[_] for _ in self.level_ids[start:end])
+        for level in range(self.LEVELS):
+            keys = self.bucket_keys[level]
+            if not keys:
+                continue
+            size = self.BUCKET << level
+            # A line in the bucket before the window may reach into it.
+            start = bisect_left(keys, time1 // size - 1)
+            end = bisect_right(keys, time2 // size)
+            for key in keys[start:end]:
+                for annotation_id in self.buckets[level][key]:
+                    annotation = annotations[annotation_id]
+                    low, high = annotation.price_range()
+                    if (
+                        annotation.time1 <= time2
+                        and annotation.time2 >= time1
+                        and low <= fp_high
+                        and high >= fp_low
+                    ):
+                        found.append(annotation)
+        return found
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _bucket(self, annotation: Annotation) -> Tuple[int, int]:
+        """Get level and number of the bucket a trend line goes in.
+
+        That is the smallest bucket size for which the line spans at most two
+        neighboring buckets, stored in the first of them.
+        """
+        span = annotation.time2 - annotation.time1
+        level = 0
+        while level < self.LEVELS - 1 and (self.BUCKET << level) < span:
+            level += 1
+        return level, annotation.time1 // (self.BUCKET << level)
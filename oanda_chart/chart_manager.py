@@ -1,34 +1,86 @@
 import tkinter
-from typing import Optional
+from contextlib import contextmanager
+from multiprocessing.process import BaseProcess
+from typing import Callable, Iterator, List, Optional, Sequence
+from weakref import WeakKeyDictionary, WeakSet
 
-from forex_types import Pair
+from forex_types import Currency, Pair
 from oanda_candles import CandleMeister, Gran
 from oanda_candles.quote_kind import QuoteKind
 
+from oanda_chart.annotations.annotation import Annotation
+from oanda_chart.annotations.annotation_hub import AnnotationHub
+from oanda_chart.env.const import Event, RenderMode
 from oanda_chart.env.link_color import LinkColor
+from oanda_chart.indicators.indicator import IndicatorSpec
 
 from oanda_chart.widgets.oanda_chart import OandaChart
 from oanda_chart.selectors.gran_menu import GranMenu
 from oanda_chart.selectors.pair_menu import PairMenu
 from oanda_chart.selectors.pair_flags import Geometry, PairFlags
 from oanda_chart.selectors.quote_kind_menu import QuoteKindMenu
+from oanda_chart.util.candle_retention import CandleRetention
+from oanda_chart.util.candle_source import CandleSource, Provider
+from oanda_chart.util.prefetcher import Prefetcher
 
 
 class ChartManager:
-    def __init__(self, token: str, real: bool = False):
+    def __init__(
+        self,
+        token: Optional[str],
+        real: bool = False,
+        warm_up: bool = False,
+        retention: Optional[CandleRetention] = None,
+        resample: Optional[bool] = None,
+        provider: Optional[Provider] = None,
+    ):
         """Initialize manager.
 
         Args:
-            token: oanda V20 access token used to get candle data
+            token: oanda V20 access token used to get candle data (None when
+                   a provider gives the candles).
+            real: True for a real account, False for a practice account.
+            warm_up: when a pair is selected, download candles for the other
+                     grans of the gran menu in the background.
+            retention: policy for trimming candle history charts no longer
+                       show (defaults to CandleRetention with default budgets).
+            resample: build the grans of CandleSource.RESAMPLE (like H4 and D)
+                      from finer candles (like H1) instead of downloading them.
+            provider: makes the collector of each pair and gran, instead of
+                      Oanda (see CandleSource.set_provider).
+
+        CandleSource is shared by every manager in the process, so resample
+        and provider are only applied to it when given (not None).
         """
-        CandleMeister.init_meister(token, real=real)
-        self.charts = set()
-        self.pair_selectors = set()
-        self.gran_selectors = set()
-        self.quote_kind_selectors = set()
+        if provider is None:
+            CandleMeister.init_meister(token, real=real)
+        else:
+            CandleSource.set_provider(provider)
+        if resample is not None:
+            CandleSource.set_resample(CandleSource.RESAMPLE if resample else {})
+        self.warm_up = warm_up
+        self.retention = CandleRetention() if retention is None else retention
+        self.prefetcher = Prefetcher()
+        # Charts and selectors are held weakly, and dropped when destroyed,
+        # so closing them does not leave anything behind here.
+        self.charts = WeakSet()
+        self.pair_selectors = WeakSet()
+        self.gran_selectors = WeakSet()
+        self.quote_kind_selectors = WeakSet()
         self.pair_data = {}
         self.gran_data = {}
         self.quote_kind_data = {}
+        # While in a batch, charts with changed links wait here (dict as
+        # ordered set) to be updated once when the batch ends.
+        self.batch_depth: int = 0
+        self.pending_charts: "WeakKeyDictionary[OandaChart, None]" = (
+            WeakKeyDictionary()
+        )
+        # Called with kind ("pair", "gran" or "quote_kind"), color and value
+        # whenever a link color changes value.
+        self.link_listeners: List[Callable[[str, LinkColor, object], None]] = []
+        # Runs chart windows in other processes, made by the first open_window.
+        self.dashboard = None
 
     def get_pair(self, color: LinkColor) -> Optional[Pair]:
         return self.pair_data.get(color)
@@ -44,30 +96,141 @@ class ChartManager:
             self.pair_data[color] = pair
             for chart in self.charts:
                 if chart.pair_color == color:
-                    chart.set_pair(pair)
+                    self.update_chart(chart)
             for pair_selector in self.pair_selectors:
                 if pair_selector.color == color:
                     pair_selector.set_pair(pair)
+            self.warm_up_grans(color)
+            for pair_selector in self.pair_selectors:
+                anchor = pair_selector.get_anchor()
+                if pair_selector.color == color and anchor is not None:
+                    self.prefetch_anchor(color, anchor)
+            self.notify_links("pair", color, pair)
 
     def set_gran(self, color: LinkColor, gran: Optional[Gran]):
         if gran != self.gran_data.get(color):
             self.gran_data[color] = gran
             for chart in self.charts:
                 if chart.gran_color == color:
-                    chart.set_gran(gran)
+                    self.update_chart(chart)
             for gran_selector in self.gran_selectors:
                 if gran_selector.color == color:
                     gran_selector.set_gran(gran)
+            self.warm_up_grans(color)
+            for pair_selector in self.pair_selectors:
+                anchor = pair_selector.get_anchor()
+                if pair_selector.color == color and anchor is not None:
+                    self.prefetch_anchor(color, anchor)
+            self.notify_links("gran", color, gran)
 
     def set_quote_kind(self, color: LinkColor, quote_kind: Optional[QuoteKind]):
         if quote_kind != self.quote_kind_data.get(color):
             self.quote_kind_data[color] = quote_kind
             for chart in self.charts:
                 if chart.quote_kind_color == color:
-                    chart.set_quote_kind(quote_kind)
+                    self.update_chart(chart)
             for quote_kind_selector in self.quote_kind_selectors:
                 if quote_kind_selector.color == color:
                     quote_kind_selector.set_quote_kind(quote_kind)
+            self.notify_links("quote_kind", color, quote_kind)
+
+    def notify_links(self, kind: str, color: LinkColor, value: object):
+        """Tell the link listeners link color of kind changed to value."""
+        for listener in list(self.link_listeners):
+            listener(kind, color, value)
+
+    @contextmanager
+    def batch(self) -> Iterator["ChartManager"]:
+        """Group link changes so each affected chart reloads just once.
+
+        Selectors are updated right away, but charts are only given their new
+        pair, gran and quote kind when the (outermost) batch ends. So a chart
+        whose pair and gran both change builds its candles and draws once.
+
+        Synopsis:
+            with manager.batch():
+                manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+                manager.set_gran(LinkColor.RED, Gran.H4)
+        """
+        self.batch_depth += 1
+        try:
+            yield self
+        finally:
+            self.batch_depth -= 1
+            if not self.batch_depth:
+                charts = list(self.pending_charts)
+                self.pending_charts.clear()
+                for chart in charts:
+                    self.update_chart(chart)
+
+    def update_chart(self, chart: OandaChart):
+        """Give chart the values of its link colors (deferred while batching)."""
+        if self.batch_depth:
+            self.pending_charts[chart] = None
+        else:
+            chart.set_links(
+                self.get_pair(chart.pair_color),
+                self.get_gran(chart.gran_color),
+                self.get_quote_kind(chart.quote_kind_color),
+            )
+
+    @staticmethod
+    def register(widgets: WeakSet, widget: tkinter.Widget):
+        """Add widget to widgets, taking it out again when it is destroyed."""
+        widgets.add(widget)
+        widget.bind(Event.DESTROY, lambda event: widgets.discard(widget), add="+")
+
+    def discard_chart(self, chart: OandaChart):
+        """Stop updating chart (done for charts when they are destroyed)."""
+        self.charts.discard(chart)
+        self.pending_charts.pop(chart, None)
+
+    def add_annotation(self, pair: Pair, annotation: Annotation):
+        """Add annotation to pair (saved right away), and show it on its charts."""
+        AnnotationHub.get(pair).add(annotation)
+        self.annotations_changed(pair)
+
+    def remove_annotation(self, pair: Pair, annotation_id: str) -> bool:
+        """Remove annotation with id from pair, False if it had none."""
+        removed = AnnotationHub.get(pair).remove(annotation_id)
+        if removed:
+            self.annotations_changed(pair)
+        return removed
+
+    def annotations_changed(self, pair: Pair):
+        """Redraw the charts of pair, after its annotations were changed."""
+        for chart in self.charts:
+            if chart.pair == pair and chart.loaded:
+                chart.submit(lambda geo: None)
+
+    def warm_up_grans(self, color: LinkColor):
+        """Prefetch other grans for the pair of color (if warm_up is on).
+
+        Grans next to the currently selected gran in the gran menu are
+        downloaded first, since those are the ones most likely picked next.
+        """
+        pair = self.get_pair(color)
+        if not self.warm_up or pair is None:
+            return
+        grans = GranMenu.get_warm_up_order(self.get_gran(color))
+        keys = [(pair, gran) for gran in grans]
+        self.prefetcher.prefetch(keys, channel=("grans", color))
+
+    def prefetch_anchor(self, color: LinkColor, anchor: Currency):
+        """Prefetch the seven pairs made with anchor at the gran of color.
+
+        This is for the PairFlags selector, where the user picks an anchor
+        currency and then flips through the other seven currencies.
+        """
+        gran = self.get_gran(color)
+        if gran is None:
+            return
+        keys = []
+        for currency in Currency.get_list():
+            if currency != anchor:
+                base, quote = sorted([anchor, currency])
+                keys.append((Pair.from_currency(base, quote), gran))
+        self.prefetcher.prefetch(keys, channel=("anchor", color))
 
     def create_chart(
         self,
@@ -78,6 +241,8 @@ class ChartManager:
         flags: bool = False,
         width: int = 0,
         height: int = 0,
+        indicators: Sequence[IndicatorSpec] = (),
+        render_mode: str = RenderMode.CANDLES,
     ) -> OandaChart:
         """Create Oanda Chart.
 
@@ -95,24 +260,82 @@ class ChartManager:
             flags: option to include flag icon pair selector in chart.
             width: width of candle area in pixels (chart widget will be larger).
             height: height of candle area in pixels (chart widget will be larger).
+            indicators: indicators to draw, e.g. IndicatorSpec(IndicatorKind.SMA, 20)
+            render_mode: how candles are drawn, a RenderMode (like RenderMode.BARS).
         Returns:
             OandaChart Frame
         """
         chart = OandaChart(
             parent, self, pair_color, gran_color, quote_kind_color, flags, width, height
         )
-        chart.set_pair(self.get_pair(pair_color))
-        chart.set_gran(self.get_gran(gran_color))
-        chart.set_quote_kind(self.get_quote_kind(quote_kind_color))
+        chart.set_indicators(indicators)
+        chart.set_render_mode(render_mode)
+        self.update_chart(chart)
         self.charts.add(chart)
+        chart.bind(Event.DESTROY, lambda event: self.discard_chart(chart), add="+")
         return chart
 
+    def open_window(
+        self,
+        parent: tkinter.Widget,
+        pair_color: LinkColor = LinkColor.ChartDefault,
+        gran_color: LinkColor = LinkColor.ChartDefault,
+        quote_kind_color: LinkColor = LinkColor.ChartDefault,
+        flags: bool = False,
+        width: int = 700,
+        height: int = 400,
+        render_mode: str = RenderMode.CANDLES,
+        title: str = "Oanda Chart",
+    ) -> BaseProcess:
+        """Open a chart in a window of its own, run by a process of its own.
+
+        Candles are still downloaded once, by this process, and shared with
+        the windows through shared memory. Link colors are kept in step with
+        the windows both ways (see the dashboard module).
+
+        Args:
+            parent: tkinter widget of this process, used to schedule taking
+                    in link changes made in the windows.
+            pair_color: LinkColor for pair that is selected
+            gran_color: LinkColor for granularity that is selected
+            quote_kind_color: LinkColor for quote kind that is selected
+            flags: option to include flag icon pair selector in chart.
+            width: width of candle area in pixels.
+            height: height of candle area in pixels.
+            render_mode: how candles are drawn, a RenderMode.
+            title: title of the window.
+        Returns:
+            the process running the window.
+        """
+        if self.dashboard is None:
+            # Imported here, as window processes run a ChartManager of their own.
+            from oanda_chart.dashboard.dashboard import Dashboard
+
+            self.dashboard = Dashboard(self)
+        options = dict(
+            title=title,
+            pair_color=str(pair_color),
+            gran_color=str(gran_color),
+            quote_kind_color=str(quote_kind_color),
+            flags=flags,
+            width=width,
+            height=height,
+            render_mode=render_mode,
+        )
+        return self.dashboard.open_window(parent, options)
+
+    def close_windows(self):
+        """Close the windows opened by open_window, and their shared memory."""
+        if self.dashboard is not None:
+            self.dashboard.close()
+            self.dashboard = None
+
     def create_pair_menu(
         self, parent: tkinter.Widget, color: LinkColor = LinkColor.ChartDefault
     ) -> PairMenu:
         pair_menu = PairMenu(parent, self, color)
         pair_menu.set_pair(self.get_pair(color))
-        self.pair_selectors.add(pair_menu)
+        self.register(self.pair_selectors, pair_menu)
         return pair_menu
 
     def create_pair_flags(
@@ -123,7 +346,7 @@ class ChartManager:
     ) -> PairFlags:
         pair_flags = PairFlags(parent, self, color, geometry)
         pair_flags.set_pair(self.get_pair(color))
-        self.pair_selectors.add(pair_flags)
+        self.register(self.pair_selectors, pair_flags)
         return pair_flags
 
     def create_gran_menu(
@@ -131,7 +354,7 @@ class ChartManager:
     ) -> GranMenu:
         gran_menu = GranMenu(parent, self, color)
         gran_menu.set_gran(self.get_gran(color))
-        self.gran_selectors.add(gran_menu)
+        self.register(self.gran_selectors, gran_menu)
         return gran_menu
 
     def create_quote_kind_menu(
@@ -139,5 +362,5 @@ class ChartManager:
     ) -> QuoteKindMenu:
         quote_kind_menu = QuoteKindMenu(parent, self, color)
         quote_kind_menu.set_quote_kind(self.get_quote_kind(color))
-        self.quote_kind_selectors.add(quote_kind_menu)
+        self.register(self.quote_kind_selectors, quote_kind_menu)
         return quote_kind_menu
@@ -0,0 +1,268 @@
+"""Chart windows in processes of their own, all fed by one dashboard process.
+
+All the charts of a tkinter process are drawn by its one tkinter thread.
+With ChartManager.open_window, a chart instead gets a window in a process of
+its own (see the window module), while candles are still only downloaded
+once, by the process that opened it (the dashboard):
+
+    * candles : the dashboard publishes each pair and gran a window asks for
+                into shared memory (see the shared_candles module), and keeps
+                it up to date every REFRESH seconds. Windows read it from
+                there with collectors of their CandleSource provider. Once no
+                window wants a pair and gran any more (or the windows that
+                did are gone), its shared memory is removed.
+    * links   : the pair, gran and quote kind of each link color are kept in
+                step over a pipe to each window, both ways. Link changes that
+                came from a window are not sent back to it.
+
+Messages over the pipes are tuples of strings and ints:
+    ("want", pair, gran, count)   window needs count candles published.
+    ("unwant", pair, gran)        window no longer needs those candles.
+    ("failed", pair, gran, text)  dashboard could not get those candles.
+    ("link", kind, color, value)  link color of kind now has value (or None).
+    ("close",)                    window should close.
+
+Synopsis:
+    manager = ChartManager(token)
+    manager.open_window(root, LinkColor.RED, LinkColor.RED)
+    manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+"""
+
+
+import multiprocessing
+import tkinter
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.dashboard.shared_candles import SharedCandleWriter, block_name
+from oanda_chart.dashboard.window import (
+    apply_link,
+    key_names,
+    link_message,
+    name_key,
+    run_window,
+)
+from oanda_chart.env.link_color import LinkColor
+from oanda_chart.util.candle_source import CandleSource
+from oanda_chart.util.collector_lock import CollectorLock
+
+Key = Tuple[Pair, Gran]
+
+
+class Dashboard:
+
+    # Seconds between publishing the newest candles.
+    REFRESH = 1.0
+    POLL_MS = 50
+    # Seconds to wait for a window process to end once told to close.
+    JOIN_TIMEOUT = 2.0
+    # Windows are started fresh rather than forked from a tkinter process.
+    CONTEXT = multiprocessing.get_context("spawn")
+
+    def __init__(self, manager, capacity: int = SharedCandleWriter.CAPACITY):
+        """Initialize dashboard of manager (nothing is started until needed).
+
+        Args:
+            manager: the ChartManager whose link colors windows share.
+            capacity: most candles published of each pair and gran.
+        """
+        self.manager = manager
+        self.capacity: int = capacity
+        self.session: str = uuid4().hex[:12]
+        self.writers: Dict[Key, SharedCandleWriter] = {}
+        # Most candles each window asked for, of each pair and gran.
+        self.wants: Dict[Connection, Dict[Key, int]] = {}
+        self.connections: List[Connection] = []
+        self.processes: List[BaseProcess] = []
+        # Link messages from windows (and where from), for the tkinter thread.
+        self.inbox: Queue = Queue()
+        # Window whose link change is being applied (not to echo it back).
+        self.applying: Optional[Connection] = None
+        self.polling: bool = False
+        self.closed: Event = Event()
+        self._lock = Lock()
+        self._send_lock = Lock()
+        self._refresher: Optional[Thread] = None
+        manager.link_listeners.append(self.forward)
+
+    def open_window(self, parent: tkinter.Widget, options: Dict) -> BaseProcess:
+        """Start a window process (options as for ChartWindow, but strings)."""
+        conn, child_conn = self.CONTEXT.Pipe()
+        process = self.CONTEXT.Process(
+            target=run_window,
+            args=(child_conn, self.session, self.capacity, self.links(), options),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self.processes = [_ for _ in self.processes if _.is_alive()]
+        self.processes.append(process)
+        self.attach(conn)
+        if not self.polling:
+            self.polling = True
+            parent.after(self.POLL_MS, self._poll, parent)
+        return process
+
+    def attach(self, conn: Connection):
+        """Serve the window at the other end of conn."""
+        with self._lock:
+            self.connections.append(conn)
+        Thread(target=self._listen, args=(conn,), daemon=True).start()
+
+    def links(self) -> List[Tuple]:
+        """Get link_message of each link color value of the manager."""
+        manager = self.manager
+        return (
+            [link_message("pair", *_) for _ in manager.pair_data.items()]
+            + [link_message("gran", *_) for _ in manager.gran_data.items()]
+            + [link_message("quote_kind", *_) for _ in manager.quote_kind_data.items()]
+        )
+
+    def forward(self, kind: str, color: LinkColor, value: object):
+        """Tell the windows a link color changed (a link listener)."""
+        message = link_message(kind, color, value)
+        with self._lock:
+            connections = [_ for _ in self.connections if _ is not self.applying]
+        for conn in connections:
+            self._send(conn, message)
+
+    def poll_links(self) -> int:
+        """Apply the link changes windows sent, returns how many there were."""
+        applied = 0
+        while True:
+            try:
+                conn, message = self.inbox.get_nowait()
+            except Empty:
+                return applied
+            self.applying = conn
+            try:
+                apply_link(self.manager, message)
+            finally:
+                self.applying = None
+            applied += 1
+
+    def want(self, pair: Pair, gran: Gran, count: int, conn: Connection):
+        """Publish (at least) count candles of pair and gran for a window."""
+        key = (pair, gran)
+        with self._lock:
+            wants = self.wants.setdefault(conn, {})
+            wants[key] = max(wants.get(key, 0), min(count, self.capacity))
+            if self._refresher is None:
+                self._refresher = Thread(target=self._refresh, daemon=True)
+                self._refresher.start()
+        try:
+            self.publish(pair, gran)
+        except OSError as e:
+            self._send(conn, ("failed", *key_names(pair, gran), str(e)))
+
+    def unwant(self, pair: Pair, gran: Gran, conn: Connection):
+        """Stop publishing pair and gran for a window."""
+        with self._lock:
+            self.wants.get(conn, {}).pop((pair, gran), None)
+            self._close_unwanted()
+
+    def wanted(self, key: Key) -> int:
+        """Most candles of key any window wants (0 if none do)."""
+        with self._lock:
+            return self._wanted(key)
+
+    def publish(self, pair: Pair, gran: Gran) -> int:
+        """Publish the wanted candles of pair and gran, returns number written."""
+        key = (pair, gran)
+        count = self.wanted(key)
+        if not count:
+            return 0
+        with CollectorLock.get(pair, gran):
+            collector = CandleSource.get_collector(pair, gran)
+            candles = collector.grab(count)
+            end_of_history = collector.end_of_history and len(collector) <= len(candles)
+        with self._lock:
+            # Unless it stopped being wanted while we grabbed.
+            if self.closed.is_set() or not self._wanted(key):
+                return 0
+            writer = self.writers.get(key)
+            if writer is None:
+                name = block_name(self.session, pair, gran)
+                writer = self.writers[key] = SharedCandleWriter(name, self.capacity)
+            return writer.publish(candles, end_of_history)
+
+    def close(self):
+        """Close the windows and remove the shared memory."""
+        self.closed.set()
+        if self.forward in self.manager.link_listeners:
+            self.manager.link_listeners.remove(self.forward)
+        with self._lock:
+            connections = list(self.connections)
+        for conn in connections:
+            self._send(conn, ("close",))
+        for process in self.processes:
+            process.join(self.JOIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        with self._lock:
+            for writer in self.writers.values():
+                writer.close()
+            self.writers.clear()
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _send(self, conn: Connection, message: Tuple):
+        try:
+            with self._send_lock:
+                conn.send(message)
+        except OSError:
+            # The window is gone, its listener will drop it.
+            pass
+
+    def _listen(self, conn: Connection):
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "want":
+                self.want(*name_key(message[1], message[2]), message[3], conn)
+            elif message[0] == "unwant":
+                self.unwant(*name_key(message[1], message[2]), conn)
+            elif message[0] == "link":
+                self.inbox.put((conn, message))
+        with self._lock:
+            self.connections.remove(conn)
+            self.wants.pop(conn, None)
+            self._close_unwanted()
+        conn.close()
+
+    def _refresh(self):
+        while not self.closed.wait(self.REFRESH):
+            with self._lock:
+                keys = {key for wants in self.wants.values() for key in wants}
+            for pair, gran in keys:
+                try:
+                    self.publish(pair, gran)
+                except OSError:
+                    # Windows keep what they have, we try again next time.
+                    pass
+
+    def _wanted(self, key: Key) -> int:
+        return max((wants.get(key, 0) for wants in self.wants.values()), default=0)
+
+    def _close_unwanted(self):
+        """Remove shared memory of what no window wants (holding self._lock)."""
+        for key in [_ for _ in self.writers if not self._wanted(_)]:
+            self.writers.pop(key).close()
+
+    def _poll(self, parent: tkinter.Widget):
+        if self.closed.is_set():
+            self.polling = False
+            return
+        self.poll_links()
+        parent.after(self.POLL_MS, self._poll, parent)
@@ -0,0 +1,279 @@
+"""Candle series published into shared memory for other processes to read.
+
+A dashboard process fetches each pair and gran once, and writes its newest
+candles into a block of multiprocessing.shared_memory with a fixed layout,
+so chart processes read them without pickling or a round trip:
+
+    header   : seq, count, capacity, flags (HEADER int64 values)
+    times    : capacity int64 candle times, oldest first
+    prices   : capacity * 12 int64, bid/ask/mid open/high/low/close of each
+               candle in units of 0.00001 (so Price values come back exact)
+    complete : capacity bytes, 1 for complete candles
+
+A writer closing flags its block as closed before removing it, so readers
+know to attach to whatever block of that name is published next.
+
+Writes are guarded like a seqlock: seq is odd while a write is under way,
+and readers copy again until they see the same even seq before and after.
+Candles that were already written (same time, same slot) are not written
+again, and readers only turn new slots back into Candle objects.
+
+Synopsis:
+    writer = SharedCandleWriter(block_name(session, pair, gran), capacity)
+    writer.publish(candles, end_of_history=False)
+
+    reader = SharedCandleReader(block_name(session, pair, gran))
+    candles, end_of_history = reader.read()
+"""
+
+
+from array import array
+from decimal import Decimal
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from time import monotonic, sleep
+from typing import List, Optional, Sequence, Tuple
+
+from forex_types import Pair, Price
+from oanda_candles import Candle, Gran, Ohlc
+from time_int import TimeInt
+
+# Values in the header, and their positions.
+HEADER = 4
+SEQ = 0
+COUNT = 1
+CAPACITY = 2
+FLAGS = 3
+# Flag set when there are no older candles to be had.
+END_OF_HISTORY = 1
+# Flag set when the writer removed the block (nothing more will be written).
+CLOSED = 2
+# Prices per candle.
+PRICES = 12
+
+
+def block_name(session: str, pair: Pair, gran: Gran) -> str:
+    """Get name of shared memory block of pair and gran in a session."""
+    return f"oc_{session}_{pair}_{gran}"
+
+
+def block_size(capacity: int) -> int:
+    """Get bytes of a shared memory block holding capacity candles."""
+    return 8 * (HEADER + capacity + capacity * PRICES) + capacity
+
+
+def candle_prices(candle: Candle) -> List[int]:
+    """Get bid, ask and mid open/high/low/close of candle in 0.00001 units.
+
+    The daemon protocol records candles with these too (see its module).
+    """
+    return [
+        int(price.value.scaleb(5))
+        for ohlc in (candle.bid, candle.ask, candle.mid)
+        for price in (ohlc.o, ohlc.h, ohlc.l, ohlc.c)
+    ]
+
+
+def prices_candle(time: int, prices: Sequence[int], complete: int) -> Candle:
+    """Get candle back from its time, candle_prices values and complete."""
+    values = [Price(Decimal(_).scaleb(-5)) for _ in prices]
+    return Candle(
+        ask=Ohlc(*values[4:8]),
+        bid=Ohlc(*values[0:4]),
+        mid=Ohlc(*values[8:12]),
+        time=TimeInt(time),
+        complete=bool(complete),
+    )
+
+
+class SharedCandleWriter:
+
+    CAPACITY = 5000
+
+    def __init__(self, name: str, capacity: int = CAPACITY):
+        """Create shared memory block name, to hold up to capacity candles."""
+        self.name: str = name
+        self.capacity: int = capacity
+        self.memory: SharedMemory = SharedMemory(
+            name, create=True, size=block_size(capacity)
+        )
+        self.header, self.times, self.prices, self.complete = _views(
+            self.memory, capacity
+        )
+        self.header[CAPACITY] = capacity
+        # Newest candle written, to tell if it changed since.
+        self.last: Optional[Candle] = None
+
+    def publish(self, candles: Sequence[Candle], end_of_history: bool) -> int:
+        """Write newest candles (up to capacity), skipping those written already.
+
+        Args:
+            candles: candles oldest first, like CandleCollector.grab returns.
+            end_of_history: whether there are no older candles to be had.
+        Returns:
+            number of candles written.
+        """
+        candles = candles[-self.capacity :]
+        count = len(candles)
+        start = _unchanged(self.times, self.header[COUNT], candles)
+        flags = END_OF_HISTORY if end_of_history else 0
+        if (
+            start == count - 1 == self.header[COUNT] - 1
+            and candles[-1] == self.last
+            and flags == self.header[FLAGS]
+        ):
+            return 0
+        times = array("q", [int(_.time) for _ in candles[start:]])
+        prices = array("q")
+        complete = bytes(_.complete for _ in candles[start:])
+        for candle in candles[start:]:
+            prices.extend(candle_prices(candle))
+        header = self.header
+        header[SEQ] += 1
+        self.times[start:count] = times
+        self.prices[start * PRICES : count * PRICES] = prices
+        self.complete[start:count] = complete
+        header[COUNT] = count
+        header[FLAGS] = flags
+        header[SEQ] += 1
+        self.last = candles[-1] if candles else None
+        return count - start
+
+    def close(self):
+        """Let go of the block, and remove it (readers keep what they have)."""
+        header = self.header
+        header[SEQ] += 1
+        header[FLAGS] |= CLOSED
+        header[SEQ] += 1
+        _release(self)
+        self.memory.close()
+        self.memory.unlink()
+
+
+class SharedCandleReader:
+
+    # Seconds to wait before copying again when a write got in the way, and
+    # most seconds to keep trying (the writer may be held up mid write).
+    PAUSE = 0.001
+    TIMEOUT = 5.0
+
+    def __init__(self, name: str):
+        """Attach to shared memory block name.
+
+        Raises:
+            FileNotFoundError: if no block of that name was published yet.
+        """
+        self.name: str = name
+        self.memory: SharedMemory = _attach(name)
+        views = _views(self.memory, 0)
+        capacity = views[0][CAPACITY]
+        for view in views:
+            view.release()
+        if not capacity:
+            # Just created, the writer has yet to set it up.
+            self.memory.close()
+            raise FileNotFoundError(name)
+        self.header, self.times, self.prices, self.complete = _views(
+            self.memory, capacity
+        )
+        self.seq: int = -1
+        self.candles: List[Candle] = []
+        self.end_of_history: bool = False
+
+    def read(self) -> Tuple[List[Candle], bool]:
+        """Get the candles published and whether history ended there.
+
+        Only candles written since the last read are made into new Candle
+        objects, and the same list is returned while nothing changed.
+        """
+        deadline = monotonic() + self.TIMEOUT
+        while monotonic() < deadline:
+            seq = self.header[SEQ]
+            if seq == self.seq:
+                return self.candles, self.end_of_history
+            if seq % 2:
+                sleep(self.PAUSE)
+                continue
+            count = self.header[COUNT]
+            flags = self.header[FLAGS]
+            start = _unchanged(self.times, count, self.candles)
+            times = self.times[start:count].tolist()
+            prices = self.prices[start * PRICES : count * PRICES].tolist()
+            complete = bytes(self.complete[start:count])
+            if self.header[SEQ] != seq:
+                sleep(self.PAUSE)
+                continue
+            candles = self.candles[:start]
+            candles.extend(
+                prices_candle(
+                    times[ndx],
+                    prices[ndx * PRICES : (ndx + 1) * PRICES],
+                    complete[ndx],
+                )
+                for ndx in range(len(times))
+            )
+            self.candles = candles
+            self.end_of_history = bool(flags & END_OF_HISTORY)
+            self.seq = seq
+            return self.candles, self.end_of_history
+        raise TimeoutError(f"Shared candles {self.name} kept changing while read")
+
+    def closed(self) -> bool:
+        """True once the writer removed the block."""
+        return bool(self.header[FLAGS] & CLOSED)
+
+    def close(self):
+        _release(self)
+        self.memory.close()
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _views(memory: SharedMemory, capacity: int) -> Tuple[memoryview, ...]:
+    """Get header, times, prices and complete views of a block."""
+    buf = memory.buf
+    end_header = 8 * HEADER
+    end_times = end_header + 8 * capacity
+    end_prices = end_times + 8 * capacity * PRICES
+    return (
+        buf[:end_header].cast("q"),
+        buf[end_header:end_times].cast("q"),
+        buf[end_times:end_prices].cast("q"),
+        buf[end_prices : end_prices + capacity],
+    )
+
+
+def _release(holder):
+    """Release the views of a writer or reader, so its block can be closed."""
+    for view in (holder.header, holder.times, holder.prices, holder.complete):
+        view.release()
+    holder.header = holder.times = holder.prices = holder.complete = None
+
+
+def _unchanged(times: memoryview, count: int, candles: Sequence[Candle]) -> int:
+    """Get number of leading candles the block already has in their slots.
+
+    The last one in the block is never counted, it may have been incomplete.
+    """
+    keep = min(count, len(candles)) - 1
+    if keep <= 0 or times[0] != candles[0].time or times[keep] != candles[keep].time:
+        return 0
+    return keep
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to an existing block without this process claiming it.
+
+    Otherwise the resource tracker would remove the block when a reading
+    process ends, out from under the publisher and other readers.
+    """
+    try:
+        return SharedMemory(name, track=False)
+    except TypeError:
+        # Before Python 3.13 there was no track option.
+        memory = SharedMemory(name)
+        resource_tracker.unregister(memory._name, "shared_memory")
+        return memory
@@ -0,0 +1,311 @@
+"""The chart process side of dashboard windows (see the dashboard module).
+
+A window process runs a ChartManager of its own, whose CandleSource provider
+is a SharedProvider: its collectors ask the dashboard over the pipe for the
+candles a chart needs, then read them from shared memory as they come in.
+Once the chart moves to another pair or gran, the window tells the dashboard
+it no longer wants the others (so they stop being fetched and published).
+"""
+
+
+import tkinter
+from queue import Empty, Queue
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from forex_types import Pair
+from oanda_candles import Candle, Gran
+from oanda_candles.quote_kind import QuoteKind
+
+from oanda_chart.chart_manager import ChartManager
+from oanda_chart.dashboard.shared_candles import SharedCandleReader, block_name
+from oanda_chart.env.link_color import LinkColor
+from oanda_chart.util.collector_lock import CollectorLock
+
+Key = Tuple[Pair, Gran]
+
+
+def link_message(kind: str, color: LinkColor, value: object) -> Tuple:
+    """Get message telling link color of kind has value (a Pair, Gran...)."""
+    return ("link", kind, str(color), None if value is None else str(value))
+
+
+def apply_link(manager: ChartManager, message: Tuple):
+    """Set the link color value a link_message tells of in manager."""
+    _, kind, color, name = message
+    color = LinkColor(color)
+    if kind == "pair":
+        manager.set_pair(color, None if name is None else Pair(name))
+    elif kind == "gran":
+        manager.set_gran(color, None if name is None else getattr(Gran, name))
+    else:
+        manager.set_quote_kind(color, None if name is None else QuoteKind(name))
+
+
+def key_names(pair: Pair, gran: Gran) -> Tuple[str, str]:
+    return str(pair), str(gran)
+
+
+def name_key(pair: str, gran: str) -> Key:
+    return Pair(pair), getattr(Gran, gran)
+
+
+class SharedCollector:
+
+    # Seconds between looks at the shared memory while waiting for candles,
+    # and most seconds to wait.
+    POLL = 0.01
+    TIMEOUT = 60.0
+
+    def __init__(self, pair: Pair, gran: Gran, provider: "SharedProvider"):
+        """Initialize collector of candles the dashboard publishes.
+
+        Args:
+            pair: the forex pair of the candles.
+            gran: the gran of the candles.
+            provider: the provider asking the dashboard for candles.
+        """
+        self.pair: Pair = pair
+        self.gran: Gran = gran
+        self.provider: SharedProvider = provider
+        self.reader: Optional[SharedCandleReader] = None
+        # Most candles asked of the dashboard so far.
+        self.asked: int = 0
+        self._cache: List[Candle] = []
+        self._read: Optional[List[Candle]] = None
+        self.end_of_history: bool = False
+
+    def __len__(self):
+        return len(self._cache)
+
+    def grab(self, count: int) -> List[Candle]:
+        """Get most recent count candles (no more than the dashboard shares)."""
+        with CollectorLock.get(self.pair, self.gran):
+            self.wait_for(count)
+            return self._cache[-count:]
+
+    def update_recent(self) -> bool:
+        """Take in the candles published since we last looked.
+
+        Returns:
+            True if there were any.
+        """
+        if self.reader is not None and self.reader.closed():
+            # Nothing wanted it for a while, it may be published anew.
+            self.reader.close()
+            self.reader = None
+        if self.reader is None:
+            self.reader = self.provider.attach(self.pair, self.gran)
+            if self.reader is None:
+                return False
+        candles, end_of_history = self.reader.read()
+        # Unless a CandleRetention trimmed our copy, nothing changed.
+        if candles is self._read and len(candles) == len(self._cache):
+            return False
+        self._read = candles
+        # A copy, so trimming by a CandleRetention leaves the reader alone.
+        self._cache = list(candles)
+        self.end_of_history = end_of_history
+        return True
+
+    def update_history(self, count: int) -> bool:
+        """Have the dashboard publish count more older candles.
+
+        Returns:
+            True if there may be older candles still.
+        """
+        self.wait_for(len(self._cache) + count)
+        return not self.end_of_history and len(self._cache) < self.provider.capacity
+
+    def wait_for(self, count: int):
+        """Ask for count candles if we have not already, and wait for them.
+
+        Raises:
+            OSError: if the dashboard could not get the candles.
+            TimeoutError: if they did not come in TIMEOUT seconds.
+        """
+        count = min(count, self.provider.capacity)
+        with self.provider.asking:
+            if count > self.asked:
+                self.provider.send(("want", *key_names(self.pair, self.gran), count))
+                self.asked = count
+        deadline = monotonic() + self.TIMEOUT
+        self.update_recent()
+        while len(self._cache) < count and not self.end_of_history:
+            failure = self.provider.failures.pop((self.pair, self.gran), None)
+            if failure is not None:
+                self.asked = 0
+                raise OSError(failure)
+            if monotonic() > deadline:
+                raise TimeoutError(f"No {self.pair} {self.gran} candles published")
+            sleep(self.POLL)
+            self.update_recent()
+
+    def unwant(self):
+        """Tell the dashboard we no longer need candles (if we asked for any).
+
+        Should be called while holding the asking lock of the provider.
+        """
+        if self.asked:
+            self.provider.send(("unwant", *key_names(self.pair, self.gran)))
+            self.asked = 0
+
+
+class SharedProvider:
+    def __init__(self, session: str, capacity: int, conn):
+        """Initialize provider of collectors of candles published in session.
+
+        Args:
+            session: session of the dashboard shared memory block names.
+            capacity: most candles the dashboard publishes of a pair and gran.
+            conn: our end of the pipe to the dashboard.
+        """
+        self.session: str = session
+        self.capacity: int = capacity
+        self.conn = conn
+        # Why the dashboard could not publish a pair and gran.
+        self.failures: Dict[Key, str] = {}
+        self.collectors: Dict[Key, SharedCollector] = {}
+        # Held while asking for candles or telling we no longer want them.
+        self.asking: Lock = Lock()
+        self._lock = Lock()
+
+    def __call__(self, pair: Pair, gran: Gran) -> SharedCollector:
+        collector = SharedCollector(pair, gran, self)
+        self.collectors[(pair, gran)] = collector
+        return collector
+
+    def keep_only(self, key: Optional[Key]):
+        """Tell the dashboard we only still want candles of key (or none)."""
+        with self.asking:
+            for other, collector in list(self.collectors.items()):
+                if other != key:
+                    collector.unwant()
+
+    def attach(self, pair: Pair, gran: Gran) -> Optional[SharedCandleReader]:
+        """Get reader of candles of pair and gran, None if none published yet."""
+        try:
+            return SharedCandleReader(block_name(self.session, pair, gran))
+        except FileNotFoundError:
+            return None
+
+    def send(self, message: Tuple):
+        """Send message to the dashboard (from any thread)."""
+        with self._lock:
+            self.conn.send(message)
+
+
+class ChartWindow:
+
+    POLL_MS = 50
+
+    def __init__(
+        self,
+        conn,
+        session: str,
+        capacity: int,
+        links: Sequence[Tuple],
+        title: str,
+        pair_color: str,
+        gran_color: str,
+        quote_kind_color: str,
+        flags: bool,
+        width: int,
+        height: int,
+        render_mode: str,
+    ):
+        """Initialize window with a chart of candles shared by the dashboard.
+
+        Args:
+            conn: our end of the pipe to the dashboard.
+            session: session of the dashboard shared memory block names.
+            capacity: most candles the dashboard publishes of a pair and gran.
+            links: link_message of each link color value of the dashboard.
+            title: title of the window.
+            (the rest are as for ChartManager.create_chart)
+        """
+        self.provider = SharedProvider(session, capacity, conn)
+        # Link messages from the dashboard, for the tkinter thread.
+        self.inbox: Queue = Queue()
+        # True while applying a link from the dashboard (not to echo it back).
+        self.applying: bool = False
+        self.root = tkinter.Tk()
+        self.root.title(title)
+        self.manager = ChartManager(None, provider=self.provider)
+        with self.manager.batch():
+            for message in links:
+                apply_link(self.manager, message)
+        self.chart = self.manager.create_chart(
+            self.root,
+            LinkColor(pair_color),
+            LinkColor(gran_color),
+            LinkColor(quote_kind_color),
+            flags,
+            width,
+            height,
+            render_mode=render_mode,
+        )
+        self.chart.grid(row=0, column=0, sticky="nsew")
+        self.root.rowconfigure(0, weight=1)
+        self.root.columnconfigure(0, weight=1)
+        self.manager.link_listeners.append(self.send_link)
+        self.manager.link_listeners.append(self.follow_chart)
+        Thread(target=self._listen, daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def mainloop(self):
+        self.root.mainloop()
+
+    def send_link(self, kind: str, color: LinkColor, value: object):
+        """Tell the dashboard of a link color changed in this window."""
+        if not self.applying:
+            try:
+                self.provider.send(link_message(kind, color, value))
+            except OSError:
+                pass
+
+    def follow_chart(self, kind: str, color: LinkColor, value: object):
+        """Stop wanting candles the chart no longer shows (a link listener)."""
+        if kind in ("pair", "gran"):
+            pair = self.manager.get_pair(self.chart.pair_color)
+            gran = self.manager.get_gran(self.chart.gran_color)
+            try:
+                self.provider.keep_only((pair, gran))
+            except OSError:
+                pass
+
+    def _listen(self):
+        while True:
+            try:
+                message = self.provider.conn.recv()
+            except (EOFError, OSError):
+                message = ("close",)
+            if message[0] == "failed":
+                key = name_key(message[1], message[2])
+                self.provider.failures[key] = message[3]
+            else:
+                self.inbox.put(message)
+            if message[0] == "close":
+                return
+
+    def _poll(self):
+        while True:
+            try:
+                message = self.inbox.get_nowait()
+            except Empty:
+                break
+            if message[0] == "close":
+                self.root.destroy()
+                return
+            self.applying = True
+            try:
+                apply_link(self.manager, message)
+            finally:
+                self.applying = False
+        self.root.after(self.POLL_MS, self._poll)
+
+
+def run_window(conn, session: str, capacity: int, links: Sequence[Tuple], options):
+    """Run a ChartWindow until it is closed (a window process starts here)."""
+    ChartWindow(conn, session, capacity, links, **options).mainloop()
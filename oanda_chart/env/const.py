@@ -16,6 +16,9 @@ class CandleColor:
     BEAR: str = "#FF0000"
     DOJI: str = "#aaaaaa"
     WICK: str = "#999999"
+    # Close line and high/low area of the line and area render modes.
+    LINE: str = "#00BFFF"
+    AREA: str = "#1E3A5F"
 
 
 class Color:
@@ -37,6 +40,19 @@ class Color:
     DOLLAR_TEXT = "#A0A0A0"
     PIP_TEXT = "#707070"
     FPIP_TEXT = "#505050"
+    CROSSHAIR: str = "#666666"
+    HOVER_TEXT: str = "#DDDDDD"
+    HOVER_BG: str = "#1A1A1A"
+    ANNOTATION: str = "#C8A040"
+    SELECTION: str = "#5A7FBF"
+
+
+class IndicatorColor:
+    SMA: str = "#FFD700"
+    EMA: str = "#00BFFF"
+    BB: str = "#BA55D3"
+    RSI: str = "#FFA500"
+    ATR: str = "#20B2AA"
 
 
 class Const:
@@ -51,6 +67,8 @@ class Const:
     TIME_CANVAS_HEIGHT = 42
     PRICE_CANVAS_WIDTH = 80  # 110
     MIN_TIME_GRID_WIDTH = 120
+    INDICATOR_PANE = 0.2  # fraction of chart height RSI, ATR etc are drawn in.
+    DENSE_OFFSET = 3  # candle offsets below this are drawn as a close line.
 
 
 class PathConst:
@@ -64,6 +82,13 @@ class PathConst:
     )
 
 
+class RenderMode:
+    CANDLES = "candles"
+    BARS = "bars"  # open, high, low, close bars
+    LINE = "line"  # line through the closes
+    AREA = "area"  # area from the highs down to the lows
+
+
 class Tag:
     BADGE = "badge"
     CANDLE = "candle"
@@ -73,6 +98,10 @@ class Tag:
     PRICE_LABEL = "pricelabel"
     SCALE_ITEM = "scaleitem"
     TIME_TEXT = "timetext"
+    INDICATOR = "indicator"
+    ANNOTATION = "annotation"
+    SELECTION = "selection"
+    HOVER = "hover"
 
 
 class UnfinishedCandleColor:
@@ -93,5 +122,12 @@ class Event:
     RIGHT_CLICK = "<Button-3>"
     LEFT_DRAG: str = "<B1-Motion>"
     LEFT_RELEASE: str = "<ButtonRelease-1>"
+    SHIFT_LEFT_CLICK: str = "<Shift-ButtonPress-1>"
+    SHIFT_LEFT_DRAG: str = "<Shift-B1-Motion>"
+    SHIFT_LEFT_RELEASE: str = "<Shift-ButtonRelease-1>"
+    ESCAPE: str = "<Escape>"
     MOUSE_WHEEL: str = "<MouseWheel>"
+    MOTION: str = "<Motion>"
+    LEAVE: str = "<Leave>"
     RESIZE: str = "<Configure>"
+    DESTROY: str = "<Destroy>"
@@ -1,20 +1,56 @@
 import tkinter
-import tk_oddbox
 from pathlib import Path
+from typing import FrozenSet, Optional
+
+import tk_oddbox
 
 
 class Initializer:
 
     initialized = False
+    IMAGE_DATA_PATH = Path(__file__).parent.parent.joinpath("image_data")
+    # Widget images are loaded for (the first toplevel initialized).
+    root: Optional[tkinter.Misc] = None
+    # Names of the images in IMAGE_DATA_PATH, found the first time asked for.
+    _image_names: Optional[FrozenSet[str]] = None
 
     @classmethod
     def initialize(cls, tk: tkinter.Tk):
         if not cls.initialized:
             cls.initialized = True
-            cls._initialize_images(tk)
+            cls.root = tk
+
+    @classmethod
+    def get_image(cls, name: str) -> tkinter.PhotoImage:
+        """Get image from image_data folder, loading it the first time.
+
+        Images are only decoded when a widget first asks for them (so charts
+        without flags never load any). Once loaded they are also available
+        as tk_oddbox.Images[name], but not before.
 
-    @staticmethod
-    def _initialize_images(tk: tkinter.Tk):
-        loader = tk_oddbox.ImageLoader(tk)
-        image_data_path = Path(__file__).parent.parent.joinpath("image_data")
-        loader.load_dir(image_data_path, "*.png")
+        Args:
+            name: file name without the .png suffix, e.g. "EUR_on".
+        Returns:
+            the image.
+        Raises:
+            KeyError: if there is no such image.
+        """
+        image = tk_oddbox.ImageLoader.images.get(name)
+        if image is None:
+            if name not in cls.image_names():
+                raise KeyError(name)
+            path = cls.IMAGE_DATA_PATH.joinpath(f"{name}.png")
+            image = tkinter.PhotoImage(master=cls.root, file=path)
+            # Store it the way tk-oddbox 0.0.3's ImageLoader.load_dir does.
+            tk_oddbox.ImageLoader.images[name] = image
+            if tk_oddbox.ImageLoader._name_ok(name):
+                setattr(tk_oddbox.Images, name, image)
+        return image
+
+    @classmethod
+    def image_names(cls) -> FrozenSet[str]:
+        """Get names of all images get_image can load (loaded or not)."""
+        if cls._image_names is None:
+            paths = cls.IMAGE_DATA_PATH.glob("*.png")
+            cls._image_names = frozenset(_.stem for _ in paths)
+        return cls._image_names
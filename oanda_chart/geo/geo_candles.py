@@ -17,23 +17,42 @@ Semi-Independent GeoCandles attribute, set by user, but subject to change:
                   Subject to automatic change while price_view is True.
 
 Dependent GeoCandles attributes, subject to change per other attributes:
-   * collector  : CandleCollector to request and cache candle from Oanda.
+   * collector  : CandleCollector to request and cache candle from Oanda
+                  (or to build them from finer candles, see CandleSource).
    * xandles    : A Xandles object loaded with candle and x-coordinate data.
    * yrids      : A Yrids object loaded with price scale and y-coordinate data.
+   * indicators : Indicators (shared with other charts) of the candle series.
+   * annotations: Annotations (shared with other charts) of the pair.
+   * stats_index: CandleStatsIndex of the candles for selection stats (only
+                  built once a selection is started, see update_stats_index).
+
+Drawing options, set by user and only passed on to snapshots:
+   * render_mode  : How candles are drawn (a RenderMode).
+   * dense_offset : Candle offsets below this are drawn in RenderMode.LINE.
 """
 
 
+from contextlib import contextmanager
 from math import ceil
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from uuid import uuid4
 
-from oanda_candles import CandleCollector, CandleMeister, Gran, QuoteKind
+from oanda_candles import Candle, Gran, QuoteKind
 from forex_types import FracPips, Pair
 
+from oanda_chart.annotations.annotation_hub import AnnotationHub, PairAnnotations
+from oanda_chart.env.const import Const, RenderMode
 from oanda_chart.geo.price_scale import PriceScale
 from oanda_chart.geo.xandles import Xandles
 from oanda_chart.geo.yrids import Yrids
 from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.indicators.indicator import Indicator, IndicatorSpec
+from oanda_chart.indicators.indicator_hub import IndicatorHub
+from oanda_chart.util.candle_retention import CandleRetention
+from oanda_chart.util.candle_stats import CandleStatsIndex
+from oanda_chart.util.candle_source import CandleSource, Collector
+from oanda_chart.util.collector_lock import CollectorLock
+from oanda_chart.util.live_tail import LiveTailCollector
 
 
 class GeoCandleDefaults:
@@ -47,6 +66,14 @@ class GeoCandleDefaults:
 
 
 class GeoCandles:
+
+    RENDER_MODES = (
+        RenderMode.CANDLES,
+        RenderMode.BARS,
+        RenderMode.LINE,
+        RenderMode.AREA,
+    )
+
     def __init__(
         self,
         width: int = GeoCandleDefaults.WIDTH,
@@ -57,14 +84,30 @@ class GeoCandles:
         offset: CandleOffset = GeoCandleDefaults.OFFSET,
         ndx: int = GeoCandleDefaults.NDX,
         price_view: bool = True,
+        retention: Optional[CandleRetention] = None,
     ):
-        self.collector: CandleCollector = CandleMeister.get_collector(pair, gran)
+        with CollectorLock.get(pair, gran):
+            self.collector: Collector = CandleSource.get_collector(pair, gran)
         self.pair: Pair = pair
         self.gran: Gran = gran
         self.quote_kind: QuoteKind = quote_kind
         self.price_view: bool = price_view
+        # Told how many candles we need, so collector history can be trimmed
+        # (not for live tails, which never hold more than their capacity).
+        if isinstance(self.collector, LiveTailCollector):
+            retention = None
+        self.retention: Optional[CandleRetention] = retention
         self.run_id: Optional[str] = None
-        candles = self.collector.grab(Xandles.calculate_pull_size(width, offset, ndx))
+        # Changes waiting for commit, and how many transactions deep we are.
+        self.pending: Dict[str, Any] = {}
+        self.depth: int = 0
+        self.indicator_specs: Tuple[IndicatorSpec, ...] = ()
+        self.indicators: List[Indicator] = []
+        self.annotations: PairAnnotations = AnnotationHub.get(pair)
+        self.stats_index: Optional[CandleStatsIndex] = None
+        self.render_mode: str = RenderMode.CANDLES
+        self.dense_offset: int = Const.DENSE_OFFSET
+        candles = self.grab(Xandles.calculate_pull_size(width, offset, ndx))
         self.xandles: Xandles = Xandles(
             offset=offset, width=width, candles=candles, ndx=ndx
         )
@@ -84,13 +127,14 @@ class GeoCandles:
         lines.append(f"    candles       : list of {len(self.xandles.candles)}\n")
         lines.append(f"    fpp           : {self.yrids.fpp}\n")
         lines.append(f"    gran          : {self.gran}\n")
-        lines.append(f"    grid_list     : list of {len(self.yrids.grid_list)}\n")
+        lines.append(f"    grid_fps      : array of {len(self.yrids.grid_fps)}\n")
         lines.append(f"    height        : {self.yrids.height}\n")
         lines.append(f"    mid           : {self.yrids.mid}\n")
         lines.append(f"    ndx           : {self.xandles.ndx}\n")
         lines.append(f"    offset        : {self.xandles.offset}\n")
         lines.append(f"    pair          : {self.pair}\n")
         lines.append(f"    price_view    : {self.price_view}\n")
+        lines.append(f"    render_mode   : {self.get_shown_render_mode()}\n")
         lines.append(f"    showing_recent: {self.xandles.showing_recent}\n")
         lines.append(f"    scale         : {self.yrids.scale}\n")
         lines.append(f"    scroll_bot    : {self.yrids.scroll_bot}\n")
@@ -102,24 +146,155 @@ class GeoCandles:
         lines.append(f"    view_candles  : iteration of {len(view_candles)}\n")
         return "".join(lines)
 
+    def candle_count(self) -> int:
+        """Number of candles this GeoCandles is holding on to."""
+        return len(self.xandles.candles) if self.xandles.candles else 0
+
+    def reactivate(self, width: int, height: int, quote_kind: QuoteKind):
+        """Bring back a GeoCandles that sat unused (e.g. in a GeoPool).
+
+        The pan and zoom state is kept as it was, only the view size and quote
+        kind are brought up to date, and the newest candles are fetched.
+        """
+        self.update(
+            width=width,
+            height=height,
+            quote_kind=quote_kind,
+            price_view=self.price_view,
+        )
+
+    def grab(self, count: int) -> List[Candle]:
+        """Grab most recent count candles from collector (thread safe)."""
+        retention = self.retention
+        with CollectorLock.get(self.pair, self.gran):
+            if retention is not None:
+                retention.restore((self.pair, self.gran), self.collector, count)
+            candles = self.collector.grab(count)
+            if retention is not None:
+                retention.hold(self, self.collector, count)
+        if retention is not None:
+            retention.enforce_total()
+        return candles
+
+    def keep_up(self):
+        """Have the collector fetch the newest candles, resolving nothing.
+
+        Cheap bookkeeping for a chart nobody can see: its view is left as it
+        was, and the refresh done once it is shown again picks the new
+        candles up from the collector.
+        """
+        with CollectorLock.get(self.pair, self.gran):
+            self.collector.grab(1)
+
+    def set_render_mode(self, mode: str, dense_offset: Optional[int] = None):
+        """Set how candles are drawn.
+
+        Args:
+            mode: a RenderMode.
+            dense_offset: candle offsets below this are drawn in RenderMode.LINE
+                          whatever the mode (0 to never switch), None to leave
+                          it as it was.
+        Raises:
+            ValueError: for an unknown mode.
+        """
+        if mode not in self.RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.render_mode = mode
+        if dense_offset is not None:
+            self.dense_offset = dense_offset
+
+    def get_shown_render_mode(self) -> str:
+        """Get the mode candles are drawn in at the current offset."""
+        if self.xandles.offset < self.dense_offset:
+            return RenderMode.LINE
+        return self.render_mode
+
+    def set_indicators(self, specs: Iterable[IndicatorSpec]):
+        """Set indicators to draw, bringing their values up to date."""
+        self.indicator_specs = tuple(specs)
+        self.update_indicators(refetch=True)
+
+    def update_indicators(self, refetch: bool = False):
+        """Update indicator values with the candles we last grabbed.
+
+        Args:
+            refetch: get indicators from the IndicatorHub again (needed when
+                     the specs or the quote kind changed).
+        """
+        if refetch:
+            self.indicators = [
+                IndicatorHub.get(self.pair, self.gran, self.quote_kind, spec)
+                for spec in self.indicator_specs
+            ]
+        candles = self.xandles.candles
+        if self.indicators and candles:
+            # Indicators are shared by charts of the same pair and gran.
+            with CollectorLock.get(self.pair, self.gran):
+                for indicator in self.indicators:
+                    indicator.update(candles)
+
+    def update_stats_index(self, start: bool = False):
+        """Bring the index of candle selection stats up to date with candles.
+
+        The index only grows at its end, so new candles are just added to it,
+        but it is built anew when older history or another quote kind shows
+        up, or when it holds twice the candles we do (as it comes to, with
+        the oldest candles dropping off a live tail). Snapshots taken before
+        then keep the old one.
+
+        Args:
+            start: build the index if there is none yet (until a selection
+                   is made, charts do without).
+        """
+        candles = self.xandles.candles
+        index = self.stats_index
+        if not candles or (index is None and not start):
+            return
+        if (
+            index is None
+            or index.quote_kind != self.quote_kind
+            or (len(index) and candles[0].time < index.times[0])
+            or len(index) > 2 * len(candles)
+        ):
+            index = self.stats_index = CandleStatsIndex(self.quote_kind)
+        index.extend(candles)
+
+    @contextmanager
+    def transaction(self) -> Iterator["GeoCandles"]:
+        """Accumulate update and shift calls, resolving them all at the end.
+
+        Outside of a transaction every update or shift call is resolved right
+        away. Inside one, the changes pile up and are resolved by a single
+        candle grab and a single Xandles and Yrids resolve when the outermost
+        transaction ends. If the block raises, its changes are dropped.
+
+        Synopsis:
+            with geo.transaction():
+                geo.update(price_view=False)
+                geo.shift(0, 120)
+        """
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if not self.depth:
+                self.pending.clear()
+            raise
+        self.depth -= 1
+        if not self.depth:
+            self.commit()
+
     def refresh(self):
-        if self.price_view:
-            self.update(
-                offset=self.xandles.offset,
-                width=self.xandles.width,
-                ndx=self.xandles.ndx,
-                price_view=True,
-            )
-        else:
-            self.update(
-                offset=self.xandles.offset,
-                width=self.xandles.width,
-                ndx=self.xandles.ndx,
-                height=self.yrids.height,
-                mid=self.yrids.mid,
-                fpp=self.yrids.fpp,
-                scale=self.yrids.scale,
-            )
+        """Get the latest candles and resolve everything again."""
+        self.pending["refresh"] = True
+        if self.pending.get("price_view", self.price_view):
+            self.pending["price_view"] = True
+        self._auto_commit()
+
+    def go_home(self):
+        """Go back to the most recent candles at default offset in price view."""
+        self.update(offset=CandleOffset.DEFAULT, ndx=0, price_view=True)
 
     def update(
         self,
@@ -141,33 +316,92 @@ class GeoCandles:
             ndx: how many candles to the past we have panned.
             height: height of view in in pixels.
             mid: frac pips price of mid point of view.
+            quote_kind: kind of price (bid, ask, mid) candles are drawn for.
             fpp: ratio of frac pips per pixel
             scale: price scale object indicating frac pips between price grid lines.
             price_view: boolean to switch price_view mode on or off
-        Raises:
-            AttributeError: if price_view set to True while mid and/or fpp are set.
-            AttributeError: if mid or fpp are set when offset, width, candles, or ndx are set.
         """
+        changes = dict(
+            offset=offset,
+            width=width,
+            ndx=ndx,
+            height=height,
+            mid=mid,
+            quote_kind=quote_kind,
+            fpp=fpp,
+            scale=scale,
+            price_view=price_view,
+        )
+        for name, value in changes.items():
+            if value is not None:
+                self.pending[name] = value
+        if ndx is not None:
+            self.pending.pop("clamp", None)
+        self._auto_commit()
+
+    def shift(self, x: int, y: int):
+        """Shift GeoCandles data the given amount.
+
+        Args:
+            x: horizontal pixels where to the right is positive.
+            y: vertical pixels where down is positive.
+        """
+        offset = self.pending.get("offset", self.xandles.offset)
+        ndx = self.pending.get("ndx", self.xandles.ndx)
+        candle_slot_shift = ceil(x / offset)
+        self.pending["ndx"] = max(ndx - candle_slot_shift, 0)
+        # How far back we can go depends on candles grabbed at commit.
+        self.pending["clamp"] = True
+        if self.pending.get("price_view", self.price_view):
+            self.pending["price_view"] = True
+        else:
+            mid = self.pending.get("mid", self.yrids.mid)
+            fpp = self.pending.get("fpp", self.yrids.fpp)
+            self.pending["mid"] = FracPips(mid - round(y * fpp))
+        self._auto_commit()
+
+    def commit(self):
+        """Resolve all pending changes with one grab and one geometry resolve."""
+        pending = self.pending
+        self.pending = {}
+        requote = pending.get("quote_kind", self.quote_kind) != self.quote_kind
+        if requote:
+            self.quote_kind = pending["quote_kind"]
+        offset = pending.get("offset")
+        width = pending.get("width")
+        ndx = pending.get("ndx")
         candles = None
-        if quote_kind is not None:
-            self.quote_kind = quote_kind
-        if width is not None or offset is not None or ndx is not None:
+        if (
+            offset is not None
+            or width is not None
+            or ndx is not None
+            or pending.get("refresh")
+        ):
             w = width if width is not None else self.xandles.width
             o = offset if offset is not None else self.xandles.offset
             n = ndx if ndx is not None else self.xandles.ndx
             if n is not None and w is not None and o is not None:
-                pull_size = Xandles.calculate_pull_size(w, o, n)
-                candles = self.collector.grab(pull_size)
+                candles = self.grab(Xandles.calculate_pull_size(w, o, n))
+                if pending.get("clamp"):
+                    ndx = self._clamp_ndx(n, w, o, candles)
         self.xandles.update(offset=offset, width=width, candles=candles, ndx=ndx)
+        if candles is not None or requote:
+            self.update_indicators(refetch=requote)
+            self.update_stats_index()
+        height = pending.get("height")
+        mid = pending.get("mid")
+        fpp = pending.get("fpp")
+        scale = pending.get("scale")
+        price_view = pending.get("price_view")
         if price_view is not None:
             self.price_view = price_view
         if price_view is True:
-            self.yrids.update(height=height, scale=scale)
-            if self.xandles.can_resolve() and self.yrids.can_resolve():
-                mid, fpp = Yrids.calculate_price_view(self.xandles, self.yrids.height)
+            view_height = height if height is not None else self.yrids.height
+            if self.xandles.can_resolve() and view_height:
+                mid, fpp = Yrids.calculate_price_view(self.xandles, view_height)
                 if scale is None:
                     scale = PriceScale(fpp)
-                self.yrids.update(mid=mid, fpp=fpp, scale=scale)
+            self.yrids.update(height=height, mid=mid, fpp=fpp, scale=scale)
         else:
             if mid is not None or fpp is not None:
                 self.price_view = False
@@ -175,34 +409,19 @@ class GeoCandles:
                 scale = PriceScale(fpp)
             self.yrids.update(height=height, mid=mid, fpp=fpp, scale=scale)
 
-    def shift(self, x: int, y: int):
-        """Shift GeoCandles data the given amount.
+    def _auto_commit(self):
+        """Commit right away unless we are inside a transaction."""
+        if not self.depth:
+            self.commit()
 
-        Args:
-            x: horizontal pixels where to the right is positive.
-            y: vertical pixels where down is positive.
-        """
-        candle_slot_shift = ceil(x / self.xandles.offset)
-        new_ndx = self.xandles.ndx - candle_slot_shift
+    @staticmethod
+    def _clamp_ndx(
+        ndx: int, width: int, offset: CandleOffset, candles: List[Candle]
+    ) -> int:
+        """Keep ndx from panning back further than the candles we have."""
         pad_adjust = Xandles.PAD * 4
-        min_slots = round((self.xandles.width - pad_adjust) / self.xandles.offset)
-        if new_ndx < 0:
-            new_ndx = 0
-        pull_size = Xandles.calculate_pull_size(
-            self.xandles.width, self.xandles.offset, new_ndx
-        )
-        candles = self.collector.grab(pull_size)
+        min_slots = round((width - pad_adjust) / offset)
         max_ndx = len(candles) - min_slots
         if max_ndx <= 0:
             max_ndx = 1
-        if new_ndx >= max_ndx:
-            new_ndx = max_ndx
-        self.xandles.update(candles=candles, ndx=new_ndx)
-        if self.price_view:
-            fp_mid, fpp = Yrids.calculate_price_view(self.xandles, self.yrids.height)
-            self.yrids.update(mid=fp_mid, fpp=fpp)
-        else:
-            fp_shift = round(y * self.yrids.fpp)
-            new_mid = FracPips(self.yrids.mid - fp_shift)
-            self.yrids.update(mid=new_mid)
-        self.refresh()
+        return min(ndx, max_ndx)
@@ -0,0 +1,79 @@
+"""Pool of recently used GeoCandles for a chart.
+
+Flipping a chart from EUR_USD to GBP_USD and back again would otherwise
+throw away the EUR_USD GeoCandles and build a new one, losing where the
+user had panned and zoomed to. The GeoPool keeps the most recently used
+GeoCandles of a chart keyed by pair and gran, so that switching back only
+needs the newest candles to be fetched.
+"""
+
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.geo.geo_candles import GeoCandles
+
+
+class GeoPool:
+
+    SIZE = 6
+    # Rough number of bytes taken up by one Candle object (measured with
+    # tracemalloc, it holds three Ohlc objects of four Decimal based Prices).
+    CANDLE_BYTES = 2800
+
+    def __init__(self, size: int = SIZE):
+        """Initialize empty pool.
+
+        Args:
+            size: maximum number of GeoCandles to keep.
+        """
+        self.size: int = size
+        self.geos: "OrderedDict[Tuple[Pair, Gran], GeoCandles]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.geos)
+
+    def get(self, pair: Pair, gran: Gran) -> Optional[GeoCandles]:
+        """Get pooled GeoCandles for pair and gran (marking it most recent)."""
+        key = (pair, gran)
+        geo = self.geos.get(key)
+        if geo is not None:
+            self.geos.move_to_end(key)
+        return geo
+
+    def put(self, geo: GeoCandles):
+        """Add geo to pool, dropping least recently used ones beyond size."""
+        key = (geo.pair, geo.gran)
+        self.geos[key] = geo
+        self.geos.move_to_end(key)
+        while len(self.geos) > self.size:
+            self.geos.popitem(last=False)
+
+    def clear(self):
+        self.geos.clear()
+
+    def candle_count(self) -> int:
+        """Number of candles referenced by all the pooled GeoCandles."""
+        return sum(geo.candle_count() for geo in self.geos.values())
+
+    def estimate_bytes(self) -> int:
+        """Rough estimate of memory held by candles of pooled GeoCandles."""
+        return self.candle_count() * self.CANDLE_BYTES
+
+    def get_report(self) -> str:
+        """Get human readable report about what the pool holds.
+
+        (This method is meant to assist development and debugging).
+        """
+        lines = list()
+        lines.append(f"GeoPool State ({len(self.geos)} of {self.size}):\n")
+        for (pair, gran), geo in reversed(self.geos.items()):
+            count = geo.candle_count()
+            kb = round(count * self.CANDLE_BYTES / 1024)
+            lines.append(f"    {pair} {str(gran):<4}: {count} candles, ~{kb} KB\n")
+        kb = round(self.estimate_bytes() / 1024)
+        lines.append(f"    total        : {self.candle_count()} candles, ~{kb} KB\n")
+        return "".join(lines)
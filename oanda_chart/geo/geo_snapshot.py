@@ -0,0 +1,522 @@
+"""Immutable snapshots of GeoCandles geometry for the canvases to draw.
+
+A GeoCandles (with its Xandles and Yrids) is worked on by a GeoWorker
+thread, so the canvases must never read it directly: it could change half
+way through a redraw. Instead the worker hands over GeoSnapshot objects,
+which are plain tuples of everything the canvases draw, down to the label
+strings. All the tkinter thread has left to do is make the Tk calls.
+"""
+
+
+from array import array
+from bisect import bisect_left
+from math import floor, isnan
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from forex_types import Currency, FracPips, Pair
+from oanda_candles import Candle, Gran, QuoteKind
+
+from oanda_chart.annotations.annotation import AnnotationKind
+from oanda_chart.env.const import Color, IndicatorColor, RenderMode
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.indicators.indicator import Indicator
+from oanda_chart.util.candle_stats import CandleStats, CandleStatsIndex
+from oanda_chart.util.collector_lock import CollectorLock
+
+
+class SnapCandle(NamedTuple):
+    """Pixel geometry of one candle (x is its left side)."""
+
+    x: int
+    o: int
+    h: int
+    l: int
+    c: int
+    # 1 when close is above open, -1 when below, 0 for a doji.
+    direction: int
+    complete: bool
+    candle: Candle
+
+
+class SnapCandles:
+    """Pixel geometry of the displayed candles, kept in parallel arrays.
+
+    A snapshot can hold thousands of candles, so rather than a SnapCandle
+    per candle, the y coordinates are kept in arrays and x is worked out
+    from the index. Indexing or iterating gives SnapCandle objects made on
+    the fly.
+    """
+
+    __slots__ = ("left", "offset", "candles", "start", "o", "h", "l", "c", "direction")
+
+    def __init__(
+        self,
+        left: int = 0,
+        offset: int = 1,
+        candles: Optional[List[Candle]] = None,
+        start: int = 0,
+    ):
+        """Initialize empty, fill with append.
+
+        Args:
+            left: x coordinate of first candle.
+            offset: pixels from one candle to the next.
+            candles: list the displayed candles are a slice of (not copied).
+            start: index in candles of first displayed candle.
+        """
+        self.left: int = left
+        self.offset: int = offset
+        self.candles: List[Candle] = [] if candles is None else candles
+        self.start: int = start
+        self.o: array = array("i")
+        self.h: array = array("i")
+        self.l: array = array("i")
+        self.c: array = array("i")
+        # 1 when close is above open, -1 when below, 0 for a doji.
+        self.direction: array = array("b")
+
+    def __len__(self) -> int:
+        return len(self.direction)
+
+    def __getitem__(self, ndx: int) -> SnapCandle:
+        if ndx < 0:
+            ndx += len(self)
+        if not 0 <= ndx < len(self):
+            raise IndexError("SnapCandles index out of range")
+        candle = self.candles[self.start + ndx]
+        return SnapCandle(
+            self.left + ndx * self.offset,
+            self.o[ndx],
+            self.h[ndx],
+            self.l[ndx],
+            self.c[ndx],
+            self.direction[ndx],
+            candle.complete,
+            candle,
+        )
+
+    def __iter__(self) -> Iterator[SnapCandle]:
+        for ndx in range(len(self)):
+            yield self[ndx]
+
+    def append(self, o: int, h: int, l: int, c: int, direction: int):
+        """Add candle with y coordinates o, h, l, c.
+
+        Direction comes from the prices, not the y coordinates, which grow
+        downward and can round open and close to the same pixel.
+        """
+        self.o.append(o)
+        self.h.append(h)
+        self.l.append(l)
+        self.c.append(c)
+        self.direction.append(direction)
+
+    def get_candle(self, ndx: int) -> Candle:
+        """Get Candle object displayed at index."""
+        return self.candles[self.start + ndx]
+
+
+class PriceLabel(NamedTuple):
+    """A price grid line at y with the three parts of its label."""
+
+    y: int
+    front: str
+    pips: str
+    frac_pips: str
+
+
+class TimeLabel(NamedTuple):
+    """Upper and lower time scale text centered on x."""
+
+    x: int
+    upper: str
+    lower: str
+
+
+class SnapLine(NamedTuple):
+    """An indicator line through the displayed candles, broken where missing.
+
+    Each segment is flat (x1, y1, x2, y2, ...) coordinates, x going through
+    the middle of candles. For overlays, y is a scroll coordinate like the
+    candles. For pane lines, y is a fraction of the indicator pane height
+    (0.0 at top, 1.0 at bottom), since the pane stays put as the view moves.
+    """
+
+    name: str
+    color: str
+    overlay: bool
+    segments: Tuple[Tuple[float, ...], ...]
+
+
+class SnapAnnotation(NamedTuple):
+    """An annotation projected into the scroll region as (x1, y1, x2, y2)."""
+
+    id: str
+    kind: str
+    color: str
+    coords: Tuple[float, float, float, float]
+
+
+class GeoSnapshot(NamedTuple):
+    pair: Pair
+    gran: Gran
+    quote_kind: QuoteKind
+    price_view: bool
+    width: int
+    height: int
+    scroll_width: int
+    scroll_height: int
+    offset: CandleOffset
+    ndx: int
+    pixels_left: int
+    pixels_right: int
+    showing_recent: bool
+    fpp: float
+    scroll_top: FracPips
+    candles: SnapCandles
+    price_grid: Tuple[PriceLabel, ...]
+    time_lines: Tuple[int, ...]
+    time_labels: Tuple[TimeLabel, ...]
+    # (side, x1, y1, x2, y2) of the mist rectangles covering areas with no
+    # candles, side being "future" or "history".
+    mist: Tuple[Tuple[str, int, int, int, int], ...]
+    # pips between price grid lines and the time scale name, if there is a grid.
+    scale_text: Optional[Tuple[str, str]]
+    # big (pair) and small (gran and quote kind) text drawn behind candles.
+    badge: Tuple[str, str]
+    # load generation of GeoWorker the snapshot was taken in.
+    generation: int = 0
+    indicators: Tuple[SnapLine, ...] = ()
+    # RenderMode candles are drawn in.
+    render_mode: str = RenderMode.CANDLES
+    # annotations crossing the scroll region.
+    annotations: Tuple[SnapAnnotation, ...] = ()
+    # Index for candle selection stats (shared with the worker, which only
+    # ever adds to it), and how many of its candles were there for this one.
+    stats_index: Optional[CandleStatsIndex] = None
+    stats_count: int = 0
+
+    @classmethod
+    def take(cls, geo: GeoCandles, generation: int = 0) -> "GeoSnapshot":
+        """Take snapshot of everything needed to draw geo."""
+        xandles = geo.xandles
+        yrids = geo.yrids
+        return cls(
+            pair=geo.pair,
+            gran=geo.gran,
+            quote_kind=geo.quote_kind,
+            price_view=geo.price_view,
+            width=xandles.width,
+            height=yrids.height,
+            scroll_width=xandles.scroll_width,
+            scroll_height=yrids.scroll_height,
+            offset=xandles.offset,
+            ndx=xandles.ndx,
+            pixels_left=xandles.pixels_left,
+            pixels_right=xandles.pixels_right,
+            showing_recent=bool(xandles.showing_recent),
+            fpp=yrids.fpp,
+            scroll_top=yrids.scroll_top,
+            candles=cls._snap_candles(geo),
+            price_grid=cls._snap_price_grid(geo),
+            time_lines=cls._snap_time_lines(geo),
+            time_labels=cls._snap_time_labels(geo),
+            mist=cls._snap_mist(geo),
+            scale_text=cls._snap_scale_text(geo),
+            badge=cls._snap_badge(geo),
+            generation=generation,
+            indicators=cls._snap_indicators(geo),
+            render_mode=geo.get_shown_render_mode(),
+            annotations=cls._snap_annotations(geo),
+            stats_index=geo.stats_index,
+            stats_count=len(geo.stats_index) if geo.stats_index else 0,
+        )
+
+    def candle_at_x(self, x: int) -> Optional[SnapCandle]:
+        """Get candle that scroll x coordinate falls on, None if not on candle."""
+        if not self.candles or x < self.pixels_left or x >= self.pixels_right:
+            return None
+        ndx = (x - self.pixels_left) // self.offset
+        return self.candles[ndx] if ndx < len(self.candles) else None
+
+    def candle_ndx_at_time(self, time: int) -> Optional[int]:
+        """Get index of the displayed candle time falls in, None if none do.
+
+        Times before the first displayed candle get 0, those after the last
+        one get the last index (so a selection reaching out of view is cut
+        down to the candles in view).
+        """
+        candles = self.candles
+        if not candles:
+            return None
+        low = 0
+        high = len(candles)
+        while low < high:
+            middle = (low + high) // 2
+            if candles.get_candle(middle).time <= time:
+                low = middle + 1
+            else:
+                high = middle
+        return max(low - 1, 0)
+
+    def selection_stats(self, time1: int, time2: int) -> Optional[CandleStats]:
+        """Get stats of candles starting from time1 to time2 (either order).
+
+        This is constant time however many candles are selected (after a
+        binary search for the ends), but needs the stats index, so it is
+        None until GeoCandles.update_stats_index was started.
+        """
+        if self.stats_index is None:
+            return None
+        tail = None
+        if self.candles:
+            last = self.candles.candles[-1]
+            if not last.complete:
+                tail = last
+        return self.stats_index.query(time1, time2, self.stats_count, tail)
+
+    def y_to_fp(self, y: int) -> FracPips:
+        """Convert scroll y coordinate to price in frac pips."""
+        return FracPips(self.scroll_top - round(y * self.fpp))
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def _snap_candles(geo: GeoCandles) -> SnapCandles:
+        xandles = geo.xandles
+        if not xandles.display_count or geo.yrids.scroll_top is None:
+            return SnapCandles()
+        snap_candles = SnapCandles(
+            xandles.pixels_left, xandles.offset, xandles.candles, xandles.start_ndx
+        )
+        price_to_y = geo.yrids.price_to_y
+        quote_kind = geo.quote_kind
+        for _, candle in xandles.iter_display():
+            ohlc = candle.quote(quote_kind)
+            snap_candles.append(
+                price_to_y(ohlc.o),
+                price_to_y(ohlc.h),
+                price_to_y(ohlc.l),
+                price_to_y(ohlc.c),
+                (ohlc.o < ohlc.c) - (ohlc.o > ohlc.c),
+            )
+        return snap_candles
+
+    @classmethod
+    def _snap_indicators(cls, geo: GeoCandles) -> Tuple[SnapLine, ...]:
+        xandles = geo.xandles
+        if not geo.indicators or not xandles.display_count:
+            return ()
+        if geo.yrids.scroll_top is None:
+            return ()
+        times = xandles.times[xandles.start_ndx : xandles.end_ndx]
+        left = xandles.pixels_left + xandles.offset.wick()
+        lines = []
+        # Indicators are shared, and updated by other charts under this lock.
+        with CollectorLock.get(geo.pair, geo.gran):
+            # The spec of a shared indicator has no color, ours may have.
+            for spec, indicator in zip(geo.indicator_specs, geo.indicators):
+                ndxs = cls._indicator_ndxs(indicator, times)
+                color = spec.color or getattr(IndicatorColor, spec.kind)
+                for line in indicator.LINES:
+                    values = [
+                        (
+                            indicator.value_of(line, ndx)
+                            if ndx is not None
+                            else float("nan")
+                        )
+                        for ndx in ndxs
+                    ]
+                    if indicator.OVERLAY:
+                        fp_to_y = geo.yrids.fp_to_y
+                        ys = [_ if isnan(_) else fp_to_y(_) for _ in values]
+                    else:
+                        ys = cls._pane_fractions(indicator, values)
+                    name = spec.name if line == "value" else f"{spec.name} {line}"
+                    lines.append(
+                        SnapLine(
+                            name,
+                            color,
+                            indicator.OVERLAY,
+                            cls._segments(left, xandles.offset, ys),
+                        )
+                    )
+        return tuple(lines)
+
+    @staticmethod
+    def _indicator_ndxs(indicator: Indicator, times: array) -> List[Optional[int]]:
+        """Get index in indicator of each time (None where it has none)."""
+        if not times:
+            return []
+        ind_times = indicator.times
+        ndx = bisect_left(ind_times, times[0])
+        ndxs = []
+        for time in times:
+            if ndx >= len(ind_times) or ind_times[ndx] != time:
+                # Not lined up, look it up (should not happen for one series).
+                ndx = bisect_left(ind_times, time)
+                if ndx >= len(ind_times) or ind_times[ndx] != time:
+                    ndxs.append(None)
+                    continue
+            ndxs.append(ndx)
+            ndx += 1
+        return ndxs
+
+    @staticmethod
+    def _pane_fractions(indicator: Indicator, values: List[float]) -> List[float]:
+        if indicator.RANGE is not None:
+            low, high = indicator.RANGE
+        else:
+            shown = [_ for _ in values if not isnan(_)]
+            low, high = (min(shown), max(shown)) if shown else (0.0, 1.0)
+        span = (high - low) or 1.0
+        return [_ if isnan(_) else (high - _) / span for _ in values]
+
+    @staticmethod
+    def _segments(
+        left: int, offset: int, ys: List[float]
+    ) -> Tuple[Tuple[float, ...], ...]:
+        """Break line through ys at nan values, dropping single points."""
+        segments = []
+        segment: List[float] = []
+        x = left
+        for y in ys:
+            if isnan(y):
+                if len(segment) >= 4:
+                    segments.append(tuple(segment))
+                segment = []
+            else:
+                segment.extend((x, y))
+            x += offset
+        if len(segment) >= 4:
+            segments.append(tuple(segment))
+        return tuple(segments)
+
+    @staticmethod
+    def _snap_annotations(geo: GeoCandles) -> Tuple[SnapAnnotation, ...]:
+        """Project annotations crossing the scroll region to its coordinates.
+
+        Only those the annotation index finds in the time and price span of
+        the scroll region are projected, trend lines being cut down to the
+        part of them in that time span.
+        """
+        xandles = geo.xandles
+        yrids = geo.yrids
+        if not xandles.display_count or yrids.scroll_top is None:
+            return ()
+        duration = geo.gran.duration
+        time1 = xandles.x_to_time(0, duration)
+        time2 = xandles.x_to_time(xandles.scroll_width, duration) + duration
+        found = geo.annotations.query(time1, time2, yrids.scroll_bot, yrids.scroll_top)
+        fp_to_y = yrids.fp_to_y
+        time_to_x = xandles.time_to_x
+        snapped = []
+        for annotation in found:
+            color = annotation.color or Color.ANNOTATION
+            if annotation.kind == AnnotationKind.LEVEL:
+                y = fp_to_y(annotation.fp1)
+                coords = (0, y, xandles.scroll_width, y)
+            else:
+                t1, fp1, t2, fp2 = annotation[2:6]
+                span = (t2 - t1) or 1
+                ta = max(t1, time1)
+                tb = min(t2, time2)
+                fpa = fp1 + (fp2 - fp1) * (ta - t1) / span
+                fpb = fp1 + (fp2 - fp1) * (tb - t1) / span
+                coords = (
+                    time_to_x(ta, duration),
+                    fp_to_y(fpa),
+                    time_to_x(tb, duration),
+                    fp_to_y(fpb),
+                )
+            snapped.append(
+                SnapAnnotation(annotation.id, annotation.kind, color, coords)
+            )
+        return tuple(snapped)
+
+    @staticmethod
+    def _snap_price_grid(geo: GeoCandles) -> Tuple[PriceLabel, ...]:
+        quote = geo.pair.quote
+        return tuple(
+            PriceLabel(y, *price_parse(fp, quote))
+            for fp, y in zip(geo.yrids.grid_fps, geo.yrids.grid_ys)
+            if fp >= 0
+        )
+
+    @staticmethod
+    def _snap_time_lines(geo: GeoCandles) -> Tuple[int, ...]:
+        # The first and last entries are the edges of the candles, not lines.
+        pixels_left = geo.xandles.pixels_left
+        return tuple(pixels_left + pixels for pixels in geo.xandles.grid_pixels[1:-1])
+
+    @staticmethod
+    def _snap_time_labels(geo: GeoCandles) -> Tuple[TimeLabel, ...]:
+        grid_pixels = geo.xandles.grid_pixels
+        grid_scales = geo.xandles.grid_scales
+        pixels_left = geo.xandles.pixels_left
+        labels = []
+        for ndx in range(1, len(grid_pixels)):
+            x_left = grid_pixels[ndx - 1]
+            x_right = grid_pixels[ndx]
+            scale_time = grid_scales[ndx - 1]
+            upper_text, lower_text = scale_time.get_labels()
+            x = pixels_left + x_left + ((x_right - x_left) // 2)
+            labels.append(TimeLabel(x, upper_text, lower_text))
+        return tuple(labels)
+
+    @staticmethod
+    def _snap_mist(geo: GeoCandles) -> Tuple[Tuple[str, int, int, int, int], ...]:
+        xandles = geo.xandles
+        if xandles.start_ndx is None or geo.yrids.scroll_height is None:
+            return ()
+        mist = []
+        y1 = 0
+        y2 = geo.yrids.scroll_height
+        # Future mist
+        x1 = xandles.pixels_right
+        x2 = xandles.scroll_width
+        last_candle = xandles.get_candle(0)
+        if last_candle is not None and not last_candle.complete:
+            # extend mist to cover incomplete last candle
+            x1 -= xandles.offset + floor(xandles.offset / 4)
+        if x2 > x1:
+            mist.append(("future", x1, y1, x2, y2))
+        # Historical mist
+        x1 = 0
+        x2 = xandles.pixels_left
+        if x2 > x1:
+            mist.append(("history", x1, y1, x2, y2))
+        return tuple(mist)
+
+    @staticmethod
+    def _snap_scale_text(geo: GeoCandles) -> Optional[Tuple[str, str]]:
+        if geo.yrids.scale is None or not geo.xandles.grid_scales:
+            return None
+        fp_grid: FracPips = geo.yrids.scale.interval
+        if fp_grid % 10:
+            pips = round(fp_grid / 10, 1)
+        else:
+            pips = round(fp_grid / 10)
+        return f"{pips} p", geo.xandles.grid_scales[0].name
+
+    @staticmethod
+    def _snap_badge(geo: GeoCandles) -> Tuple[str, str]:
+        gran_text = geo.gran.name.replace("minute", "min").capitalize()
+        quote_text = str(geo.quote_kind).capitalize()
+        return geo.pair.camel(), f"{gran_text}  {quote_text}"
+
+
+def price_parse(fp_amount: FracPips, quote: Currency) -> Tuple[str, str, str]:
+    """Split frac pips price into the front, pips, and frac pip label strings."""
+    digits = f"{fp_amount:07}"
+    ninja = quote == Currency.JPY
+    frac_pips = digits[6]
+    pips = digits[4] + digits[5]
+    if ninja:
+        front = digits[1] + digits[2] + digits[3] + "."
+    else:
+        front = digits[1] + "." + digits[2] + digits[3]
+    return front, pips, frac_pips
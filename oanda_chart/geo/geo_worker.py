@@ -0,0 +1,154 @@
+"""Background thread that owns a chart's GeoCandles.
+
+Building a GeoCandles, grabbing candles, and resolving Xandles and Yrids
+can take a while (especially when candles must be downloaded). A GeoWorker
+does all of it on its own thread so the tkinter thread stays free to handle
+input. Work is handed over as jobs, and results come back as immutable
+GeoSnapshot objects.
+
+Only the worker thread touches its GeoCandles. The tkinter thread submits
+jobs and takes snapshots:
+
+    worker.load(lambda: GeoCandles(pair=Pair.EUR_USD))
+    worker.submit(lambda geo: geo.shift(-40, 0))
+    ...
+    snapshot = worker.take()  # newest snapshot or None if nothing new
+    ...
+    worker.close()  # drop the GeoCandles and end the thread
+
+When jobs pile up faster than they run (e.g. while dragging), snapshots are
+only taken once the queue is empty, so the canvases skip straight to the
+newest geometry. Jobs submitted with snapshot=False (bookkeeping for a
+hidden chart, say) do not call for a snapshot of their own.
+"""
+
+
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Optional
+
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+
+
+class GeoWorker:
+
+    # Kinds of work items on the jobs queue.
+    LOAD = "load"
+    JOB = "job"
+    CLOSE = "close"
+
+    def __init__(self):
+        self.geo: Optional[GeoCandles] = None
+        # Incremented by each load, snapshots of older loads are discarded.
+        self.generation: int = 0
+        self.jobs: Queue = Queue()
+        self._latest: Optional[GeoSnapshot] = None
+        self._error: Optional[BaseException] = None
+        self._unfinished: int = 0
+        # A job asked for a snapshot that has not been taken yet (worker only).
+        self._owed: bool = False
+        self._closed: bool = False
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def load(self, factory: Callable[[], Optional[GeoCandles]]):
+        """Replace GeoCandles with what factory returns (run on worker thread)."""
+        with self._lock:
+            self.generation += 1
+            self._latest = None
+        self._put((factory, self.generation, self.LOAD, True))
+
+    def submit(self, job: Callable[[GeoCandles], Any], snapshot: bool = True):
+        """Have job called with the GeoCandles (skipped if there is none).
+
+        Args:
+            job: called on worker thread with the GeoCandles.
+            snapshot: False when job does not change what the chart shows, so
+                      no snapshot needs to be taken for it.
+        """
+        self._put((job, self.generation, self.JOB, snapshot))
+
+    def close(self, finish: Optional[Callable[[], Any]] = None):
+        """Drop the GeoCandles and end the worker thread, skipping queued jobs.
+
+        Args:
+            finish: called on the worker thread once the GeoCandles is dropped
+                    (it is not called if the thread never started).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self.generation += 1
+            self._latest = None
+        if self._thread is None:
+            self._closed = True
+            self.geo = None
+        else:
+            self._put((finish, self.generation, self.CLOSE, False))
+            self._closed = True
+
+    def take(self) -> Optional[GeoSnapshot]:
+        """Take newest snapshot not yet taken, None if there is none.
+
+        Raises:
+            Exception: re-raises (on the calling thread) anything a job raised.
+        """
+        with self._lock:
+            snapshot, self._latest = self._latest, None
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return snapshot
+
+    def busy(self) -> bool:
+        """True while there are jobs that have not finished."""
+        with self._lock:
+            return self._unfinished > 0
+
+    def _put(self, item):
+        with self._lock:
+            if self._closed:
+                return
+            self._unfinished += 1
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+        self.jobs.put(item)
+
+    def _run(self):
+        kind = None
+        while kind != self.CLOSE:
+            job, generation, kind, snapshot = self.jobs.get()
+            try:
+                self._handle(job, generation, kind, snapshot)
+            except Exception as error:
+                with self._lock:
+                    self._error = error
+            finally:
+                with self._lock:
+                    self._unfinished -= 1
+
+    def _handle(self, job: Callable, generation: int, kind: str, snapshot: bool):
+        if generation != self.generation:
+            return
+        if kind == self.CLOSE:
+            self.geo = None
+            if job is not None:
+                job()
+            return
+        if kind == self.LOAD:
+            # Drop the old GeoCandles first, so if the factory fails (on a
+            # download, say) later jobs are skipped rather than run on it.
+            self.geo = None
+            self._owed = False
+            self.geo = job()
+        elif self.geo is not None:
+            job(self.geo)
+        self._owed = self._owed or snapshot
+        if self.geo is not None and self._owed and self.jobs.empty():
+            self._owed = False
+            snapshot = GeoSnapshot.take(self.geo, generation)
+            with self._lock:
+                if generation == self.generation:
+                    self._latest = snapshot
@@ -1,4 +1,5 @@
-from typing import Iterable, Tuple, Dict, Type, List, Union
+from bisect import bisect_left
+from typing import Iterable, Tuple, Dict, Type, List, Optional, Sequence, Union
 
 from oanda_candles import Candle
 from time_int import TimeInt, TimeTruncUnit
@@ -16,6 +17,15 @@ class _ApproxTimes:
     THIN_MONTH = 28 * DAY
     FAT_YEAR = 370 * DAY
     THIN_YEAR = 360 * DAY
+    # Longest length of each unit, used to step past the end of an interval.
+    UNIT_MAX = {
+        TimeTruncUnit.MINUTE: MIN,
+        TimeTruncUnit.HOUR: HOUR,
+        TimeTruncUnit.DAY: DAY,
+        TimeTruncUnit.WEEK: WEEK,
+        TimeTruncUnit.MONTH: FAT_MONTH,
+        TimeTruncUnit.YEAR: FAT_YEAR,
+    }
 
 
 class ScaleTime:
@@ -61,10 +71,59 @@ class ScaleTime:
                 longest = count
         return longest
 
+    @classmethod
+    def get_grid(
+        cls,
+        times: Sequence[int],
+        offset: CandleOffset,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> List[Tuple[int, "ScaleTime"]]:
+        """Get pixel offsets and scale times of grid for slice of candle times.
+
+        Rather than looking at the scale time of every candle, this jumps from
+        one interval boundary to the next and finds where each one falls in
+        times with a binary search, so it takes O(grid lines * log N).
+
+        Args:
+            times: sorted candle times.
+            offset: candle offset the grid is for.
+            start: index of first candle in slice.
+            end: index past last candle in slice (defaults to len(times)).
+        Returns:
+            (pixels from first candle, ScaleTime) for the start of the first
+            interval, each later interval, and the last candle if it is not
+            at the start of an interval.
+        """
+        end = len(times) if end is None else min(end, len(times))
+        grid_list = []
+        if end <= start:
+            return grid_list
+        grid_adjust = offset.grid_adjust()
+        scale_time = cls(TimeInt(times[start]))
+        grid_list.append((-grid_adjust, scale_time))
+        line_ndx = start
+        while True:
+            ndx = bisect_left(times, scale_time.next_time(), line_ndx + 1, end)
+            if ndx >= end:
+                break
+            line_ndx = ndx
+            scale_time = cls(TimeInt(times[ndx]))
+            grid_list.append((((ndx - start) * offset) - grid_adjust, scale_time))
+        if line_ndx != end - 1:
+            pixels = ((end - 1 - start) * offset) - grid_adjust
+            grid_list.append((pixels, cls(TimeInt(times[end - 1]))))
+        return grid_list
+
     def __init__(self, time: TimeInt):
         """Round down time to most recent time that fell evenly on scale."""
         self.time = time.trunc(self.unit, num=self.num)
 
+    def next_time(self) -> TimeInt:
+        """Get start of the next interval on scale."""
+        step = self.num * _ApproxTimes.UNIT_MAX[self.unit]
+        return TimeInt(self.time + step).trunc(self.unit, num=self.num)
+
     def __eq__(self, other: "ScaleTime") -> bool:
         if not isinstance(other, ScaleTime):
             return NotImplemented
@@ -312,26 +371,19 @@ class ScaleTimeManager:
                     break
 
     def get_grid(
-        self, candles: Iterable[Candle], offset: CandleOffset
+        self,
+        times: Sequence[int],
+        offset: CandleOffset,
+        start: int = 0,
+        end: Optional[int] = None,
     ) -> List[Tuple[int, ScaleTime]]:
-        """Get list of pixel offset and Scale times for time grid."""
-        grid_list = []
-        if candles:
-            grid_adjust = offset.grid_adjust()
-            scale_time_cls: Type[ScaleTime] = self.offset_to_scale[offset]
-            prev_scale_time: ScaleTime = scale_time_cls(candles[0].time)
-            grid_list.append((-grid_adjust, prev_scale_time))
-            gap_left = False
-            for ndx, candle in enumerate(candles[1:]):
-                scale_time = scale_time_cls(candle.time)
-                if scale_time != prev_scale_time:
-                    pixels = ((ndx + 1) * offset) - grid_adjust
-                    grid_list.append((pixels, scale_time))
-                    prev_scale_time = scale_time
-                    gap_left = False
-                else:
-                    gap_left = True
-            if gap_left:
-                pixels = ((ndx + 1) * offset) - grid_adjust
-                grid_list.append((pixels, scale_time))
-        return grid_list
+        """Get list of pixel offset and Scale times for time grid.
+
+        Args:
+            times: sorted candle times.
+            offset: candle offset, which decides the ScaleTime class used.
+            start: index of first candle to grid.
+            end: index past last candle to grid (defaults to len(times)).
+        """
+        scale_time_cls: Type[ScaleTime] = self.offset_to_scale[offset]
+        return scale_time_cls.get_grid(times, offset, start, end)
@@ -23,8 +23,11 @@ this uncertainty. We have to have the actual candle's starting
 times in order to map x coordinate to time and time to x coordinate.
 """
 
+from array import array
+from bisect import bisect_right
+from itertools import islice
 from math import ceil, floor
-from typing import List, Tuple, Optional, Iterable
+from typing import Iterator, List, Tuple, Optional, Iterable
 
 from forex_types import FracPips
 from oanda_candles import Candle
@@ -41,10 +44,32 @@ class Xandles:
     how big the scrollable area is, how many pixels are to left and
     right of the candles to draw in scrollable area, and what x number
     of pixels from left of scrollable area to draw each candle.
+
+    The candles drawn are the slice candles[start_ndx:end_ndx], the one at
+    start_ndx + n being drawn n * offset pixels right of pixels_left. So
+    rather than keep a list of (x, candle) pairs, the display list is just
+    those two indexes (see iter_display).
     """
 
     PAD = 100
 
+    __slots__ = (
+        "offset",
+        "width",
+        "candles",
+        "times",
+        "ndx",
+        "scroll_width",
+        "start_ndx",
+        "end_ndx",
+        "pixels_left",
+        "pixels_right",
+        "scale_manager",
+        "grid_pixels",
+        "grid_scales",
+        "showing_recent",
+    )
+
     def __init__(
         self,
         offset: CandleOffset = CandleOffset.DEFAULT,
@@ -61,6 +86,8 @@ class Xandles:
         self.width: Optional[int] = width
         # candles is a list of Candle objects from old ones to latest.
         self.candles: Optional[List[Candle]] = candles
+        # times of the candles, for the time grid to search through.
+        self.times: array = array("q", [candle.time for candle in candles or ()])
         # ndx is how many candles back from latest candle user has panned.
         self.ndx: int = ndx
         # ----------------------------------------------------------------------
@@ -68,9 +95,9 @@ class Xandles:
         # ----------------------------------------------------------------------
         # The width of the scrollable area of canvas.
         self.scroll_width: Optional[int] = None
-        # The display_list has both candles plus their pixel offset from left
-        # of canvas.
-        self.display_list: Optional[List[Tuple[int, Candle]]] = None
+        # Indexes of first candle displayed and one past the last one.
+        self.start_ndx: Optional[int] = None
+        self.end_ndx: Optional[int] = None
         # pixels_left is how many pixels before first candle on left (which
         # happens when candle data does not go back as far as canvas).
         self.pixels_left: Optional[int] = None
@@ -80,9 +107,10 @@ class Xandles:
         self.pixels_right: Optional[int] = None
         # scale_manager figures out where to put time grids.
         self.scale_manager = ScaleTimeManager(candles)
-        # grid_list is a list of pixels from start of candle with corresponding
-        # ScaleTime for start of candles next to the pixel location.
-        self.grid_list: Optional[List[Tuple[int, ScaleTime]]] = None
+        # grid_pixels are pixels from start of candles with corresponding
+        # ScaleTime in grid_scales for start of candles next to the pixel.
+        self.grid_pixels: array = array("i")
+        self.grid_scales: List[ScaleTime] = []
         # showing_recent should be true when most recent candle is in view
         self.showing_recent: Optional[bool] = None
         # ---------------------------------------------------------------------
@@ -90,15 +118,50 @@ class Xandles:
         # ---------------------------------------------------------------------
         self.update()
 
+    @property
+    def display_count(self) -> int:
+        """Number of candles displayed (0 until resolved)."""
+        if self.start_ndx is None:
+            return 0
+        return self.end_ndx - self.start_ndx
+
+    @property
+    def display_list(self) -> Optional[List[Tuple[int, Candle]]]:
+        """List of (x, candle) displayed, None until resolved.
+
+        This builds a new list each time, prefer iter_display.
+        """
+        if self.start_ndx is None:
+            return None
+        return list(self.iter_display())
+
+    @property
+    def grid_list(self) -> Optional[List[Tuple[int, ScaleTime]]]:
+        """List of (pixels, ScaleTime) of time grid, None until resolved."""
+        if self.start_ndx is None:
+            return None
+        return list(zip(self.grid_pixels, self.grid_scales))
+
+    def iter_display(self) -> Iterator[Tuple[int, Candle]]:
+        """Iterate through x coordinate and candle of each displayed candle."""
+        x = self.pixels_left
+        for candle in islice(self.candles, self.start_ndx, self.end_ndx):
+            yield x, candle
+            x += self.offset
+
     def clear(self):
         self.offset = CandleOffset.DEFAULT
         self.width = None
         self.candles = None
+        self.times = array("q")
         self.ndx = 0
         self.scroll_width = None
-        self.display_list = None
+        self.start_ndx = None
+        self.end_ndx = None
         self.pixels_left = None
         self.pixels_right = None
+        self.grid_pixels = array("i")
+        self.grid_scales = []
 
     def go_home(self):
         self.offset = CandleOffset.DEFAULT
@@ -110,18 +173,50 @@ class Xandles:
 
     def get_candle(self, ndx) -> Optional[Candle]:
         """Get candle by index (where 0 is most recent candle)."""
-        num_candle = len(self.display_list)
-        if ndx >= num_candle:
+        if ndx >= self.display_count:
             return None
-        return self.display_list[num_candle - ndx - 1][1]
+        return self.candles[self.end_ndx - ndx - 1]
 
     def candle_at_x(self, x: int) -> Optional[Candle]:
         """Get candle that x coordinate falls on, None if not on candle."""
-        if x < self.pixels_left or x > self.pixels_right:
+        if x < self.pixels_left or x >= self.pixels_right:
             return None
-        delta = x - self.pixels_left
-        ndx = floor(delta / self.offset)
-        return self.display_list[ndx][1]
+        ndx = self.start_ndx + (x - self.pixels_left) // self.offset
+        return self.candles[ndx] if ndx < self.end_ndx else None
+
+    def time_to_x(self, time: int, duration: int) -> float:
+        """Get scroll x coordinate of a time (middle of candle at its start time).
+
+        Times between candles are spread over the candle they fall in, with
+        times in gaps (such as weekends) stuck to the end of the candle before
+        it. Times before or after the candles we have are extrapolated, one
+        candle slot per duration seconds.
+        """
+        times = self.times
+        ndx = bisect_right(times, time) - 1
+        if ndx < 0:
+            ndx = 0
+            fraction = (time - times[0]) / duration
+        elif ndx == len(times) - 1:
+            fraction = (time - times[ndx]) / duration
+        else:
+            fraction = min((time - times[ndx]) / duration, 1.0)
+        slots = ndx - self.start_ndx + fraction
+        return self.pixels_left + self.offset.wick() + slots * self.offset
+
+    def x_to_time(self, x: int, duration: int) -> int:
+        """Get start time of candle slot that scroll x coordinate falls in.
+
+        Slots without a candle are given times duration seconds apart from the
+        nearest candle we have.
+        """
+        times = self.times
+        ndx = self.start_ndx + floor((x - self.pixels_left) / self.offset)
+        if ndx < 0:
+            return times[0] + ndx * duration
+        if ndx >= len(times):
+            return times[-1] + (ndx - len(times) + 1) * duration
+        return times[ndx]
 
     def iter_view_candles(self) -> Iterable[Candle]:
         """Iterate through Candle objects in view area"""
@@ -129,10 +224,9 @@ class Xandles:
         x_end = min(self.width * 2, self.pixels_right)
         start_delta = x_start - self.pixels_left
         end_delta = x_end - self.pixels_left
-        start_ndx = floor(start_delta / self.offset)
-        end_ndx = floor(end_delta / self.offset)
-        for _, candle in self.display_list[start_ndx:end_ndx]:
-            yield candle
+        start_ndx = self.start_ndx + floor(start_delta / self.offset)
+        end_ndx = min(self.start_ndx + floor(end_delta / self.offset), self.end_ndx)
+        return islice(self.candles, start_ndx, max(start_ndx, end_ndx))
 
     def find_view_low_high(self) -> Tuple[Optional[FracPips], Optional[FracPips]]:
         """Return the lowest and highest price in view as frac pips.
@@ -154,6 +248,20 @@ class Xandles:
             return None, None
         return low, high
 
+    def _update_times(self, candles: List[Candle]):
+        """Bring times up to date with candles, only adding the new ones.
+
+        Refreshes usually hand over the same candles plus a few new ones, so
+        when the first times still line up, the times we have are kept.
+        """
+        times = self.times
+        keep = min(len(times), len(candles)) - 1
+        if keep < 0 or times[0] != candles[0].time or times[keep] != candles[keep].time:
+            self.times = array("q", [candle.time for candle in candles])
+            return
+        del times[keep:]
+        times.extend(candle.time for candle in islice(candles, keep, None))
+
     @classmethod
     def calculate_pull_size(cls, width: int, offset: CandleOffset, ndx: int):
         """Determine how many candles to pull given width, offset, and ndx number.
@@ -191,6 +299,7 @@ class Xandles:
         if width is not None:
             self.width = width
         if candles is not None:
+            self._update_times(candles)
             self.candles = candles
         if ndx is not None:
             self.ndx = ndx
@@ -221,23 +330,15 @@ class Xandles:
         # Find last candle index.
         slots_open = slots - empty_slots_to_left
         tail_length = total_num - start_ndx
-        x = self.pixels_left
-        self.display_list = []
         if slots_open > tail_length:
             self.showing_recent = True
-            for candle in self.candles[start_ndx:]:
-                self.display_list.append((x, candle))
-                x += self.offset
-            self.grid_list = self.scale_manager.get_grid(
-                self.candles[start_ndx:], self.offset
-            )
+            end_ndx = total_num
         else:
             self.showing_recent = False
             end_ndx = start_ndx + slots_open
-            for candle in self.candles[start_ndx:end_ndx]:
-                self.display_list.append((x, candle))
-                x += self.offset
-            self.grid_list = self.scale_manager.get_grid(
-                self.candles[start_ndx:end_ndx], self.offset
-            )
+        self.start_ndx = start_ndx
+        self.end_ndx = end_ndx
+        grid = self.scale_manager.get_grid(self.times, self.offset, start_ndx, end_ndx)
+        self.grid_pixels = array("i", [pixels for pixels, _ in grid])
+        self.grid_scales = [scale_time for _, scale_time in grid]
         return True
@@ -1,3 +1,4 @@
+from array import array
 from typing import Optional, List, Tuple
 from math import ceil, floor
 
@@ -8,6 +9,21 @@ from oanda_chart.geo.xandles import Xandles
 
 
 class Yrids:
+
+    __slots__ = (
+        "height",
+        "mid",
+        "fpp",
+        "scale",
+        "scroll_height",
+        "grid_fps",
+        "grid_ys",
+        "top",
+        "bot",
+        "scroll_top",
+        "scroll_bot",
+    )
+
     def __init__(
         self,
         height: Optional[int] = None,
@@ -31,8 +47,9 @@ class Yrids:
         # ----------------------------------------------------------------------
         # The height if the scrollable area of canvas.
         self.scroll_height: Optional[int] = None
-        # list of frac pips and pixel locations for grid lines.
-        self.grid_list: Optional[List[Tuple[FracPips, int]]] = None
+        # frac pips and pixel locations of grid lines (as parallel arrays).
+        self.grid_fps: array = array("i")
+        self.grid_ys: array = array("i")
         # the price in fractional pips at top and bottom of viewable area.
         self.top: Optional[FracPips] = None
         self.bot: Optional[FracPips] = None
@@ -50,12 +67,23 @@ class Yrids:
         self.fpp = PriceScale.DEFAULT_FPP
         self.scale = PriceScale.DEFAULT
         self.scroll_height = None
-        self.grid_list = None
+        self.grid_fps = array("i")
+        self.grid_ys = array("i")
         self.top = None
         self.bot = None
         self.scroll_top = None
         self.scroll_bot = None
 
+    @property
+    def grid_list(self) -> Optional[List[Tuple[FracPips, int]]]:
+        """List of frac pips and pixel locations for grid lines.
+
+        None until resolved, builds a new list each time (prefer the arrays).
+        """
+        if self.scroll_height is None:
+            return None
+        return [(FracPips(fp), y) for fp, y in zip(self.grid_fps, self.grid_ys)]
+
     def price_to_y(self, price: Price) -> int:
         """Convert Price to y pixel coordinate."""
         return self.fp_to_y(FracPips.from_price(price))
@@ -73,7 +101,7 @@ class Yrids:
         cls, xandles: Xandles, height: int
     ) -> Tuple[FracPips, float]:
         """Calculate the price_view fp_mid and fpp from Xandles and pixel height.
-        
+
         Args:
             xandles: must be loaded with candles we can get prices from.
             height: height of view area price view will cover.
@@ -148,8 +176,8 @@ class Yrids:
         self.bot = FracPips(self.mid - fp_view_delta)
         self.scroll_top = FracPips(self.mid + fp_scroll_delta)
         self.scroll_bot = FracPips(self.mid - fp_scroll_delta)
-        self.grid_list = []
-        for fp in self.scale.get_grid_list(self.scroll_bot, self.scroll_top):
-            y = self.fp_to_y(fp)
-            self.grid_list.append((fp, y))
+        self.grid_fps = array(
+            "i", self.scale.get_grid_list(self.scroll_bot, self.scroll_top)
+        )
+        self.grid_ys = array("i", [self.fp_to_y(fp) for fp in self.grid_fps])
         return True
@@ -0,0 +1,279 @@
+"""Technical indicators that update incrementally as candles come in.
+
+An Indicator keeps one value per candle of a series (in parallel arrays
+with the candle times), along with whatever running state it needs per
+candle, like prefix sums or smoothed averages. Each new candle is one O(1)
+step from the state of the candle before it. Since the state of every
+candle is kept, dropping the last one (when the incomplete tail candle
+changes) is just truncating the arrays.
+
+Indicator values are in frac pips (or 0 to 100 for the RSI), float nan where
+there are not yet enough candles for a value.
+
+Synopsis:
+    sma = make_indicator(IndicatorSpec(IndicatorKind.SMA, 20), QuoteKind.MID)
+    sma.update(candles)  # first time computes over all of them
+    ...
+    sma.update(candles)  # later only the new and changed tail candles
+    sma.lines["value"][-1]
+"""
+
+
+from array import array
+from math import nan, sqrt
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+from forex_types import FracPips
+from oanda_candles import Candle, QuoteKind
+
+
+class IndicatorKind:
+    SMA = "SMA"
+    EMA = "EMA"
+    BOLLINGER = "BB"
+    RSI = "RSI"
+    ATR = "ATR"
+
+
+class IndicatorSpec(NamedTuple):
+    """What indicator to draw, e.g. IndicatorSpec(IndicatorKind.EMA, 50)."""
+
+    kind: str
+    period: int
+    # Bollinger band distance from middle, in standard deviations.
+    deviations: float = 2.0
+    # Line color, None for the default color of the kind.
+    color: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.kind} {self.period}"
+
+    def shared(self) -> "IndicatorSpec":
+        """Get spec without what only matters for drawing (to share values)."""
+        return self._replace(color=None)
+
+
+class Indicator:
+
+    # Names of the value lines the indicator has.
+    LINES: Tuple[str, ...] = ("value",)
+    # Names of the running state kept per candle.
+    STATE: Tuple[str, ...] = ()
+    # True if values are prices drawn over the candles, False if they are
+    # drawn in a pane of their own.
+    OVERLAY: bool = True
+    # Fixed (low, high) range of values in a pane, None to fit what is shown.
+    RANGE: Optional[Tuple[float, float]] = None
+
+    def __init__(self, spec: IndicatorSpec, quote_kind: QuoteKind):
+        self.spec: IndicatorSpec = spec
+        self.period: int = spec.period
+        self.quote_kind: QuoteKind = quote_kind
+        self.times: array = array("q")
+        self.lines: Dict[str, array] = {name: array("d") for name in self.LINES}
+        self.state: Dict[str, array] = {name: array("d") for name in self.STATE}
+        # Prices are kept relative to the first close, to keep sums small.
+        self.base: int = 0
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def update(self, candles: Sequence[Candle]) -> int:
+        """Bring values up to date with candles (oldest first).
+
+        Only candles newer than the last one seen are stepped through, along
+        with the last one seen (it may have been incomplete). If candles go
+        back further than before, or do not line up, everything is computed
+        again.
+
+        Returns:
+            number of candles stepped through.
+        """
+        if not candles:
+            return 0
+        times = self.times
+        # Index in candles of the last candle seen, None if not among them.
+        start = None
+        if times and int(candles[0].time) >= times[0]:
+            last_time = times[-1]
+            ndx = len(candles) - 1
+            while ndx >= 0 and int(candles[ndx].time) > last_time:
+                ndx -= 1
+            if ndx >= 0 and int(candles[ndx].time) == last_time:
+                start = ndx
+        if start is not None:
+            self.truncate(len(times) - 1)
+        else:
+            start = 0
+            self.truncate(0)
+            self.base = self._fp(candles[0].quote(self.quote_kind).c)
+        quote_kind = self.quote_kind
+        fp = self._fp
+        base = self.base
+        for ndx in range(start, len(candles)):
+            candle = candles[ndx]
+            ohlc = candle.quote(quote_kind)
+            self._step(
+                len(times),
+                fp(ohlc.h) - base,
+                fp(ohlc.l) - base,
+                fp(ohlc.c) - base,
+            )
+            times.append(int(candle.time))
+        return len(candles) - start
+
+    def truncate(self, count: int):
+        """Keep only values (and state) of the first count candles."""
+        del self.times[count:]
+        for values in self.lines.values():
+            del values[count:]
+        for values in self.state.values():
+            del values[count:]
+
+    def value_of(self, line: str, ndx: int) -> float:
+        """Get value of line at ndx in frac pips (nan if there is none)."""
+        value = self.lines[line][ndx]
+        return value if not self.OVERLAY else value + self.base
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        """Append values and state of candle at ndx (prices relative to base)."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _fp(price) -> int:
+        return int(FracPips.from_price(price))
+
+
+class SMA(Indicator):
+    """Simple moving average of closes."""
+
+    STATE = ("sum",)
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        sums = self.state["sum"]
+        total = (sums[-1] if ndx else 0.0) + c
+        sums.append(total)
+        period = self.period
+        if ndx + 1 < period:
+            self.lines["value"].append(nan)
+        else:
+            before = sums[ndx - period] if ndx >= period else 0.0
+            self.lines["value"].append((total - before) / period)
+
+
+class EMA(Indicator):
+    """Exponential moving average of closes (seeded with first close)."""
+
+    STATE = ("ema",)
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        emas = self.state["ema"]
+        if ndx:
+            ema = emas[-1] + (c - emas[-1]) * 2 / (self.period + 1)
+        else:
+            ema = c
+        emas.append(ema)
+        self.lines["value"].append(ema if ndx + 1 >= self.period else nan)
+
+
+class Bollinger(Indicator):
+    """Simple moving average with bands some standard deviations around it."""
+
+    LINES = ("middle", "upper", "lower")
+    STATE = ("sum", "squares")
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        sums = self.state["sum"]
+        squares = self.state["squares"]
+        total = (sums[-1] if ndx else 0.0) + c
+        total_squares = (squares[-1] if ndx else 0.0) + c * c
+        sums.append(total)
+        squares.append(total_squares)
+        period = self.period
+        lines = self.lines
+        if ndx + 1 < period:
+            for values in lines.values():
+                values.append(nan)
+            return
+        if ndx >= period:
+            total -= sums[ndx - period]
+            total_squares -= squares[ndx - period]
+        mean = total / period
+        spread = self.spec.deviations * sqrt(max(total_squares / period - mean**2, 0))
+        lines["middle"].append(mean)
+        lines["upper"].append(mean + spread)
+        lines["lower"].append(mean - spread)
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing (0 to 100)."""
+
+    STATE = ("close", "gain", "loss")
+    OVERLAY = False
+    RANGE = (0.0, 100.0)
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        state = self.state
+        state["close"].append(c)
+        if not ndx:
+            state["gain"].append(0.0)
+            state["loss"].append(0.0)
+            self.lines["value"].append(nan)
+            return
+        change = c - state["close"][ndx - 1]
+        # Plain average over the first period changes, smoothed after that.
+        weight = min(ndx, self.period)
+        gain = state["gain"][-1] + (max(change, 0.0) - state["gain"][-1]) / weight
+        loss = state["loss"][-1] + (max(-change, 0.0) - state["loss"][-1]) / weight
+        state["gain"].append(gain)
+        state["loss"].append(loss)
+        if ndx < self.period:
+            value = nan
+        elif not loss:
+            value = 100.0 if gain else 50.0
+        else:
+            value = 100.0 - 100.0 / (1.0 + gain / loss)
+        self.lines["value"].append(value)
+
+
+class ATR(Indicator):
+    """Average true range with Wilder smoothing (in frac pips)."""
+
+    STATE = ("close", "atr")
+    OVERLAY = False
+
+    def _step(self, ndx: int, h: float, l: float, c: float):
+        closes = self.state["close"]
+        atrs = self.state["atr"]
+        if ndx:
+            before = closes[-1]
+            true_range = max(h - l, abs(h - before), abs(l - before))
+            atr = atrs[-1] + (true_range - atrs[-1]) / min(ndx + 1, self.period)
+        else:
+            atr = h - l
+        closes.append(c)
+        atrs.append(atr)
+        self.lines["value"].append(atr if ndx + 1 >= self.period else nan)
+
+
+INDICATORS = {
+    IndicatorKind.SMA: SMA,
+    IndicatorKind.EMA: EMA,
+    IndicatorKind.BOLLINGER: Bollinger,
+    IndicatorKind.RSI: RSI,
+    IndicatorKind.ATR: ATR,
+}
+
+
+def make_indicator(spec: IndicatorSpec, quote_kind: QuoteKind) -> Indicator:
+    """Make indicator of spec for prices of quote_kind.
+
+    Raises:
+        ValueError: for an unknown kind or a period less than one.
+    """
+    if spec.kind not in INDICATORS:
+        raise ValueError(f"Unknown indicator kind: {spec.kind}")
+    if spec.period < 1:
+        raise ValueError(f"Indicator period must be at least 1: {spec.period}")
+    return INDICATORS[spec.kind](spec, quote_kind)
@@ -0,0 +1,50 @@
+"""Share indicators between charts of the same candles.
+
+Several charts showing the same pair, gran and quote kind would otherwise
+each compute the same indicator values. The IndicatorHub hands them all the
+same Indicator object, kept only while some chart holds on to it.
+
+An indicator follows the candle series of a CandleCollector, so it is
+updated (and read) while holding the CollectorLock of its pair and gran.
+"""
+
+
+from threading import Lock
+from typing import Tuple
+from weakref import WeakValueDictionary
+
+from forex_types import Pair
+from oanda_candles import Gran, QuoteKind
+
+from oanda_chart.indicators.indicator import Indicator, IndicatorSpec, make_indicator
+
+Key = Tuple[Pair, Gran, QuoteKind, IndicatorSpec]
+
+
+class IndicatorHub:
+
+    _indicators: "WeakValueDictionary[Key, Indicator]" = WeakValueDictionary()
+    _guard: Lock = Lock()
+
+    @classmethod
+    def get(
+        cls, pair: Pair, gran: Gran, quote_kind: QuoteKind, spec: IndicatorSpec
+    ) -> Indicator:
+        """Get the shared indicator of spec for candles of pair, gran and quote kind.
+
+        Raises:
+            ValueError: when spec is not valid (see make_indicator).
+        """
+        key = (pair, gran, quote_kind, spec.shared())
+        with cls._guard:
+            indicator = cls._indicators.get(key)
+            if indicator is None:
+                indicator = make_indicator(spec.shared(), quote_kind)
+                cls._indicators[key] = indicator
+            return indicator
+
+    @classmethod
+    def count(cls) -> int:
+        """Number of indicators in use."""
+        with cls._guard:
+            return len(cls._indicators)
@@ -0,0 +1,242 @@
+"""Apply scenes to a canvas with as few Tk calls as possible.
+
+A CanvasDiffer remembers which canvas item it made for each Prim key. When
+given the next scene it only:
+
+    * creates items for keys it has not seen,
+    * moves a whole layer with one move call when all its items shifted
+      by the same amount (e.g. the candles after a scroll),
+    * moves (coords) other items whose coordinates changed,
+    * reconfigures (itemconfigure) items whose options changed,
+    * deletes (in a single call) items whose keys are gone.
+
+The DiffStats it returns tell how much work a frame took, which makes the
+cost of a render something that can be measured and compared.
+
+The calls are made through CanvasCalls (one Tk call each) or, in batch
+mode, a TclBatch that sends the whole frame as one Tcl script.
+"""
+
+
+from tkinter import TclError
+from typing import (
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from oanda_chart.render.prim import Prim
+from oanda_chart.render.tcl_batch import Options, TclBatch
+
+
+class DiffStats(NamedTuple):
+    created: int = 0
+    moved: int = 0
+    configured: int = 0
+    deleted: int = 0
+    kept: int = 0
+    # items moved along with their whole layer by a single move call.
+    shifted: int = 0
+
+    @property
+    def size(self) -> int:
+        """Number of items that needed a Tk call."""
+        return self.created + self.moved + self.configured + self.deleted
+
+    def __str__(self) -> str:
+        return (
+            f"+{self.created} ~{self.moved} *{self.configured} -{self.deleted}"
+            f" ={self.kept} >{self.shifted}"
+        )
+
+
+class CanvasCalls:
+    """Make canvas changes right away, one tkinter call each."""
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.created: List[int] = []
+
+    def create(self, shape: str, coords: Sequence[float], options: Options):
+        create = getattr(self.canvas, f"create_{shape}")
+        self.created.append(create(*coords, **dict(options)))
+
+    def coords(self, item: int, coords: Sequence[float]):
+        self.canvas.coords(item, *coords)
+
+    def move(self, tag: str, dx: float, dy: float):
+        self.canvas.move(tag, dx, dy)
+
+    def configure(self, item: int, options: Options):
+        self.canvas.itemconfigure(item, **dict(options))
+
+    def delete(self, items: Iterable[int]):
+        self.canvas.delete(*items)
+
+    def raise_tag(self, tag: str):
+        self.canvas.tag_raise(tag)
+
+    def flush(self) -> List[int]:
+        """Return ids of items created since last flush."""
+        created, self.created = self.created, []
+        return created
+
+    def clear(self, tags: Iterable[str]):
+        """Delete every item with one of tags now, forgetting any created."""
+        self.created = []
+        for tag in tags:
+            self.canvas.delete(tag)
+
+
+class CanvasDiffer:
+    def __init__(self, canvas, batch: bool = False):
+        """Initialize differ.
+
+        Args:
+            canvas: tkinter Canvas (or anything with the same methods).
+            batch: send each frame to Tcl as one script instead of call by call.
+        """
+        self.canvas = canvas
+        self.calls = TclBatch(canvas) if batch else CanvasCalls(canvas)
+        self.items: Dict[Tuple[Hashable, ...], Tuple[int, Prim]] = {}
+        self.last: DiffStats = DiffStats()
+
+    def apply(self, scene: Iterable[Prim]) -> DiffStats:
+        """Change canvas items to match scene (keys must be unique).
+
+        Raises:
+            TclError: if Tk failed part way. Items of the layers we draw are
+                      then deleted and forgotten, so the next scene is drawn
+                      from scratch rather than diffed against a canvas we
+                      no longer know.
+        """
+        scene = list(scene)
+        try:
+            return self._apply(scene)
+        except TclError:
+            layers = {prim.layer for _, prim in self.items.values()}
+            layers.update(prim.layer for prim in scene)
+            self.items = {}
+            try:
+                self.calls.clear(sorted(layers))
+            except TclError:
+                # Canvas is gone, nothing left to clear.
+                pass
+            raise
+
+    def _apply(self, scene: List[Prim]) -> DiffStats:
+        calls = self.calls
+        old_items = self.items
+        new_items = {}
+        # Prims of each layer (in order of first appearance), whether or not
+        # they are next to each other in scene, so a layer moves only once.
+        groups: Dict[str, List[Prim]] = {}
+        for prim in scene:
+            groups.setdefault(prim.layer, []).append(prim)
+        layers = list(groups)
+        creations: List[Prim] = []
+        moved = configured = kept = shifted = 0
+        doomed = []
+        for layer, group in groups.items():
+            shift = self._layer_shift(group)
+            if shift is not None:
+                calls.move(layer, *shift)
+            for prim in group:
+                old = old_items.pop(prim.key, None)
+                if old is not None:
+                    item, old_prim = old
+                    if old_prim.shape != prim.shape:
+                        doomed.append(item)
+                        old = None
+                if old is None:
+                    calls.create(prim.shape, prim.coords, prim.options)
+                    creations.append(prim)
+                    continue
+                changed = False
+                if shift is not None and self._shifted(old_prim, prim, *shift):
+                    shifted += 1
+                    changed = True
+                elif shift is not None or old_prim.coords != prim.coords:
+                    calls.coords(item, prim.coords)
+                    moved += 1
+                    changed = True
+                if old_prim.options != prim.options:
+                    old_options = dict(old_prim.options)
+                    calls.configure(
+                        item,
+                        tuple(
+                            (name, value)
+                            for name, value in prim.options
+                            if old_options.get(name) != value
+                        ),
+                    )
+                    configured += 1
+                    changed = True
+                if not changed:
+                    kept += 1
+                new_items[prim.key] = (item, prim)
+        doomed.extend(item for item, _ in old_items.values())
+        if doomed:
+            calls.delete(doomed)
+        if creations:
+            # New items were put on top, restore the stacking order of the scene.
+            for layer in layers[1:]:
+                calls.raise_tag(layer)
+        for item, prim in zip(calls.flush(), creations):
+            new_items[prim.key] = (item, prim)
+        self.items = new_items
+        self.last = DiffStats(
+            len(creations), moved, configured, len(doomed), kept, shifted
+        )
+        return self.last
+
+    def _layer_shift(self, group: List[Prim]) -> Optional[Tuple[float, float]]:
+        """Get (dx, dy) most existing items of a layer moved by, if any.
+
+        Returns None unless more than one item moved that way and they
+        outnumber the items that did not (which are then moved one by one).
+        """
+        shift = None
+        matches = misses = 0
+        for prim in group:
+            old = self.items.get(prim.key)
+            if old is None:
+                continue
+            old_prim = old[1]
+            if shift is None:
+                if old_prim.shape != prim.shape:
+                    continue
+                shift = (
+                    prim.coords[0] - old_prim.coords[0],
+                    prim.coords[1] - old_prim.coords[1],
+                )
+                if shift == (0, 0):
+                    return None
+            if self._shifted(old_prim, prim, *shift):
+                matches += 1
+            else:
+                misses += 1
+        return shift if matches > 1 and matches > misses else None
+
+    @staticmethod
+    def _shifted(old_prim: Prim, prim: Prim, dx: float, dy: float) -> bool:
+        """Check if moving old_prim by dx, dy puts it where prim is."""
+        old_coords = old_prim.coords
+        coords = prim.coords
+        if len(old_coords) != len(coords) or old_prim.shape != prim.shape:
+            return False
+        for ndx in range(0, len(coords), 2):
+            if coords[ndx] - old_coords[ndx] != dx:
+                return False
+            if coords[ndx + 1] - old_coords[ndx + 1] != dy:
+                return False
+        return True
+
+    def forget(self):
+        """Forget items (for when they were deleted from canvas some other way)."""
+        self.items = {}
@@ -0,0 +1,409 @@
+"""Render charts to SVG or PNG files without tkinter.
+
+A chart window is four canvases: candles, price labels to the right, time
+labels below, and the little scale canvas in the corner. The headless
+renderer lays the same scenes (see the scene module) out as panels of one
+image, so files look like the chart would at its home position, with the
+same geometry, colors and labels.
+
+SVG is written by plain Python. PNG needs Pillow (pip install Pillow).
+
+Synopsis:
+    geo = GeoCandles(pair=Pair.EUR_USD, gran=Gran.D, width=1000, height=600)
+    save_snapshot(GeoSnapshot.take(geo), "eur_usd_daily.svg")
+
+    # Every pair on a few grans, spread over a process pool.
+    export_charts("reports", grans=[Gran.D, Gran.H4], token=token)
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from forex_types import Pair
+from oanda_candles import CandleMeister, Gran, QuoteKind
+
+from oanda_chart.env.const import Color, Const
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render.prim import Prim, Shape
+from oanda_chart.render.scene import chart_scene, price_scene, scale_scene, time_scene
+
+
+class Panel(NamedTuple):
+    """Part of the image showing what one canvas of the chart would."""
+
+    # Where the panel goes in the image.
+    x: int
+    y: int
+    width: int
+    height: int
+    background: str
+    # Scroll coordinates of the top left corner of the canvas view.
+    view_x: int
+    view_y: int
+    prims: List[Prim]
+
+
+class ImageFormat:
+    SVG = "svg"
+    PNG = "png"
+
+
+# Pixels per point of Tk font sizes (Tk's usual scaling at 96 dpi).
+FONT_SCALE = 4 / 3
+
+# Anchors of Tk text items, as (svg text-anchor, Pillow anchor).
+ANCHORS: Dict[str, Tuple[str, str]] = {
+    "center": ("middle", "mm"),
+    "n": ("middle", "mt"),
+    "s": ("middle", "mb"),
+    "w": ("start", "lm"),
+    "e": ("end", "rm"),
+    "nw": ("start", "lt"),
+    "ne": ("end", "rt"),
+    "sw": ("start", "lb"),
+    "se": ("end", "rb"),
+}
+
+
+def chart_panels(snapshot: GeoSnapshot) -> List[Panel]:
+    """Get the four canvases of a chart at its home view, laid out as panels."""
+    # The canvases are scrolled to a third of their scroll region.
+    view_x = round(snapshot.scroll_width * Const.ONE_THIRD)
+    view_y = round(snapshot.scroll_height * Const.ONE_THIRD)
+    width = snapshot.width
+    height = snapshot.height
+    price_width = Const.PRICE_CANVAS_WIDTH
+    time_height = Const.TIME_CANVAS_HEIGHT
+    return [
+        Panel(
+            0,
+            0,
+            width,
+            height,
+            Color.BACKGROUND,
+            view_x,
+            view_y,
+            chart_scene(snapshot, view_x, view_y),
+        ),
+        Panel(
+            width,
+            0,
+            price_width,
+            height,
+            Color.PRICE_BG,
+            0,
+            view_y,
+            price_scene(snapshot),
+        ),
+        Panel(
+            0,
+            height,
+            width,
+            time_height,
+            Color.TIME_BG,
+            view_x,
+            0,
+            time_scene(snapshot),
+        ),
+        Panel(
+            width,
+            height,
+            price_width,
+            time_height,
+            Color.TIME_BG,
+            0,
+            0,
+            scale_scene(snapshot),
+        ),
+    ]
+
+
+def image_size(panels: List[Panel]) -> Tuple[int, int]:
+    width = max(panel.x + panel.width for panel in panels)
+    height = max(panel.y + panel.height for panel in panels)
+    return width, height
+
+
+def render_svg(snapshot: GeoSnapshot) -> str:
+    """Get SVG document of the chart in snapshot."""
+    panels = chart_panels(snapshot)
+    width, height = image_size(panels)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" viewBox="0 0 {width} {height}">\n'
+    ]
+    for ndx, panel in enumerate(panels):
+        clip = f"panel{ndx}"
+        parts.append(
+            f'<clipPath id="{clip}"><rect x="{panel.x}" y="{panel.y}" '
+            f'width="{panel.width}" height="{panel.height}"/></clipPath>\n'
+            f'<rect x="{panel.x}" y="{panel.y}" width="{panel.width}" '
+            f'height="{panel.height}" fill="{panel.background}"/>\n'
+            f'<g clip-path="url(#{clip})" transform="translate('
+            f'{panel.x - panel.view_x},{panel.y - panel.view_y})">\n'
+        )
+        parts.extend(_svg_element(prim) for prim in panel.prims)
+        parts.append("</g>\n")
+    parts.append("</svg>\n")
+    return "".join(parts)
+
+
+def render_png(snapshot: GeoSnapshot) -> bytes:
+    """Get PNG image of the chart in snapshot.
+
+    Raises:
+        ImportError: when Pillow is not installed.
+    """
+    try:
+        from PIL import Image, ImageDraw
+    except ImportError as error:
+        raise ImportError(
+            "PNG output needs Pillow (pip install Pillow), SVG does not."
+        ) from error
+    from io import BytesIO
+
+    panels = chart_panels(snapshot)
+    image = Image.new("RGB", image_size(panels), Color.BACKGROUND)
+    for panel in panels:
+        layer = Image.new("RGB", (panel.width, panel.height), panel.background)
+        draw = ImageDraw.Draw(layer)
+        for prim in panel.prims:
+            _png_draw(draw, prim, -panel.view_x, -panel.view_y)
+        image.paste(layer, (panel.x, panel.y))
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def save_snapshot(snapshot: GeoSnapshot, path: Union[Path, str]) -> Path:
+    """Write chart in snapshot to path, as PNG or SVG going by its suffix.
+
+    Raises:
+        ValueError: when suffix is neither .svg nor .png.
+    """
+    path = Path(path)
+    image_format = path.suffix.lower().lstrip(".")
+    if image_format == ImageFormat.SVG:
+        path.write_text(render_svg(snapshot), encoding="utf-8")
+    elif image_format == ImageFormat.PNG:
+        path.write_bytes(render_png(snapshot))
+    else:
+        raise ValueError(f"Unknown image format: {path.suffix}")
+    return path
+
+
+def export_chart(
+    pair: Pair,
+    gran: Gran,
+    directory: Union[Path, str],
+    quote_kind: QuoteKind = QuoteKind.MID,
+    width: int = 1200,
+    height: int = 700,
+    image_format: str = ImageFormat.SVG,
+) -> Path:
+    """Write image of most recent candles of pair and gran into directory.
+
+    Returns:
+        path of the image, named like EUR_USD_H4.svg
+    """
+    geo = GeoCandles(
+        width=width, height=height, pair=pair, gran=gran, quote_kind=quote_kind
+    )
+    path = Path(directory).joinpath(f"{pair}_{gran}.{image_format}")
+    return save_snapshot(GeoSnapshot.take(geo), path)
+
+
+def export_charts(
+    directory: Union[Path, str],
+    pairs: Optional[Iterable[Pair]] = None,
+    grans: Iterable[Gran] = (Gran.D,),
+    quote_kind: QuoteKind = QuoteKind.MID,
+    width: int = 1200,
+    height: int = 700,
+    image_format: str = ImageFormat.SVG,
+    token: Optional[str] = None,
+    real: bool = False,
+    processes: Optional[int] = None,
+) -> List[Path]:
+    """Export an image of every pair and gran combination, in parallel.
+
+    Args:
+        directory: folder images are written to (created if need be).
+        pairs: pairs to export (all of them if None).
+        grans: grans to export each pair at.
+        quote_kind: kind of prices candles are drawn for.
+        width: width of candle area in pixels (images are a bit larger).
+        height: height of candle area in pixels.
+        image_format: ImageFormat.SVG or ImageFormat.PNG.
+        token: oanda V20 access token each process initializes with (None
+               if CandleMeister is already set up in processes that fork).
+        real: True for a real account, False for a practice account.
+        processes: size of process pool (defaults to number of CPUs).
+    Returns:
+        paths of images written, in order of pairs then grans.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    pairs = list(Pair.iter_pairs()) if pairs is None else list(pairs)
+    jobs = [(pair, gran) for pair in pairs for gran in grans]
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_process, initargs=(token, real)
+    ) as executor:
+        # Pair and Gran objects do not pickle, so they are sent by name.
+        futures = [
+            executor.submit(
+                _export_job,
+                str(pair),
+                str(gran),
+                directory,
+                str(quote_kind),
+                width,
+                height,
+                image_format,
+            )
+            for pair, gran in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _init_process(token: Optional[str], real: bool):
+    if token is not None:
+        CandleMeister.init_meister(token, real=real)
+
+
+def _export_job(
+    pair: str,
+    gran: str,
+    directory: Path,
+    quote_kind: str,
+    width: int,
+    height: int,
+    image_format: str,
+) -> Path:
+    return export_chart(
+        Pair(pair),
+        getattr(Gran, gran),
+        directory,
+        getattr(QuoteKind, quote_kind.upper()),
+        width,
+        height,
+        image_format,
+    )
+
+
+def _font(font: Tuple) -> Tuple[str, float, str]:
+    """Get family, pixel size and weight of a Tk font tuple."""
+    family, size = font[0], font[1]
+    weight = "bold" if "bold" in font[2:] else "normal"
+    # Positive Tk sizes are points, negative ones pixels.
+    pixels = size * FONT_SCALE if size > 0 else -size
+    return family, pixels, weight
+
+
+def _svg_element(prim: Prim) -> str:
+    options: Dict[str, Any] = dict(prim.options)
+    coords = prim.coords
+    if prim.shape == Shape.LINE:
+        stroke = (
+            f'stroke="{options.get("fill", "black")}" '
+            f'stroke-width="{options.get("width", 1)}"'
+        )
+        if len(coords) > 4:
+            return f'<polyline points="{_points(coords)}" fill="none" {stroke}/>\n'
+        x1, y1, x2, y2 = coords
+        return f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" {stroke}/>\n'
+    if prim.shape == Shape.POLYGON:
+        outline = options.get("outline")
+        stroke = f' stroke="{outline}"' if outline else ""
+        return (
+            f'<polygon points="{_points(coords)}" '
+            f'fill="{options.get("fill", "black")}"{stroke}/>\n'
+        )
+    if prim.shape == Shape.RECTANGLE:
+        x1, y1, x2, y2 = coords
+        outline = options.get("outline", "black")
+        width = options.get("width", 1)
+        stroke = f' stroke="{outline}" stroke-width="{width}"' if width else ""
+        return (
+            f'<rect x="{min(x1, x2)}" y="{min(y1, y2)}" width="{abs(x2 - x1)}" '
+            f'height="{abs(y2 - y1)}" fill="{options.get("fill", "none")}"'
+            f"{stroke}/>\n"
+        )
+    if prim.shape == Shape.TEXT:
+        x, y = coords
+        family, pixels, weight = _font(options["font"])
+        anchor = ANCHORS[options.get("anchor", "center")][0]
+        return (
+            f'<text x="{x}" y="{y}" fill="{options.get("fill", "black")}" '
+            f'font-family="{escape(family)}" font-size="{pixels:g}" '
+            f'font-weight="{weight}" text-anchor="{anchor}" '
+            f'dominant-baseline="central">{escape(str(options["text"]))}</text>\n'
+        )
+    raise ValueError(f"Unknown shape: {prim.shape}")
+
+
+def _points(coords: Tuple[float, ...]) -> str:
+    """Get SVG points attribute of flat x, y coordinates."""
+    return " ".join(f"{x},{y}" for x, y in zip(coords[0::2], coords[1::2]))
+
+
+def _png_draw(draw, prim: Prim, dx: int, dy: int):
+    options: Dict[str, Any] = dict(prim.options)
+    coords = [
+        value + (dx if ndx % 2 == 0 else dy) for ndx, value in enumerate(prim.coords)
+    ]
+    if prim.shape == Shape.LINE:
+        width = max(1, round(options.get("width", 1)))
+        draw.line(coords, fill=options.get("fill", "black"), width=width)
+    elif prim.shape == Shape.POLYGON:
+        draw.polygon(
+            coords, fill=options.get("fill", "black"), outline=options.get("outline")
+        )
+    elif prim.shape == Shape.RECTANGLE:
+        x1, y1, x2, y2 = coords
+        width = round(options.get("width", 1))
+        # Tk fills up to but not including x2 and y2, Pillow includes them.
+        box = [min(x1, x2), min(y1, y2), max(x1, x2) - 1, max(y1, y2) - 1]
+        outline = options.get("outline", "black") if width else None
+        draw.rectangle(box, fill=options.get("fill"), outline=outline, width=width)
+    elif prim.shape == Shape.TEXT:
+        draw.text(
+            coords,
+            str(options["text"]),
+            fill=options.get("fill", "black"),
+            font=_png_font(options["font"]),
+            anchor=ANCHORS[options.get("anchor", "center")][1],
+        )
+    else:
+        raise ValueError(f"Unknown shape: {prim.shape}")
+
+
+_PNG_FONTS: Dict[Tuple, Any] = {}
+
+
+def _png_font(font: Tuple):
+    """Get Pillow font for Tk font tuple (default font if family is missing)."""
+    if font not in _PNG_FONTS:
+        from PIL import ImageFont
+
+        family, pixels, weight = _font(font)
+        names = [f"{family} Bold" if weight == "bold" else family, family]
+        names.append("DejaVuSans-Bold" if weight == "bold" else "DejaVuSans")
+        for name in names:
+            try:
+                _PNG_FONTS[font] = ImageFont.truetype(name, round(pixels))
+                break
+            except OSError:
+                continue
+        else:
+            _PNG_FONTS[font] = ImageFont.load_default()
+    return _PNG_FONTS[font]
@@ -0,0 +1,54 @@
+"""Typed drawing primitives that canvases are rendered from.
+
+Instead of calling create_line and friends directly, canvases are described
+as a flat list of Prim objects (see the scene module), and a CanvasDiffer
+turns the difference between two such lists into Tk calls.
+
+Every Prim has a key that stays the same from one frame to the next for the
+"same" thing, for example the wick of the candle at a given time. The first
+element of the key is the canvas tag (layer) the item belongs to.
+"""
+
+
+from typing import Any, Hashable, NamedTuple, Tuple
+
+
+class Shape:
+    LINE = "line"
+    POLYGON = "polygon"
+    RECTANGLE = "rectangle"
+    TEXT = "text"
+
+
+class Prim(NamedTuple):
+    key: Tuple[Hashable, ...]
+    shape: str
+    coords: Tuple[float, ...]
+    # (name, value) pairs sorted by name, so equal options compare equal.
+    options: Tuple[Tuple[str, Any], ...]
+
+    @classmethod
+    def line(cls, key: Tuple[Hashable, ...], *coords: float, **options) -> "Prim":
+        return cls(key, Shape.LINE, coords, cls.pack(key, options))
+
+    @classmethod
+    def polygon(cls, key: Tuple[Hashable, ...], *coords: float, **options) -> "Prim":
+        return cls(key, Shape.POLYGON, coords, cls.pack(key, options))
+
+    @classmethod
+    def rectangle(cls, key: Tuple[Hashable, ...], *coords: float, **options) -> "Prim":
+        return cls(key, Shape.RECTANGLE, coords, cls.pack(key, options))
+
+    @classmethod
+    def text(cls, key: Tuple[Hashable, ...], *coords: float, **options) -> "Prim":
+        return cls(key, Shape.TEXT, coords, cls.pack(key, options))
+
+    @property
+    def layer(self) -> str:
+        return self.key[0]
+
+    @staticmethod
+    def pack(key: Tuple[Hashable, ...], options: dict) -> Tuple[Tuple[str, Any], ...]:
+        """Sort options into a tuple, tagging item with its layer."""
+        options["tags"] = key[0]
+        return tuple(sorted(options.items()))
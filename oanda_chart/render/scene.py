@@ -0,0 +1,593 @@
+"""Build the Prim lists (scenes) each canvas of a chart is drawn from.
+
+The functions here only read a GeoSnapshot, so they do not need tkinter.
+Order matters: prims later in a scene are drawn on top of earlier ones.
+
+Candles are keyed by their time and annotations by their id. The badge,
+mist, grid and label layers are keyed by slot instead, so their items
+persist and are only moved (or get new text) as the chart is dragged, and
+items are only created or deleted when the number of grid lines changes.
+
+Candles are drawn in one of the RenderMode ways. Candles take two items per
+candle and OHLC bars one, while the close line and the high/low area are a
+single item however many candles there are (the cheap choice for charts
+zoomed far out).
+"""
+
+
+from time import strftime
+from typing import List, NamedTuple, Optional, Tuple
+
+from oanda_candles import Candle, Gran
+
+from oanda_chart.env.const import (
+    CandleColor,
+    Color,
+    Const,
+    RenderMode,
+    Tag,
+    UnfinishedCandleColor,
+)
+from oanda_chart.env.fonts import Fonts
+from oanda_chart.geo.geo_snapshot import GeoSnapshot, price_parse
+from oanda_chart.render.prim import Prim
+from oanda_chart.util.candle_stats import CandleStats
+
+
+def chart_scene(snapshot: GeoSnapshot, view_x: float, view_y: float) -> List[Prim]:
+    """Get prims of the chart canvas.
+
+    Args:
+        snapshot: geometry to draw.
+        view_x: scroll x coordinate of left edge of the canvas view.
+        view_y: scroll y coordinate of top edge of the canvas view.
+    Returns:
+        badge, mist, time grid, price grid, candle, indicator and annotation
+        prims (bottom to top).
+    """
+    scene = badge_prims(snapshot, view_x, view_y)
+    scene.extend(mist_prims(snapshot))
+    scene.extend(time_grid_prims(snapshot))
+    scene.extend(price_grid_prims(snapshot))
+    scene.extend(candle_prims(snapshot))
+    scene.extend(indicator_prims(snapshot, view_x, view_y))
+    scene.extend(annotation_prims(snapshot))
+    return scene
+
+
+def badge_prims(snapshot: GeoSnapshot, view_x: float, view_y: float) -> List[Prim]:
+    """Get pair and gran text drawn faintly in middle of the canvas view."""
+    if snapshot.height > 820 and snapshot.width > 1700:
+        font_big = Fonts.TITAN
+        font_small = Fonts.GIANT
+        y_offset = 200
+    elif snapshot.height > 500 and snapshot.width > 1000:
+        font_big = Fonts.GIANT
+        font_small = Fonts.HUGE
+        y_offset = 100
+    elif snapshot.height > 200 and snapshot.width > 400:
+        font_big = Fonts.HUGE
+        font_small = Fonts.BIG
+        y_offset = 60
+    else:
+        font_big = Fonts.BIG
+        font_small = Fonts.BIG
+        y_offset = 30
+    x = view_x + round(snapshot.width / 2)
+    y = view_y + round(snapshot.height / 2)
+    text_big, text_small = snapshot.badge
+    return [
+        Prim.text(
+            (Tag.BADGE, "big"),
+            x,
+            y - y_offset,
+            text=text_big,
+            fill=Color.BADGE,
+            font=font_big,
+            justify="center",
+        ),
+        Prim.text(
+            (Tag.BADGE, "small"),
+            x,
+            y + y_offset,
+            text=text_small,
+            fill=Color.BADGE,
+            font=font_small,
+            justify="center",
+        ),
+    ]
+
+
+def mist_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    return [
+        Prim.rectangle((Tag.MIST, side), *box, fill=Color.MIST)
+        for side, *box in snapshot.mist
+    ]
+
+
+def time_grid_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    bottom = snapshot.scroll_height
+    return [
+        Prim.line((Tag.TIME_GRID, ndx), x, 0, x, bottom, fill=Color.GRID)
+        for ndx, x in enumerate(snapshot.time_lines)
+    ]
+
+
+def price_grid_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    right = snapshot.scroll_width
+    return [
+        Prim.line((Tag.PRICE_GRID, ndx), 0, label.y, right, label.y, fill=Color.GRID)
+        for ndx, label in enumerate(snapshot.price_grid)
+    ]
+
+
+def candle_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get prims of the candles, drawn in the render mode of the snapshot."""
+    return CANDLE_SCENES[snapshot.render_mode](snapshot)
+
+
+def body_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get a wick and a body per candle (RenderMode.CANDLES)."""
+    # Keyed by candle time, so scrolling only moves the candles.
+    offset = snapshot.offset
+    far_side = offset.far_side()
+    wick = offset.wick()
+    candles = snapshot.candles
+    prims = []
+    left = candles.left
+    for ndx, (o, h, l, c, direction) in enumerate(
+        zip(candles.o, candles.h, candles.l, candles.c, candles.direction)
+    ):
+        candle = candles.get_candle(ndx)
+        time = candle.time
+        right = left + far_side
+        middle = left + wick
+        color = CandleColor if candle.complete else UnfinishedCandleColor
+        prims.append(
+            Prim.line((Tag.CANDLE, time, "wick"), middle, l, middle, h, fill=color.WICK)
+        )
+        body = (Tag.CANDLE, time, "body")
+        if direction > 0:
+            prims.append(
+                Prim.rectangle(body, left, o, right, c, fill=color.BULL, width=0.0)
+            )
+        elif direction < 0:
+            prims.append(
+                Prim.rectangle(body, left, c, right, o, fill=color.BEAR, width=0.0)
+            )
+        else:
+            prims.append(Prim.line(body, left, o, right, o, fill=color.DOJI))
+        left += offset
+    return prims
+
+
+def bar_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get one OHLC bar line per candle (RenderMode.BARS).
+
+    The open tick, high to low stroke and close tick are a single polyline,
+    so a bar is one item with no fill, where a candle is two.
+    """
+    offset = snapshot.offset
+    far_side = offset.far_side()
+    wick = offset.wick()
+    candles = snapshot.candles
+    prims = []
+    left = candles.left
+    for ndx, (o, h, l, c, direction) in enumerate(
+        zip(candles.o, candles.h, candles.l, candles.c, candles.direction)
+    ):
+        candle = candles.get_candle(ndx)
+        middle = left + wick
+        color = CandleColor if candle.complete else UnfinishedCandleColor
+        if direction > 0:
+            fill = color.BULL
+        elif direction < 0:
+            fill = color.BEAR
+        else:
+            fill = color.DOJI
+        prims.append(
+            Prim.line(
+                (Tag.CANDLE, candle.time, "bar"),
+                left,
+                o,
+                middle,
+                o,
+                middle,
+                h,
+                middle,
+                l,
+                middle,
+                c,
+                left + far_side,
+                c,
+                fill=fill,
+            )
+        )
+        left += offset
+    return prims
+
+
+def close_line_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get a single line through the closes of all candles (RenderMode.LINE)."""
+    candles = snapshot.candles
+    if len(candles) < 2:
+        return body_prims(snapshot)
+    coords = _middle_coords(snapshot, candles.c)
+    return [Prim.line((Tag.CANDLE, "line"), *coords, fill=CandleColor.LINE)]
+
+
+def area_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get a single polygon from the highs down to the lows (RenderMode.AREA)."""
+    candles = snapshot.candles
+    if len(candles) < 2:
+        return body_prims(snapshot)
+    highs = _middle_coords(snapshot, candles.h)
+    lows = _middle_coords(snapshot, candles.l)
+    # Back along the lows from the right, to close the outline.
+    for ndx in range(len(lows) - 2, -1, -2):
+        highs.extend((lows[ndx], lows[ndx + 1]))
+    return [
+        Prim.polygon(
+            (Tag.CANDLE, "area"),
+            *highs,
+            fill=CandleColor.AREA,
+            outline=CandleColor.LINE,
+        )
+    ]
+
+
+CANDLE_SCENES = {
+    RenderMode.CANDLES: body_prims,
+    RenderMode.BARS: bar_prims,
+    RenderMode.LINE: close_line_prims,
+    RenderMode.AREA: area_prims,
+}
+
+
+def indicator_prims(snapshot: GeoSnapshot, view_x: float, view_y: float) -> List[Prim]:
+    """Get indicator polylines, overlays over candles and others in a pane.
+
+    The pane is the bottom INDICATOR_PANE part of the canvas view, so unlike
+    overlays it stays put when the view is dragged up or down.
+    """
+    prims = []
+    pane_height = round(snapshot.height * Const.INDICATOR_PANE)
+    pane_top = view_y + snapshot.height - pane_height
+    for line in snapshot.indicators:
+        for ndx, segment in enumerate(line.segments):
+            if not line.overlay:
+                segment = tuple(
+                    value if pos % 2 == 0 else pane_top + value * pane_height
+                    for pos, value in enumerate(segment)
+                )
+            prims.append(
+                Prim.line((Tag.INDICATOR, line.name, ndx), *segment, fill=line.color)
+            )
+    if any(not line.overlay for line in snapshot.indicators):
+        prims.append(
+            Prim.line(
+                (Tag.INDICATOR, "pane"),
+                view_x,
+                pane_top,
+                view_x + snapshot.width,
+                pane_top,
+                fill=Color.GRID,
+            )
+        )
+    return prims
+
+
+def annotation_prims(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get lines of the annotations in the snapshot, keyed by annotation id."""
+    return [
+        Prim.line((Tag.ANNOTATION, _.id), *_.coords, fill=_.color)
+        for _ in snapshot.annotations
+    ]
+
+
+def price_scene(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get prims of the price label canvas."""
+    prims = []
+    for key, label in enumerate(snapshot.price_grid):
+        prims.append(
+            Prim.text(
+                (Tag.PRICE_LABEL, key, "front"),
+                4,
+                label.y,
+                text=label.front,
+                fill=Color.DOLLAR_TEXT,
+                anchor="w",
+                font=Fonts.FIXED_12,
+            )
+        )
+        prims.append(
+            Prim.text(
+                (Tag.PRICE_LABEL, key, "pips"),
+                45,
+                label.y,
+                text=label.pips,
+                fill=Color.PIP_TEXT,
+                anchor="w",
+                font=Fonts.FIXED_12,
+            )
+        )
+        prims.append(
+            Prim.text(
+                (Tag.PRICE_LABEL, key, "frac_pips"),
+                66,
+                label.y - 2,
+                text=label.frac_pips,
+                fill=Color.FPIP_TEXT,
+                anchor="w",
+                font=Fonts.FIXED_10,
+            )
+        )
+    return prims
+
+
+def time_scene(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get prims of the time label canvas."""
+    prims = []
+    for ndx, label in enumerate(snapshot.time_labels):
+        prims.append(
+            Prim.text(
+                (Tag.TIME_TEXT, ndx, "upper"),
+                label.x,
+                10,
+                text=label.upper,
+                fill=Color.TIME_TEXT,
+                font=Fonts.REGULAR,
+            )
+        )
+        prims.append(
+            Prim.text(
+                (Tag.TIME_TEXT, ndx, "lower"),
+                label.x,
+                30,
+                text=label.lower,
+                fill=Color.TIME_TEXT,
+                font=Fonts.REGULAR,
+            )
+        )
+    return prims
+
+
+def scale_scene(snapshot: GeoSnapshot) -> List[Prim]:
+    """Get prims of the little scale canvas in the corner."""
+    if snapshot.scale_text is None:
+        return []
+    width = Const.PRICE_CANVAS_WIDTH
+    height = Const.TIME_CANVAS_HEIGHT
+    pip_text, time_text = snapshot.scale_text
+    return [
+        Prim.line((Tag.SCALE_ITEM, "top"), 0, 0, width, 0, fill=Color.SLASH),
+        Prim.line((Tag.SCALE_ITEM, "left"), 0, 0, 0, height, fill=Color.SLASH),
+        Prim.line((Tag.SCALE_ITEM, "slash"), 0, 0, width, height, fill=Color.SLASH),
+        Prim.text(
+            (Tag.SCALE_ITEM, "pips"),
+            57,
+            8,
+            text=pip_text,
+            fill=Color.SCALE_TEXT,
+            font=Fonts.FIXED_10,
+        ),
+        Prim.text(
+            (Tag.SCALE_ITEM, "time"),
+            29,
+            34,
+            text=time_text,
+            fill=Color.SCALE_TEXT,
+            font=Fonts.FIXED_10,
+        ),
+    ]
+
+
+class HoverScenes(NamedTuple):
+    """Prims of the hover layer of the chart, price and time canvases."""
+
+    chart: List[Prim]
+    prices: List[Prim]
+    times: List[Prim]
+
+
+def hover_scenes(
+    snapshot: GeoSnapshot,
+    x: Optional[float],
+    y: Optional[float],
+    view_x: float,
+    view_y: float,
+) -> HoverScenes:
+    """Get crosshair and tooltip at scroll coordinates x, y (None for hidden).
+
+    The crosshair snaps to the middle of the candle under x, which is found
+    by arithmetic on the snapshot (no search), and the tooltip gives that
+    candle's time and prices. The keys are always the same, with hidden
+    items kept rather than deleted, so hovering never creates or deletes
+    items: it only moves them and changes their text.
+    """
+    shown = x is not None and y is not None
+    candle = snapshot.candle_at_x(int(x)) if shown else None
+    if candle is not None:
+        x = candle.x + snapshot.offset.wick()
+        tooltip = _tooltip(candle.candle, snapshot)
+        time_text = _hover_time(candle.candle, snapshot.gran)
+    else:
+        x, y = (x, y) if shown else (0, 0)
+        tooltip = time_text = ""
+    price_text = "".join(price_parse(snapshot.y_to_fp(y), snapshot.pair.quote))
+    state = "normal" if shown else "hidden"
+    tip_state = state if tooltip else "hidden"
+    # Half the width of the time marker box.
+    half_width = len(time_text) * 3 + 6
+    return HoverScenes(
+        chart=[
+            Prim.line(
+                (Tag.HOVER, "vertical"),
+                x,
+                0,
+                x,
+                snapshot.scroll_height,
+                fill=Color.CROSSHAIR,
+                dash=(2, 2),
+                state=state,
+            ),
+            Prim.line(
+                (Tag.HOVER, "horizontal"),
+                0,
+                y,
+                snapshot.scroll_width,
+                y,
+                fill=Color.CROSSHAIR,
+                dash=(2, 2),
+                state=state,
+            ),
+            Prim.text(
+                (Tag.HOVER, "tooltip"),
+                view_x + 6,
+                view_y + 6,
+                text=tooltip,
+                fill=Color.HOVER_TEXT,
+                anchor="nw",
+                font=Fonts.FIXED_10,
+                state=tip_state,
+            ),
+        ],
+        prices=[
+            Prim.rectangle(
+                (Tag.HOVER, "box"),
+                0,
+                y - 9,
+                Const.PRICE_CANVAS_WIDTH,
+                y + 9,
+                fill=Color.HOVER_BG,
+                width=0.0,
+                state=state,
+            ),
+            Prim.text(
+                (Tag.HOVER, "price"),
+                4,
+                y,
+                text=price_text,
+                fill=Color.HOVER_TEXT,
+                anchor="w",
+                font=Fonts.FIXED_12,
+                state=state,
+            ),
+        ],
+        times=[
+            Prim.rectangle(
+                (Tag.HOVER, "box"),
+                x - half_width,
+                0,
+                x + half_width,
+                20,
+                fill=Color.HOVER_BG,
+                width=0.0,
+                state=tip_state,
+            ),
+            Prim.text(
+                (Tag.HOVER, "time"),
+                x,
+                10,
+                text=time_text,
+                fill=Color.HOVER_TEXT,
+                font=Fonts.REGULAR,
+                state=tip_state,
+            ),
+        ],
+    )
+
+
+def selection_prims(
+    snapshot: GeoSnapshot,
+    selection: Optional[Tuple[int, int]],
+    view_x: float,
+    view_y: float,
+) -> List[Prim]:
+    """Get box around selected candles and their stats (hidden for None).
+
+    Args:
+        snapshot: geometry to draw.
+        selection: start times of the candles at either end of the selection.
+        view_x: scroll x coordinate of left edge of the canvas view.
+        view_y: scroll y coordinate of top edge of the canvas view.
+    Returns:
+        the same two prims whatever the selection, so dragging a selection
+        only moves the box and changes the text.
+    """
+    stats = None
+    x1 = x2 = 0
+    if selection is not None:
+        stats = snapshot.selection_stats(*selection)
+        time1, time2 = sorted(selection)
+        ndx1 = snapshot.candle_ndx_at_time(time1)
+        ndx2 = snapshot.candle_ndx_at_time(time2)
+        if ndx1 is not None:
+            x1 = snapshot.candles[ndx1].x
+            x2 = snapshot.candles[ndx2].x + snapshot.offset
+    box_state = "normal" if selection is not None and x2 > x1 else "hidden"
+    return [
+        Prim.rectangle(
+            (Tag.SELECTION, "box"),
+            x1,
+            0,
+            x2,
+            snapshot.scroll_height,
+            outline=Color.SELECTION,
+            dash=(4, 2),
+            state=box_state,
+        ),
+        Prim.text(
+            (Tag.SELECTION, "stats"),
+            view_x + snapshot.width - 6,
+            view_y + 6,
+            text="" if stats is None else _selection_text(stats, snapshot),
+            fill=Color.HOVER_TEXT,
+            anchor="ne",
+            justify="right",
+            font=Fonts.FIXED_10,
+            state="hidden" if stats is None else "normal",
+        ),
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _middle_coords(snapshot: GeoSnapshot, ys) -> List[float]:
+    """Get flat x, y coordinates of ys at the middle of each candle."""
+    offset = snapshot.offset
+    x = snapshot.candles.left + offset.wick()
+    coords = []
+    for y in ys:
+        coords.append(x)
+        coords.append(y)
+        x += offset
+    return coords
+
+
+def _tooltip(candle: Candle, snapshot: GeoSnapshot) -> str:
+    ohlc = candle.quote(snapshot.quote_kind)
+    return (
+        f"{_hover_time(candle, snapshot.gran)}  "
+        f"O {ohlc.o}  H {ohlc.h}  L {ohlc.l}  C {ohlc.c}"
+    )
+
+
+def _selection_text(stats: CandleStats, snapshot: GeoSnapshot) -> str:
+    quote = snapshot.pair.quote
+    return (
+        f"{stats.count} candles\n"
+        f"High {''.join(price_parse(stats.high, quote))}\n"
+        f"Low {''.join(price_parse(stats.low, quote))}\n"
+        f"Net {stats.net_pips:+.1f} pips\n"
+        f"Avg range {stats.avg_range_pips:.1f} pips"
+    )
+
+
+def _hover_time(candle: Candle, gran: Gran) -> str:
+    """Get candle time as text (no time of day for daily and longer candles)."""
+    pattern = "%Y-%m-%d" if gran.duration >= Gran.D.duration else "%Y-%m-%d %H:%M"
+    return strftime(pattern, candle.time.get_struct_time())
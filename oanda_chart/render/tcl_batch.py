@@ -0,0 +1,97 @@
+"""Send a whole frame of canvas changes to Tcl as one script.
+
+Each tkinter Canvas method call is its own Python to Tcl round trip, with
+the option dict converted to Tcl arguments every time. For a chart with
+thousands of candles that adds up. A TclBatch writes the same commands into
+a script instead, and runs it all with a single tk.eval when flushed. The
+ids of created items come back as the result of the script.
+
+TclBatch and CanvasCalls (its one call at a time counterpart in the differ
+module) have the same methods, so a CanvasDiffer can use either.
+"""
+
+
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Sequence, Tuple
+
+Options = Tuple[Tuple[str, Any], ...]
+
+# Characters that would otherwise be substituted or split words in Tcl.
+TCL_SPECIAL = re.compile(r'[\\\s{}\[\]$";]')
+TCL_ESCAPES = {"\n": "\\n", "\t": "\\t", "\r": "\\r"}
+
+
+def tcl_word(value: Any) -> str:
+    """Quote value as a single Tcl word (tuples and lists become Tcl lists)."""
+    if isinstance(value, (tuple, list)):
+        return tcl_word(" ".join(tcl_word(element) for element in value))
+    text = str(value)
+    if not text:
+        return "{}"
+    return TCL_SPECIAL.sub(
+        lambda match: TCL_ESCAPES.get(match.group(), "\\" + match.group()), text
+    )
+
+
+@lru_cache(maxsize=1024)
+def tcl_options(options: Options) -> str:
+    """Get options as Tcl arguments (cached, scenes repeat the same few a lot)."""
+    return " ".join(f"-{name} {tcl_word(value)}" for name, value in options)
+
+
+class TclBatch:
+
+    # Tcl variable the ids of created items are collected in.
+    IDS_VAR = "::oanda_chart_ids"
+
+    def __init__(self, canvas):
+        """Initialize batch for canvas (a tkinter Canvas)."""
+        self.canvas = canvas
+        self.path: str = str(canvas)
+        self.lines: List[str] = []
+        self.creates: int = 0
+
+    def create(self, shape: str, coords: Sequence[float], options: Options):
+        """Queue item creation, its id is returned by flush."""
+        self.lines.append(
+            f"lappend {self.IDS_VAR} [{self.path} create {shape} "
+            f"{' '.join(map(str, coords))} {tcl_options(options)}]"
+        )
+        self.creates += 1
+
+    def coords(self, item: int, coords: Sequence[float]):
+        self.lines.append(f"{self.path} coords {item} {' '.join(map(str, coords))}")
+
+    def move(self, tag: str, dx: float, dy: float):
+        self.lines.append(f"{self.path} move {tcl_word(tag)} {dx} {dy}")
+
+    def configure(self, item: int, options: Options):
+        self.lines.append(f"{self.path} itemconfigure {item} {tcl_options(options)}")
+
+    def delete(self, items: Iterable[int]):
+        self.lines.append(f"{self.path} delete {' '.join(map(str, items))}")
+
+    def raise_tag(self, tag: str):
+        self.lines.append(f"{self.path} raise {tcl_word(tag)}")
+
+    def flush(self) -> List[int]:
+        """Run queued commands in one tk.eval, return ids of created items."""
+        if not self.lines:
+            return []
+        if self.creates:
+            self.lines.insert(0, f"set {self.IDS_VAR} {{}}")
+            self.lines.append(f"set {self.IDS_VAR}")
+        script = "\n".join(self.lines)
+        creates = self.creates
+        self.lines = []
+        self.creates = 0
+        result = self.canvas.tk.eval(script)
+        return [int(item) for item in result.split()] if creates else []
+
+    def clear(self, tags: Iterable[str]):
+        """Delete every item with one of tags now, dropping queued commands."""
+        self.lines = []
+        self.creates = 0
+        tags = " ".join(tcl_word(tag) for tag in tags)
+        self.canvas.tk.eval(f"{self.path} delete {tags}")
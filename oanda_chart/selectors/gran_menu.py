@@ -1,8 +1,9 @@
 from tkinter import Widget, StringVar, Menubutton, Menu
 from oanda_candles import Gran
-from typing import Optional
+from typing import List, Optional
 from functools import partial
 
+from oanda_chart.util.candle_source import CandleSource
 from oanda_chart.util.syntax_candy import grid
 from oanda_chart.env.fonts import Fonts
 from oanda_chart.selectors.selector import GranSelector
@@ -28,8 +29,15 @@ class GranMenu(GranSelector):
             foreground=color.contrast,
             font=Fonts.FIXED_14,
             tearoff=False,
+            postcommand=self.build_menu,
         )
         self.menubutton["menu"] = self.menu
+        grid(self.menubutton, 0, 0)
+
+    def build_menu(self):
+        """Add menu items, the first time the menu is opened."""
+        if self.menu.index("end") is not None:
+            return
         for item in self.MENU_LAYOUT:
             if item is None:
                 self.menu.add_separator()
@@ -37,7 +45,6 @@ class GranMenu(GranSelector):
                 self.menu.add_command(
                     label=item.name, command=partial(self.gran_callback, item)
                 )
-        grid(self.menubutton, 0, 0)
 
     def set_gran(self, gran: Optional[Gran]):
         if gran is None:
@@ -50,6 +57,25 @@ class GranMenu(GranSelector):
     def gran_callback(self, gran: Gran):
         self.apply_gran(gran)
 
+    @classmethod
+    def get_warm_up_order(cls, gran: Optional[Gran]) -> List[Gran]:
+        """Get the other grans in menu, nearest neighbours of gran first.
+
+        The seconds grans are left out, their live tails go stale within
+        seconds and are fetched fresh when shown anyway.
+
+        Args:
+            gran: gran currently selected (if None, use menu order).
+        Returns:
+            list of grans in MENU_LAYOUT other than gran.
+        """
+        grans = [_ for _ in cls.MENU_LAYOUT if _ is not None]
+        if gran in grans:
+            center = grans.index(gran)
+            order = sorted(range(len(grans)), key=lambda ndx: abs(ndx - center))
+            grans = [grans[ndx] for ndx in order if ndx != center]
+        return [_ for _ in grans if _ not in CandleSource.LIVE_TAIL]
+
     MENU_LAYOUT = (
         Gran.M,
         Gran.W,
@@ -70,12 +96,9 @@ class GranMenu(GranSelector):
         Gran.M4,
         Gran.M2,
         Gran.M1,
-    )
-    """
         None,
         Gran.S30,
         Gran.S15,
         Gran.S10,
         Gran.S5,
     )
-    """
@@ -42,7 +42,6 @@ an intuitive way to go back to having nothing selected).
 from forex_types import Currency, Pair
 from magic_kind import MagicKind
 from tkinter import Frame, Label, Widget, StringVar
-from tk_oddbox import Images
 from typing import Union, Optional
 
 from oanda_chart.env.const import Event
@@ -68,11 +67,11 @@ class State(MagicKind):
     @classmethod
     def get_image(cls, state, currency: Currency):
         if state == cls.OFF:
-            return Images[f"{currency}_off"]
+            return Initializer.get_image(f"{currency}_off")
         elif state == State.ANCHOR:
-            return Images[f"{currency}_anchor"]
+            return Initializer.get_image(f"{currency}_anchor")
         elif state == State.ON:
-            return Images[f"{currency}_on"]
+            return Initializer.get_image(f"{currency}_on")
         else:
             raise ValueError(f"Unknown Selection State: {state}")
 
@@ -172,9 +171,21 @@ class PairFlags(PairSelector):
             pair = Pair.from_currency(currencies[0], currencies[1])
             if pair != previous_pair:
                 self.apply_pair(pair)
+        elif previous_pair is None:
+            # The manager prefetches the anchor when the pair changes, but
+            # picking an anchor with no pair set changes nothing.
+            self.prefetch_anchor()
         else:
             self.apply_pair(None)
 
+    def get_anchor(self) -> Optional[Currency]:
+        return self.anchor
+
+    def prefetch_anchor(self):
+        """Have the pairs of the anchor downloaded in the background."""
+        if self.anchor is not None:
+            self.manager.prefetch_anchor(self.color, self.anchor)
+
     def _update_labels(self):
         """Helper that updates label based on self.anchor and self.on"""
         for label in self.labels:
@@ -29,15 +29,21 @@ class PairMenu(PairSelector):
             foreground=color.contrast,
             font=Fonts.FIXED_14,
             tearoff=False,
+            postcommand=self.build_menu,
         )
         self.menubutton["menu"] = self.menu
+        grid(self.menubutton, 0, 0)
+
+    def build_menu(self):
+        """Add menu items, the first time the menu is opened."""
+        if self.menu.index("end") is not None:
+            return
         for pair in Pair.iter_pairs():
             self.menu.add_command(
                 label=pair.camel(), command=partial(self.pair_callback, pair)
             )
             if pair in self.SEPARATOR_AFTER:
                 self.menu.add_separator()
-        grid(self.menubutton, 0, 0)
 
     def set_pair(self, pair: Optional[Pair]):
         if pair is None:
@@ -28,8 +28,15 @@ class QuoteKindMenu(QuoteKindSelector):
             foreground=color.contrast,
             font=Fonts.FIXED_14,
             tearoff=False,
+            postcommand=self.build_menu,
         )
         self.menubutton["menu"] = self.menu
+        grid(self.menubutton, 0, 0)
+
+    def build_menu(self):
+        """Add menu items, the first time the menu is opened."""
+        if self.menu.index("end") is not None:
+            return
         self.menu.add_command(
             label=QuoteKind.ASK.name,
             command=partial(self.quote_kind_callback, QuoteKind.ASK),
@@ -42,7 +49,6 @@ class QuoteKindMenu(QuoteKindSelector):
             label=QuoteKind.BID.name,
             command=partial(self.quote_kind_callback, QuoteKind.BID),
         )
-        grid(self.menubutton, 0, 0)
 
     def set_quote_kind(self, quote_kind: Optional[QuoteKind]):
         if not quote_kind:
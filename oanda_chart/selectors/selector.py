@@ -12,7 +12,7 @@ not meant to be substantiated or used directly.
 from tkinter import Widget, Frame
 from typing import Optional
 
-from forex_types import Pair
+from forex_types import Currency, Pair
 from oanda_candles import Gran
 from oanda_candles.quote_kind import QuoteKind
 
@@ -41,6 +41,10 @@ class PairSelector(Selector):
     def get_pair(self):
         return self.manager.get_pair(self.color)
 
+    def get_anchor(self) -> Optional[Currency]:
+        """Currency the user is checking against others, if selector has one."""
+        return None
+
     def set_pair(self, pair: Optional[Pair]):
         raise NotImplemented
 
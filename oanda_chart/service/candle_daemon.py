@@ -0,0 +1,307 @@
+"""One process fetching candles for every chart process on the machine.
+
+Each chart process downloading the same pairs and grans on its own
+multiplies the load on Oanda and the time to first draw. A CandleDaemon
+instead holds the one collector of each pair and gran, and answers chart
+processes over a Unix socket (see the protocol module), which take their
+candles from it with a DaemonClient as their CandleSource provider.
+
+The complete candles the daemon gets are kept on disk, a file of fixed size
+records per pair and gran (see CandleStore), and a collector starting out
+is given those first, so after a restart only newer candles are fetched.
+
+Clients belong in other processes: the daemon holds the CollectorLock of a
+pair and gran while answering, which a client in the same process may be
+holding while it waits for the answer.
+
+Synopsis:
+    # In the daemon process (or: python -m oanda_chart.service.candle_daemon).
+    CandleMeister.init_meister(token)
+    CandleDaemon(path).serve_forever()
+
+    # In each chart process.
+    manager = ChartManager(None, provider=DaemonClient(path))
+"""
+
+
+import argparse
+import os
+import socketserver
+import struct
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, CandleMeister, Gran
+
+from oanda_chart.env.const import PathConst
+from oanda_chart.service.protocol import (
+    RECORD,
+    REQUEST,
+    Flag,
+    Op,
+    candle_values,
+    pack_candles,
+    pack_error,
+    read_exactly,
+    unpack_request,
+    values_candle,
+)
+from oanda_chart.util.candle_source import CandleSource, Collector, Provider
+from oanda_chart.util.collector_lock import CollectorLock
+
+Key = Tuple[Pair, Gran]
+
+
+class CandleStore:
+    def __init__(self, directory: Path):
+        """Initialize store of complete candles in files under directory."""
+        self.directory: Path = directory
+        # Times of first and last candle in the file of each pair and gran.
+        self.spans: Dict[Key, Tuple[int, int]] = {}
+        self._lock = Lock()
+
+    def path(self, pair: Pair, gran: Gran) -> Path:
+        return self.directory.joinpath(f"{pair}_{gran}.candles")
+
+    def load(self, pair: Pair, gran: Gran) -> List[Candle]:
+        """Get the candles stored for pair and gran, oldest first."""
+        path = self.path(pair, gran)
+        if not path.exists():
+            return []
+        data = path.read_bytes()
+        # Drop any record cut short by a crash while appending.
+        data = data[: len(data) - len(data) % RECORD.size]
+        candles = [values_candle(_) for _ in RECORD.iter_unpack(data)]
+        if candles:
+            with self._lock:
+                self.spans[(pair, gran)] = (candles[0].time, candles[-1].time)
+        return candles
+
+    def save(self, pair: Pair, gran: Gran, candles: Sequence[Candle]) -> int:
+        """Store the complete ones of candles (in time order) not stored yet.
+
+        Newer candles are appended to the file. When candles reach back past
+        the file, or do not overlap it at all, the file is written anew.
+
+        Returns:
+            number of candles written.
+        """
+        end = len(candles)
+        while end and not candles[end - 1].complete:
+            end -= 1
+        if not end:
+            return 0
+        key = (pair, gran)
+        first = candles[0].time
+        with self._lock:
+            span = self.spans.get(key)
+            if span is None or first < span[0] or first > span[1]:
+                self._write(key, candles[:end])
+                return end
+            start = end
+            while start and candles[start - 1].time > span[1]:
+                start -= 1
+            if start < end:
+                self._write(key, candles[start:end], append=True)
+            return end - start
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _write(self, key: Key, candles: Sequence[Candle], append: bool = False):
+        path = self.path(*key)
+        data = b"".join(RECORD.pack(*candle_values(_)) for _ in candles)
+        if append:
+            with open(path, "ab") as file:
+                file.write(data)
+            self.spans[key] = (self.spans[key][0], candles[-1].time)
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write aside and swap in, so a crash never leaves half a file.
+        temp = path.with_suffix(".tmp")
+        temp.write_bytes(data)
+        temp.replace(path)
+        self.spans[key] = (candles[0].time, candles[-1].time)
+
+
+class CandleDaemon:
+
+    DIRECTORY = PathConst.WORK_DIR.joinpath("candle_cache")
+    # Most candles sent for one request.
+    MAX_COUNT = 100_000
+    # Older candles asked for at a time, to reach back to where a client is.
+    HISTORY_STEP = 500
+
+    def __init__(
+        self,
+        path: str,
+        upstream: Provider = CandleSource.get_collector,
+        directory: Optional[Path] = DIRECTORY,
+    ):
+        """Initialize daemon (it serves once started).
+
+        Args:
+            path: file path of the Unix socket to serve on.
+            upstream: makes the collector of each pair and gran (by default
+                      CandleSource, so Oanda once CandleMeister is set up).
+            directory: folder candles are stored in, None to not store them.
+        """
+        self.path: str = path
+        self.upstream: Provider = upstream
+        self.store: Optional[CandleStore] = (
+            None if directory is None else CandleStore(directory)
+        )
+        self.collectors: Dict[Key, Collector] = {}
+        self.server: Optional[socketserver.UnixStreamServer] = None
+        self._lock = Lock()
+
+    def start(self) -> "CandleDaemon":
+        """Serve on a daemon thread, returns self."""
+        self._bind()
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """Serve on this thread until close is called (from another)."""
+        self._bind()
+        self.server.serve_forever()
+
+    def close(self):
+        """Stop serving and remove the socket file."""
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            os.unlink(self.path)
+
+    def get_collector(self, pair: Pair, gran: Gran) -> Collector:
+        """Get collector of pair and gran, starting it with stored candles.
+
+        Should be called while holding the CollectorLock of pair and gran.
+        """
+        key = (pair, gran)
+        with self._lock:
+            collector = self.collectors.get(key)
+            new = collector is None
+            if new:
+                collector = self.collectors[key] = self.upstream(pair, gran)
+        # Only a plain collector downloads its own candles, others (like a
+        # ResampledCollector) are built from candles of one that is.
+        plain = isinstance(collector, CandleCollector)
+        if new and plain and self.store is not None and not collector._cache:
+            collector._cache.extend(self.store.load(pair, gran))
+        return collector
+
+    def answer(self, request: bytes) -> bytes:
+        """Get the response to request (an error one if it failed)."""
+        try:
+            op, pair, gran, count, since = unpack_request(request)
+        except (ValueError, struct.error) as e:
+            return pack_error(f"Bad request: {e}")
+        if op not in (Op.GET, Op.SINCE, Op.BEFORE):
+            return pack_error(f"Unknown op: {op}")
+        count = min(count, self.MAX_COUNT)
+        try:
+            with CollectorLock.get(pair, gran):
+                collector = self.get_collector(pair, gran)
+                if op == Op.GET:
+                    candles = collector.grab(count)
+                    older = len(collector) - len(candles)
+                elif op == Op.SINCE:
+                    collector.grab(1)
+                    self._reach_back(collector, since)
+                    candles = _since(collector._cache, since)
+                    older = len(collector) - len(candles)
+                else:
+                    collector.grab(1)
+                    older = _older(collector._cache, since)
+                    if older < count:
+                        collector.update_history(count - older)
+                        older = _older(collector._cache, since)
+                    candles = collector._cache[max(0, older - count) : older]
+                    older -= len(candles)
+                flags = 0
+                if collector.end_of_history and not older:
+                    flags = Flag.END_OF_HISTORY
+                # Only plain collectors are loaded from the store.
+                if self.store is not None and isinstance(collector, CandleCollector):
+                    self.store.save(pair, gran, collector._cache)
+        except Exception as e:
+            # Whatever went wrong, the client is answered rather than left
+            # waiting, and the daemon goes on serving.
+            return pack_error(f"{type(e).__name__}: {e}")
+        return pack_candles(candles, flags)
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _reach_back(self, collector: Collector, since: int):
+        """Get older candles until collector has those from time since on.
+
+        A client may be further back than the daemon, e.g. after a restart
+        without a store (or for a collector not loaded from it), and would
+        otherwise be sent candles that leave a gap after its own.
+        """
+        held = len(collector)
+        while held and collector._cache[0].time > since and held < self.MAX_COUNT:
+            more = collector.update_history(self.HISTORY_STEP)
+            if len(collector) == held or not more:
+                return
+            held = len(collector)
+
+    def _bind(self):
+        if os.path.exists(self.path):
+            # Left behind by a daemon that did not close.
+            os.unlink(self.path)
+        self.server = _Server(self.path, _Handler)
+        self.server.owner = self
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    owner: CandleDaemon = None
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = read_exactly(self.request, REQUEST.size)
+            except (EOFError, OSError):
+                return
+            self.request.sendall(self.server.owner.answer(request))
+
+
+def _since(candles: Sequence[Candle], since: int) -> List[Candle]:
+    """Get the candles (in time order) from time since on."""
+    start = len(candles)
+    while start and candles[start - 1].time >= since:
+        start -= 1
+    return list(candles[start:])
+
+
+def _older(candles: Sequence[Candle], before: int) -> int:
+    """Get number of candles (in time order) older than time before."""
+    end = 0
+    while end < len(candles) and candles[end].time < before:
+        end += 1
+    return end
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Oanda candles locally.")
+    parser.add_argument("socket", help="path of the Unix socket to serve on")
+    parser.add_argument("--real", action="store_true", help="use a real account")
+    parser.add_argument("--resample", action="store_true", help="resample grans")
+    args = parser.parse_args()
+    CandleMeister.init_meister(os.environ["OANDA_TOKEN"], real=args.real)
+    CandleSource.set_resample(CandleSource.RESAMPLE if args.resample else {})
+    CandleDaemon(args.socket).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""The chart process side of the candle daemon (see the candle_daemon module).
+
+A DaemonClient is a CandleSource provider: the collectors it makes ask the
+daemon for candles over its Unix socket, rather than Oanda. A collector
+keeps the candles it got, and after that only asks for those from its last
+candle on, or for older ones before its first.
+"""
+
+
+import socket
+from threading import Lock
+from time import monotonic
+from typing import List, Tuple
+
+from forex_types import Pair
+from oanda_candles import Candle, Gran
+
+from oanda_chart.service.protocol import (
+    DaemonError,
+    Flag,
+    Op,
+    pack_request,
+    read_response,
+)
+from oanda_chart.util.collector_lock import CollectorLock
+
+
+class DaemonClient:
+
+    # Seconds to wait for the daemon to answer.
+    TIMEOUT = 60.0
+
+    def __init__(self, path: str):
+        """Initialize client of the daemon serving on Unix socket path."""
+        self.path: str = path
+        self.sock: socket.socket = None
+        self._lock = Lock()
+
+    def __call__(self, pair: Pair, gran: Gran) -> "DaemonCollector":
+        return DaemonCollector(pair, gran, self)
+
+    def request(
+        self, op: int, pair: Pair, gran: Gran, count: int = 0, since: int = 0
+    ) -> Tuple[int, List[Candle]]:
+        """Send a request and wait for its response (from any thread).
+
+        Returns:
+            flags and candles of the response.
+        Raises:
+            OSError: if the daemon could not be reached or sent an error.
+        """
+        request = pack_request(op, pair, gran, count, since)
+        with self._lock:
+            if self.sock is None:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(self.TIMEOUT)
+                try:
+                    self.sock.connect(self.path)
+                except OSError:
+                    self.close()
+                    raise
+            try:
+                self.sock.sendall(request)
+                return read_response(self.sock)
+            except DaemonError:
+                raise
+            except (EOFError, OSError) as e:
+                # Connect again next time: the daemon may have restarted, and
+                # a late answer must not be taken for that of the next request.
+                self.close()
+                if isinstance(e, EOFError):
+                    raise ConnectionError(str(e)) from e
+                raise
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class DaemonCollector:
+
+    # Seconds between asking the daemon for new candles (it has its own
+    # limit on how often it asks Oanda).
+    INTERVAL = 1.0
+
+    def __init__(self, pair: Pair, gran: Gran, client: DaemonClient):
+        """Initialize collector of candles of pair and gran from the daemon."""
+        self.pair: Pair = pair
+        self.gran: Gran = gran
+        self.client: DaemonClient = client
+        self._cache: List[Candle] = []
+        self.last_update: float = monotonic() - self.INTERVAL - 1
+        self.end_of_history: bool = False
+
+    def __len__(self):
+        return len(self._cache)
+
+    def grab(self, count: int) -> List[Candle]:
+        """Get most recent count candles (fewer if history runs out)."""
+        with CollectorLock.get(self.pair, self.gran):
+            if not self._cache:
+                self._get(count)
+            else:
+                self.update_recent()
+                self.update_history(count - len(self._cache))
+            return self._cache[-count:]
+
+    def update_recent(self) -> bool:
+        """Get candles from our last one on, unless we just did.
+
+        Returns:
+            True if the daemon was asked.
+        """
+        now = monotonic()
+        if not self._cache or now < self.last_update + self.INTERVAL:
+            return False
+        self.last_update = now
+        since = self._cache[-1].time
+        _, candles = self.client.request(Op.SINCE, self.pair, self.gran, since=since)
+        if candles:
+            self._cache[-1:] = candles
+        return True
+
+    def update_history(self, count: int) -> bool:
+        """Get count more older candles.
+
+        Returns:
+            True unless history ran out.
+        """
+        if count <= 0 or self.end_of_history:
+            return not self.end_of_history
+        if not self._cache:
+            self._get(count)
+            return not self.end_of_history
+        flags, candles = self.client.request(
+            Op.BEFORE, self.pair, self.gran, count, since=self._cache[0].time
+        )
+        self._cache[:0] = candles
+        self.end_of_history = bool(flags & Flag.END_OF_HISTORY)
+        return not self.end_of_history
+
+    def _get(self, count: int):
+        flags, candles = self.client.request(Op.GET, self.pair, self.gran, count)
+        self._cache[:] = candles
+        self.last_update = monotonic()
+        self.end_of_history = bool(flags & Flag.END_OF_HISTORY)
@@ -0,0 +1,123 @@
+"""Binary protocol between the candle daemon and its clients.
+
+Over a Unix stream socket, a client sends requests and reads one response
+to each, in turn. All numbers are little endian.
+
+    request  : op (u8), pair (8 bytes, ascii, zero padded), gran (4 bytes),
+               count (u32), since (i64)
+    response : status (u8), flags (u8), size (u32), then either size candle
+               records (status OK) or a size byte utf-8 message (ERROR).
+    record   : time (i64), bid/ask/mid open/high/low/close (12 x i64, in
+               units of 0.00001, as in shared_candles), complete (u8)
+
+Ops:
+    GET    : the newest count candles.
+    SINCE  : candles from time since on (the first may have changed since).
+    BEFORE : the newest count candles older than time since.
+
+Synopsis:
+    sock.sendall(pack_request(Op.GET, Pair.EUR_USD, Gran.H1, 500))
+    flags, candles = read_response(sock)
+"""
+
+
+import socket
+import struct
+from typing import List, Sequence, Tuple
+
+from forex_types import Pair
+from oanda_candles import Candle, Gran
+
+from oanda_chart.dashboard.shared_candles import PRICES, candle_prices, prices_candle
+
+REQUEST = struct.Struct("<B8s4sIq")
+RESPONSE = struct.Struct("<BBI")
+RECORD = struct.Struct("<13qB")
+
+
+class Op:
+    GET = 1
+    SINCE = 2
+    BEFORE = 3
+
+
+class Status:
+    OK = 0
+    ERROR = 1
+
+
+class DaemonError(OSError):
+    """The daemon could not answer a request (its message says why)."""
+
+
+class Flag:
+    # No candles older than those sent are to be had.
+    END_OF_HISTORY = 1
+
+
+def pack_request(op: int, pair: Pair, gran: Gran, count: int, since: int = 0):
+    return REQUEST.pack(op, str(pair).encode(), str(gran).encode(), count, since)
+
+
+def unpack_request(data: bytes) -> Tuple[int, Pair, Gran, int, int]:
+    """Get op, pair, gran, count and since of a request.
+
+    Raises:
+        ValueError: if the pair or gran are not known.
+    """
+    op, pair, gran, count, since = REQUEST.unpack(data)
+    gran_name = gran.rstrip(b"\0").decode()
+    if not hasattr(Gran, gran_name):
+        raise ValueError(f"Unknown gran: {gran_name}")
+    return op, Pair(pair.rstrip(b"\0").decode()), getattr(Gran, gran_name), count, since
+
+
+def pack_candles(candles: Sequence[Candle], flags: int = 0) -> bytes:
+    """Get OK response carrying candles."""
+    parts = [RESPONSE.pack(Status.OK, flags, len(candles))]
+    parts.extend(RECORD.pack(*candle_values(_)) for _ in candles)
+    return b"".join(parts)
+
+
+def pack_error(message: str) -> bytes:
+    data = message.encode()
+    return RESPONSE.pack(Status.ERROR, 0, len(data)) + data
+
+
+def read_response(sock: socket.socket) -> Tuple[int, List[Candle]]:
+    """Read a response, returns its flags and candles.
+
+    Raises:
+        DaemonError: if the daemon sent an error.
+        EOFError: if the connection closed.
+    """
+    status, flags, size = RESPONSE.unpack(read_exactly(sock, RESPONSE.size))
+    if status != Status.OK:
+        raise DaemonError(read_exactly(sock, size).decode())
+    data = read_exactly(sock, size * RECORD.size)
+    return flags, [values_candle(_) for _ in RECORD.iter_unpack(data)]
+
+
+def read_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read size bytes from sock.
+
+    Raises:
+        EOFError: if the connection closed first.
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise EOFError("Candle daemon connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def candle_values(candle: Candle) -> Tuple[int, ...]:
+    """Get the values of the record of candle."""
+    return (int(candle.time), *candle_prices(candle), int(candle.complete))
+
+
+def values_candle(values: Sequence[int]) -> Candle:
+    """Get candle back from the values of its record."""
+    return prices_candle(values[0], values[1 : 1 + PRICES], values[1 + PRICES])
@@ -0,0 +1,254 @@
+"""Keep collectors from holding on to every candle they ever downloaded.
+
+A CandleCollector caches all candles it has fetched for the life of the
+process. After panning back months on M1, and across every pair and gran
+opened in a session, that adds up. A CandleRetention trims the history of
+collector caches back toward what charts are actually showing.
+
+Each GeoCandles holding candles of a pair and gran tells the retention how
+many candles its window needs (the count it grabs). The need of a pair and
+gran is the largest of its live holders. Two budgets decide when to trim:
+
+    * pair_budget  : once one collector holds more candles than this, its
+                     history beyond need + margin is dropped.
+    * total_budget : once all collectors together hold more than this, the
+                     least recently used ones are trimmed to need + margin
+                     (just margin when no chart holds them any more).
+
+With spill on, dropped candles are written to disk (under a session folder
+in PathConst.WORK_DIR) and read back when a chart pans back to them. Without
+spill, the collector simply downloads them again. Each trim spills to a new
+chunk file, so the candles spilled before are never read or written again
+until they are restored.
+
+Only collectors keeping their candles in a list of their own are trimmed.
+Others, like a LiveTailCollector (which hands out a copy of its bounded
+ring as _cache), are left alone.
+"""
+
+
+import json
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+from weakref import WeakKeyDictionary, finalize
+
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, Gran
+
+from oanda_chart.env.const import PathConst
+from oanda_chart.util.collector_lock import CollectorLock
+
+Key = Tuple[Pair, Gran]
+
+
+class CandleRetention:
+
+    PAIR_BUDGET = 100_000
+    TOTAL_BUDGET = 500_000
+    MARGIN = 1_000
+    SPILL_DIR = PathConst.WORK_DIR.joinpath("spill")
+
+    def __init__(
+        self,
+        pair_budget: int = PAIR_BUDGET,
+        total_budget: int = TOTAL_BUDGET,
+        margin: int = MARGIN,
+        spill: bool = False,
+        spill_dir: Path = SPILL_DIR,
+    ):
+        """Initialize retention policy.
+
+        Args:
+            pair_budget: candles one collector may hold before it is trimmed.
+            total_budget: candles all collectors may hold before trimming.
+            margin: candles kept beyond what charts need, to pan into.
+            spill: write dropped candles to disk and read them back from there.
+            spill_dir: folder for spill files (a session subfolder is used, and
+                       removed when the CandleRetention is).
+        """
+        self.pair_budget: int = pair_budget
+        self.total_budget: int = total_budget
+        self.margin: int = margin
+        self.spill: bool = spill
+        self.spill_dir: Path = spill_dir.joinpath(uuid4().hex)
+        # Window size needed by each live holder of each pair and gran.
+        self.needs: Dict[Key, "WeakKeyDictionary[object, int]"] = {}
+        # Collectors we trim, least recently used first.
+        self.collectors: "OrderedDict[Key, CandleCollector]" = OrderedDict()
+        # Number of candles in spill files of each pair and gran.
+        self.spilled: Dict[Key, int] = {}
+        # Spill chunk files of each pair and gran, in the order written.
+        self.chunks: Dict[Key, List[Path]] = {}
+        self._chunk_number: int = 0
+        self._lock = Lock()
+        finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    def need(self, key: Key) -> int:
+        """Largest number of candles a live holder of key needs."""
+        with self._lock:
+            holders = self.needs.get(key)
+            return max(holders.values(), default=0) if holders else 0
+
+    def hold(self, holder, collector: CandleCollector, count: int):
+        """Record that holder needs count candles, and trim to pair budget.
+
+        Should be called while holding the CollectorLock of the collector.
+
+        Args:
+            holder: object (like a GeoCandles) with pair and gran attributes.
+            collector: collector holder grabbed from.
+            count: number of candles holder grabbed.
+        """
+        if _owned_cache(collector) is None:
+            return
+        key = (holder.pair, holder.gran)
+        with self._lock:
+            self.needs.setdefault(key, WeakKeyDictionary())[holder] = count
+            self.collectors[key] = collector
+            self.collectors.move_to_end(key)
+        if len(collector) > self.pair_budget:
+            self._trim(key, collector, self.need(key) + self.margin)
+
+    def restore(self, key: Key, collector: CandleCollector, count: int) -> int:
+        """Put spilled candles back in collector so it holds count of them.
+
+        Should be called while holding the CollectorLock of the collector.
+
+        Returns:
+            number of candles restored.
+        """
+        missing = count - len(collector)
+        cache = _owned_cache(collector)
+        if missing <= 0 or cache is None:
+            return 0
+        with self._lock:
+            if not self.spilled.get(key):
+                return 0
+            chunks = self.chunks[key]
+        first_time = int(cache[0].time) if cache else None
+        restored: List[Tuple] = []
+        # The newest candles spilled are in the last chunk written.
+        while len(restored) < missing:
+            with self._lock:
+                if not chunks:
+                    break
+                path = chunks.pop()
+            with open(path) as file:
+                data = json.load(file)
+            kept = data
+            if first_time is not None:
+                # Skip any the collector has already downloaded again.
+                kept = [_ for _ in data if _[3] < first_time]
+            take = min(missing - len(restored), len(kept))
+            restored[:0] = kept[len(kept) - take :]
+            kept = kept[: len(kept) - take]
+            if kept:
+                # Only a chunk restored from part way is ever rewritten.
+                self._write(path, kept)
+            else:
+                path.unlink()
+            with self._lock:
+                self.spilled[key] -= len(data) - len(kept)
+                if kept:
+                    chunks.append(path)
+        cache[:0] = [Candle.from_tuple(_) for _ in restored]
+        return len(restored)
+
+    def enforce_total(self):
+        """Trim least recently used collectors until under total budget.
+
+        Takes the CollectorLock of each collector in turn, so must not be
+        called while holding any of them.
+        """
+        with self._lock:
+            items = list(self.collectors.items())
+        total = self.candle_count()
+        for key, collector in items:
+            if total <= self.total_budget:
+                break
+            with CollectorLock.get(*key):
+                total -= self._trim(key, collector, self.need(key) + self.margin)
+
+    def release(self):
+        """Trim collectors no live chart holds any more down to margin.
+
+        Takes the CollectorLock of each collector in turn, so must not be
+        called while holding any of them.
+        """
+        with self._lock:
+            items = list(self.collectors.items())
+        for key, collector in items:
+            if not self.need(key):
+                with CollectorLock.get(*key):
+                    self._trim(key, collector, self.margin)
+
+    def candle_count(self) -> int:
+        """Number of candles held by the collectors we track."""
+        with self._lock:
+            collectors = list(self.collectors.values())
+        return sum(len(collector) for collector in collectors)
+
+    def get_report(self) -> str:
+        """Get human readable report of candles held and spilled.
+
+        (This method is meant to assist development and debugging).
+        """
+        with self._lock:
+            items = list(reversed(self.collectors.items()))
+            spilled = dict(self.spilled)
+        lines = list()
+        lines.append(f"CandleRetention State ({self.candle_count()} candles):\n")
+        for key, collector in items:
+            pair, gran = key
+            lines.append(
+                f"    {pair} {str(gran):<4}: {len(collector)} held,"
+                f" {self.need(key)} needed, {spilled.get(key, 0)} spilled\n"
+            )
+        return "".join(lines)
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _trim(self, key: Key, collector: CandleCollector, keep: int) -> int:
+        """Drop oldest candles of collector beyond keep, returns number dropped."""
+        cache = _owned_cache(collector)
+        if cache is None:
+            return 0
+        drop = len(cache) - keep
+        if drop <= 0:
+            return 0
+        dropped = cache[:drop]
+        del cache[:drop]
+        # Let the collector download history again if nothing is spilled.
+        collector.end_of_history = False
+        if self.spill:
+            self._spill(key, [_.to_tuple() for _ in dropped])
+        return drop
+
+    def _spill(self, key: Key, data: List[Tuple]):
+        """Write data to a new chunk file of key."""
+        pair, gran = key
+        with self._lock:
+            self._chunk_number += 1
+            number = self._chunk_number
+        path = self.spill_dir.joinpath(f"{pair}_{gran}_{number}.json")
+        self._write(path, data)
+        with self._lock:
+            self.chunks.setdefault(key, []).append(path)
+            self.spilled[key] = self.spilled.get(key, 0) + len(data)
+
+    def _write(self, path: Path, data: List[Tuple]):
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(data, file)
+
+
+def _owned_cache(collector: CandleCollector) -> Optional[List[Candle]]:
+    """Get the list collector keeps its candles in, None if it has none."""
+    cache = vars(collector).get("_cache")
+    return cache if isinstance(cache, list) else None
@@ -0,0 +1,150 @@
+"""Where charts get the collectors of their candles from.
+
+By default that is simply CandleMeister.get_collector, with every pair and
+gran downloaded on its own. With resampling on, the grans of a resample map
+are instead built from the collector of a finer gran of the same pair (see
+the resampler module), so with H1 open, H2, H4, H8 and D come for free.
+
+The seconds grans always get a LiveTailCollector (see the live_tail
+module), which only ever holds a fixed number of the newest candles.
+
+A provider, when set, takes over all of that: every collector then comes
+from calling it with the pair and gran (once for each of them). Dashboard
+windows get their candles from shared memory this way.
+
+download_candles and fill_collector let a CandleCollector be filled without
+holding its CollectorLock during the download (see the prefetcher module).
+
+Synopsis:
+    CandleSource.set_resample(CandleSource.RESAMPLE)
+    collector = CandleSource.get_collector(Pair.EUR_USD, Gran.H4)
+"""
+
+
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, CandleMeister, Gran
+
+from oanda_chart.util.live_tail import LiveTailCollector
+from oanda_chart.util.resampler import ResampledCollector, can_resample
+
+Collector = Union[CandleCollector, ResampledCollector, LiveTailCollector]
+# Makes the collector of a pair and gran (anything with the same methods).
+Provider = Callable[[Pair, Gran], Collector]
+
+
+class CandleSource:
+
+    # Grans we build from a finer gran rather than download, by default.
+    RESAMPLE: Dict[Gran, Gran] = {
+        Gran.M2: Gran.M1,
+        Gran.M4: Gran.M1,
+        Gran.M10: Gran.M5,
+        Gran.H2: Gran.H1,
+        Gran.H4: Gran.H1,
+        Gran.H8: Gran.H1,
+        Gran.D: Gran.H1,
+    }
+
+    # Grans held in a LiveTailCollector.
+    LIVE_TAIL = (Gran.S5, Gran.S10, Gran.S15, Gran.S30)
+
+    _resample: Dict[Gran, Gran] = {}
+    _provider: Optional[Provider] = None
+    _collectors: Dict[Tuple[Pair, Gran], Collector] = {}
+    _guard: Lock = Lock()
+
+    @classmethod
+    def set_resample(cls, resample: Mapping[Gran, Gran]):
+        """Set which grans are built from which finer gran ({} for none).
+
+        Collectors already handed out keep working as they were.
+
+        Raises:
+            ValueError: if some gran cannot be built exactly from its source.
+        """
+        for gran, source_gran in resample.items():
+            if not can_resample(gran, source_gran):
+                raise ValueError(f"Cannot resample {source_gran} candles into {gran}")
+        with cls._guard:
+            cls._resample = dict(resample)
+            cls._collectors = {}
+
+    @classmethod
+    def get_resample(cls) -> Dict[Gran, Gran]:
+        """Get which grans are built from which finer gran."""
+        with cls._guard:
+            return dict(cls._resample)
+
+    @classmethod
+    def set_provider(cls, provider: Optional[Provider]):
+        """Set what makes every collector (None for Oanda, the default).
+
+        Collectors already handed out keep working as they were.
+        """
+        with cls._guard:
+            cls._provider = provider
+            cls._collectors = {}
+
+    @classmethod
+    def get_collector(cls, pair: Pair, gran: Gran) -> Collector:
+        """Get the collector of candles of pair and gran.
+
+        Should be called while holding the CollectorLock of pair and gran.
+        """
+        with cls._guard:
+            if cls._provider is not None:
+                collector = cls._collectors.get((pair, gran))
+                if collector is None:
+                    collector = cls._provider(pair, gran)
+                    cls._collectors[(pair, gran)] = collector
+                return collector
+            source_gran = cls._resample.get(gran)
+            if source_gran is None and gran not in cls.LIVE_TAIL:
+                return CandleMeister.get_collector(pair, gran)
+            collector = cls._collectors.get((pair, gran))
+            if collector is None:
+                if source_gran is None:
+                    source = CandleMeister.get_collector(pair, gran)
+                    collector = LiveTailCollector(pair, gran, source)
+                else:
+                    source = CandleMeister.get_collector(pair, source_gran)
+                    collector = ResampledCollector(pair, gran, source, source_gran)
+                cls._collectors[(pair, gran)] = collector
+            return collector
+
+
+# CandleCollector has no public way to download candles without storing them,
+# or to store candles downloaded elsewhere. The two functions below do so
+# through its internals (requester, _cache and last_update) as of the 0.1.0
+# in poetry.lock, and tests/test_prefetcher.py checks them against it. Keep
+# any other such access in here.
+
+
+def download_candles(collector: CandleCollector, count: int) -> List[Candle]:
+    """Download the newest count candles of collector without storing them.
+
+    Needs no lock, the collector itself is not touched.
+    """
+    # Relies on oanda-candles 0.1.0 internals: CandleCollector.requester.
+    return collector.requester.get(count)
+
+
+def fill_collector(collector: CandleCollector, candles: List[Candle]) -> bool:
+    """Store candles from download_candles in collector, unless it has some.
+
+    Should be called while holding the CollectorLock of its pair and gran.
+
+    Returns:
+        True if the candles were stored, False if collector was not empty.
+    """
+    if len(collector):
+        return False
+    # Relies on oanda-candles 0.1.0 internals: these are what
+    # CandleCollector.grab sets after its own first download.
+    collector._cache = candles
+    collector.last_update = monotonic()
+    return True
@@ -0,0 +1,206 @@
+"""Statistics of any run of candles in constant time.
+
+Selecting a range of candles on a chart shows their count, high and low,
+net move and average range. A selection can span tens of thousands of M1
+candles and is updated for every mouse move, so rather than go through the
+candles each time, a CandleStatsIndex keeps:
+
+    * prefix sums : running totals of candle ranges, so the sum over a run
+                    is the difference of two totals.
+    * sparse table: the lowest low (and highest high) of every run of 2**k
+                    candles, so that of any run is the lower of two
+                    overlapping runs of the largest 2**k that fits in it.
+
+Only complete candles are indexed, as those never change: the index only
+ever grows at the end, and the parts of it in use by a snapshot on another
+thread are never changed under it. The incomplete last candle is passed in
+to query and folded in as it is.
+
+Synopsis:
+    index = CandleStatsIndex(QuoteKind.MID)
+    index.extend(candles)
+    stats = index.query(candles[10].time, candles[-1].time, len(index), tail)
+"""
+
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import List, NamedTuple, Optional, Sequence
+
+from forex_types import FracPips
+from oanda_candles import Candle, QuoteKind
+
+
+class CandleStats(NamedTuple):
+    count: int
+    # Start times of first and last candle.
+    time1: int
+    time2: int
+    low: FracPips
+    high: FracPips
+    # Close of last candle less open of first, in pips.
+    net_pips: float
+    # Mean of high less low of each candle, in pips.
+    avg_range_pips: float
+
+
+class CandleStatsIndex:
+    def __init__(self, quote_kind: QuoteKind, candles: Sequence[Candle] = ()):
+        """Initialize index of candles of quote_kind (see extend)."""
+        self.quote_kind: QuoteKind = quote_kind
+        self.times: array = array("q")
+        self.opens: array = array("q")
+        self.closes: array = array("q")
+        # range_sums[n] is sum of high less low of the first n candles.
+        self.range_sums: array = array("q", [0])
+        # lows[k][n] is lowest low of candles n to n + 2**k - 1, highs same.
+        self.lows: List[array] = [array("q")]
+        self.highs: List[array] = [array("q")]
+        self.extend(candles)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def extend(self, candles: Sequence[Candle]) -> int:
+        """Add the complete candles newer than those indexed.
+
+        Candles (in time order) up to the newest indexed, and incomplete ones,
+        are skipped, so the same growing list of candles can be passed in
+        again and again.
+
+        Returns:
+            number of candles added.
+        """
+        last = self.times[-1] if self.times else None
+        start = len(candles)
+        # Candles are in time order, so the new ones are found from the end.
+        while start and (last is None or candles[start - 1].time > last):
+            start -= 1
+        added = 0
+        range_total = self.range_sums[-1]
+        for candle in islice(candles, start, None):
+            if not candle.complete:
+                continue
+            ohlc = candle.quote(self.quote_kind)
+            high = ohlc.h_fp
+            low = ohlc.l_fp
+            range_total += high - low
+            self.times.append(candle.time)
+            self.opens.append(ohlc.o_fp)
+            self.closes.append(ohlc.c_fp)
+            self.range_sums.append(range_total)
+            self.lows[0].append(low)
+            self.highs[0].append(high)
+            last = candle.time
+            added += 1
+        if added:
+            self._extend_table(self.lows, min)
+            self._extend_table(self.highs, max)
+        return added
+
+    def find(self, time1: int, time2: int, count: Optional[int] = None):
+        """Get range(start, end) of indexes of candles from time1 to time2.
+
+        Args:
+            time1: earliest candle start time included.
+            time2: latest candle start time included.
+            count: only look at first count candles (None for all of them).
+        """
+        count = len(self) if count is None else count
+        start = bisect_left(self.times, time1, 0, count)
+        end = bisect_right(self.times, time2, start, count)
+        return range(start, end)
+
+    def stats(self, start: int, end: int) -> Optional[CandleStats]:
+        """Get stats of indexed candles start to end - 1, None if there are none."""
+        if end <= start:
+            return None
+        count = end - start
+        # Largest power of two that fits the run, and two runs that cover it.
+        k = count.bit_length() - 1
+        last = end - (1 << k)
+        low = min(self.lows[k][start], self.lows[k][last])
+        high = max(self.highs[k][start], self.highs[k][last])
+        range_sum = self.range_sums[end] - self.range_sums[start]
+        return CandleStats(
+            count=count,
+            time1=self.times[start],
+            time2=self.times[end - 1],
+            low=FracPips(low),
+            high=FracPips(high),
+            net_pips=(self.closes[end - 1] - self.opens[start]) / 10,
+            avg_range_pips=range_sum / count / 10,
+        )
+
+    def query(
+        self,
+        time1: int,
+        time2: int,
+        count: Optional[int] = None,
+        tail: Optional[Candle] = None,
+    ) -> Optional[CandleStats]:
+        """Get stats of candles starting from time1 to time2 (either order).
+
+        Args:
+            time1: start time of a candle at one end of the run.
+            time2: start time of a candle at the other end.
+            count: only use the first count indexed candles (None for all).
+            tail: incomplete candle after the indexed ones, included when its
+                  time is in the run.
+        Returns:
+            stats of the run, None if there are no candles in it.
+        """
+        if time2 < time1:
+            time1, time2 = time2, time1
+        found = self.find(time1, time2, count)
+        stats = self.stats(found.start, found.stop)
+        if tail is None or not time1 <= tail.time <= time2:
+            return stats
+        ohlc = tail.quote(self.quote_kind)
+        high = ohlc.h_fp
+        low = ohlc.l_fp
+        if stats is None:
+            return CandleStats(
+                count=1,
+                time1=tail.time,
+                time2=tail.time,
+                low=low,
+                high=high,
+                net_pips=(ohlc.c_fp - ohlc.o_fp) / 10,
+                avg_range_pips=(high - low) / 10,
+            )
+        count = stats.count + 1
+        open_fp = self.opens[found.start]
+        return CandleStats(
+            count=count,
+            time1=stats.time1,
+            time2=tail.time,
+            low=min(stats.low, low),
+            high=max(stats.high, high),
+            net_pips=(ohlc.c_fp - open_fp) / 10,
+            avg_range_pips=(stats.avg_range_pips * stats.count + (high - low) / 10)
+            / count,
+        )
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    @staticmethod
+    def _extend_table(table: List[array], combine):
+        """Fill in the sparse table entries the new candles make possible."""
+        size = len(table[0])
+        k = 1
+        while (1 << k) <= size:
+            if len(table) == k:
+                table.append(array("q"))
+            previous = table[k - 1]
+            level = table[k]
+            half = 1 << (k - 1)
+            start = len(level)
+            stop = size - (1 << k) + 1
+            level.extend(
+                map(combine, previous[start:stop], previous[start + half : stop + half])
+            )
+            k += 1
@@ -0,0 +1,31 @@
+"""Locks for sharing CandleCollector objects between threads."""
+
+
+from threading import Lock, RLock
+from typing import Dict, Tuple
+
+from forex_types import Pair
+from oanda_candles import Gran
+
+
+class CollectorLock:
+    """Per pair and gran locks around CandleCollector access.
+
+    CandleCollector objects are not thread safe. Once candles are downloaded
+    on background threads, the tkinter thread can ask the same collector for
+    candles at the same time as a worker. Anything that looks up a collector
+    or calls grab on one should hold the lock for its pair and gran.
+    """
+
+    _locks: Dict[Tuple[Pair, Gran], RLock] = {}
+    _guard: Lock = Lock()
+
+    @classmethod
+    def get(cls, pair: Pair, gran: Gran) -> RLock:
+        """Get the (reentrant) lock for the collector of pair and gran."""
+        key = (pair, gran)
+        with cls._guard:
+            lock = cls._locks.get(key)
+            if lock is None:
+                lock = cls._locks[key] = RLock()
+            return lock
@@ -0,0 +1,171 @@
+"""Live candles of the seconds grans, in a buffer that never grows.
+
+A CandleCollector keeps every candle it ever fetched, and only looks for new
+ones every few seconds. That suits minutes and hours, but an S5 chart left
+open makes 17280 candles a day, and wants its last candle updated about as
+often as it changes. So for the seconds grans, CandleSource hands out a
+LiveTailCollector instead, which:
+
+    * keeps only the newest CAPACITY candles, in a CandleRing whose slots
+      are overwritten in place (oldest first) as new candles come in.
+    * fetches new candles through the requester of the plain collector (so
+      that collector's own cache stays empty), at most every fifth of a
+      candle's duration (but no more than once a second).
+    * has no history beyond the ring: panning stops at its oldest candle.
+
+Synopsis:
+    collector = CandleSource.get_collector(Pair.EUR_USD, Gran.S5)
+    candles = collector.grab(500)
+"""
+
+
+from time import monotonic
+from typing import Iterator, List, Optional, Sequence
+
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, Gran
+
+from oanda_chart.util.collector_lock import CollectorLock
+
+
+class CandleRing:
+    """Fixed capacity buffer of the newest candles, oldest overwritten first."""
+
+    __slots__ = ("capacity", "slots", "start", "size")
+
+    def __init__(self, capacity: int):
+        self.capacity: int = capacity
+        self.slots: List[Optional[Candle]] = [None] * capacity
+        # Slot of the oldest candle, and how many slots are in use.
+        self.start: int = 0
+        self.size: int = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, ndx: int) -> Candle:
+        """Get candle by index, 0 being the oldest (negative from the newest)."""
+        if ndx < 0:
+            ndx += self.size
+        if not 0 <= ndx < self.size:
+            raise IndexError("CandleRing index out of range")
+        return self.slots[(self.start + ndx) % self.capacity]
+
+    def __iter__(self) -> Iterator[Candle]:
+        for ndx in range(self.size):
+            yield self[ndx]
+
+    @property
+    def last(self) -> Optional[Candle]:
+        return self[-1] if self.size else None
+
+    def append(self, candle: Candle):
+        """Add newest candle, overwriting the oldest one when full."""
+        if self.size < self.capacity:
+            self.slots[(self.start + self.size) % self.capacity] = candle
+            self.size += 1
+        else:
+            self.slots[self.start] = candle
+            self.start = (self.start + 1) % self.capacity
+
+    def merge(self, candles: Sequence[Candle]) -> int:
+        """Add candles (in time order) that are not older than the newest one.
+
+        One with the same time as the newest candle replaces it in its slot,
+        which is how an incomplete candle is brought up to date.
+
+        Returns:
+            number of candles replaced or added.
+        """
+        merged = 0
+        for candle in candles:
+            last = self.last
+            if last is not None and candle.time < last.time:
+                continue
+            if last is not None and candle.time == last.time:
+                self.slots[(self.start + self.size - 1) % self.capacity] = candle
+            else:
+                self.append(candle)
+            merged += 1
+        return merged
+
+    def tail(self, count: int) -> List[Candle]:
+        """Get the newest count candles (all of them if there are fewer)."""
+        count = min(count, self.size)
+        first = (self.start + self.size - count) % self.capacity
+        end = first + count
+        if end <= self.capacity:
+            return self.slots[first:end]
+        return self.slots[first:] + self.slots[: end - self.capacity]
+
+
+class LiveTailCollector:
+
+    CAPACITY = 2000
+    # Seconds between fetches at least, and at least this part of a candle.
+    MIN_INTERVAL = 1.0
+    INTERVAL_PART = 0.2
+
+    def __init__(
+        self,
+        pair: Pair,
+        gran: Gran,
+        source: CandleCollector,
+        capacity: int = CAPACITY,
+    ):
+        """Initialize live tail of pair and gran, empty until first grab.
+
+        Args:
+            pair: the forex pair of the candles.
+            gran: the gran of the candles.
+            source: plain collector of pair and gran, whose requester we use.
+            capacity: most candles ever held.
+        """
+        self.pair: Pair = pair
+        self.gran: Gran = gran
+        self.source: CandleCollector = source
+        self.ring: CandleRing = CandleRing(capacity)
+        self.interval: float = max(
+            self.MIN_INTERVAL, gran.duration * self.INTERVAL_PART
+        )
+        self.last_update: float = monotonic() - self.interval - 1
+        # Only the ring is ever held, there is no older history to get.
+        self.end_of_history: bool = True
+
+    def __len__(self):
+        return len(self.ring)
+
+    @property
+    def _cache(self) -> List[Candle]:
+        """Candles held, oldest first (a copy, like CandleCollector._cache)."""
+        return self.ring.tail(len(self.ring))
+
+    def grab(self, count: int) -> List[Candle]:
+        """Get most recent count candles (no more than the ring holds)."""
+        with CollectorLock.get(self.pair, self.gran):
+            self.update_recent()
+            return self.ring.tail(count)
+
+    def update_recent(self) -> bool:
+        """Fetch newest candles into the ring, unless we just did.
+
+        Returns:
+            True if candles were fetched.
+        """
+        now = monotonic()
+        if self.ring and now < self.last_update + self.interval:
+            return False
+        self.last_update = now
+        requester = self.source.requester
+        if not self.ring:
+            self.ring.merge(requester.get(self.ring.capacity))
+        else:
+            # The requester replaces the last candle with those from its time.
+            candles = [self.ring.last]
+            requester.extend(candles)
+            self.ring.merge(candles)
+        return True
+
+    def update_history(self, count: int) -> bool:
+        """There is no history beyond the ring, so this does nothing."""
+        return False
@@ -0,0 +1,174 @@
+"""Background downloading of candles before a chart asks for them.
+
+A chart blocks the tkinter thread while a CandleCollector does its first
+download. The Prefetcher works through a priority queue of pair and gran
+combinations on a daemon thread, so that by the time the user switches to
+one of them its collector already holds candles.
+
+Requests are grouped into channels. Prefetching a new list of keys on a
+channel drops whatever was still pending on that channel, so a user clicking
+through pairs quickly does not leave a long backlog of stale downloads.
+
+Downloads are made without holding the CollectorLock of the pair and gran,
+which is only taken to hand the candles to the collector, so a chart asking
+for candles of the same pair and gran is never kept waiting on a prefetch.
+
+Two limits keep the prefetcher polite:
+    * min_interval : seconds to wait between downloads (request rate cap).
+    * max_candles  : stop warming once the collectors warmed hold this many
+                     candles (memory cap).
+"""
+
+
+import logging
+from itertools import count
+from queue import PriorityQueue
+from threading import Lock, Thread
+from time import monotonic, sleep
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from forex_types import Pair
+from oanda_candles import CandleCollector, Gran
+
+from oanda_chart.util.candle_source import (
+    CandleSource,
+    Collector,
+    download_candles,
+    fill_collector,
+)
+from oanda_chart.util.collector_lock import CollectorLock
+from oanda_chart.util.live_tail import LiveTailCollector
+from oanda_chart.util.resampler import ResampledCollector
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+
+    # Same as the minimum number of candles Xandles.calculate_pull_size asks for.
+    PULL_SIZE = 500
+    MIN_INTERVAL = 0.5
+    MAX_CANDLES = 100_000
+
+    def __init__(
+        self,
+        pull_size: int = PULL_SIZE,
+        min_interval: float = MIN_INTERVAL,
+        max_candles: int = MAX_CANDLES,
+    ):
+        """Initialize prefetcher (the worker thread starts on first request).
+
+        Args:
+            pull_size: number of candles to download for each pair and gran.
+            min_interval: minimum seconds between the start of downloads.
+            max_candles: cap on number of candles held by warmed collectors.
+        """
+        self.pull_size: int = pull_size
+        self.min_interval: float = min_interval
+        self.max_candles: int = max_candles
+        self.queue: PriorityQueue = PriorityQueue()
+        # Collector of each pair and gran we have warmed.
+        self.warmed: Dict[Tuple[Pair, Gran], Collector] = {}
+        # Jobs from an older generation of a channel are skipped.
+        self.generations: Dict[Hashable, int] = {}
+        self._sequence = count()
+        self._last_pull: float = 0.0
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+
+    def prefetch(self, keys: Iterable[Tuple[Pair, Gran]], channel: Hashable = None):
+        """Queue pair and gran combinations to warm, most important first.
+
+        Anything still pending from an earlier call on the same channel is
+        dropped.
+
+        Args:
+            keys: (pair, gran) tuples in the order they should be downloaded.
+            channel: identifies which group of requests this replaces.
+        """
+        with self._lock:
+            generation = self.generations.get(channel, 0) + 1
+            self.generations[channel] = generation
+            for priority, (pair, gran) in enumerate(keys):
+                if (pair, gran) in self.warmed:
+                    continue
+                job = (priority, next(self._sequence), channel, generation, pair, gran)
+                self.queue.put(job)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def cancel(self, channel: Hashable = None):
+        """Drop anything still pending on channel."""
+        with self._lock:
+            self.generations[channel] = self.generations.get(channel, 0) + 1
+
+    def cached_candles(self) -> int:
+        """Total number of candles held by the collectors we have warmed.
+
+        Counted afresh each time, since collectors grow as charts pan back
+        and shrink when a CandleRetention trims them.
+        """
+        return sum(len(collector) for collector in list(self.warmed.values()))
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self._handle(*job[2:])
+            except Exception:
+                # A job that fails must not take the one worker thread with it.
+                logger.exception("Prefetching %s %s failed", job[4], job[5])
+            finally:
+                self.queue.task_done()
+
+    def _handle(self, channel: Hashable, generation: int, pair: Pair, gran: Gran):
+        with self._lock:
+            stale = generation != self.generations.get(channel)
+        if stale or (pair, gran) in self.warmed:
+            return
+        if self.cached_candles() >= self.max_candles:
+            return
+        wait = self._last_pull + self.min_interval - monotonic()
+        if wait > 0:
+            sleep(wait)
+        self._last_pull = monotonic()
+        self._warm(pair, gran)
+
+    def _warm(self, pair: Pair, gran: Gran):
+        with CollectorLock.get(pair, gran):
+            collector = CandleSource.get_collector(pair, gran)
+            if len(collector) >= self.pull_size:
+                self.warmed[(pair, gran)] = collector
+                return
+        try:
+            if isinstance(collector, ResampledCollector):
+                # Built from its source as soon as a chart grabs from it.
+                count = self.pull_size * collector.ratio
+                self._download(pair, collector.source_gran, collector.source, count)
+            elif isinstance(collector, CandleCollector):
+                self._download(pair, gran, collector, self.pull_size)
+            elif isinstance(collector, LiveTailCollector):
+                # Stale within seconds, it is fetched fresh when shown anyway.
+                return
+            else:
+                # Served from this machine (by a daemon or shared memory), so
+                # quick enough to fill under the lock.
+                with CollectorLock.get(pair, gran):
+                    collector.grab(self.pull_size)
+        except OSError:
+            # Warming is best effort, the chart will try again itself
+            # (and report the problem) if the user picks this one.
+            return
+        self.warmed[(pair, gran)] = collector
+
+    @staticmethod
+    def _download(pair: Pair, gran: Gran, collector: CandleCollector, count: int):
+        """Fill empty collector of pair and gran with its newest count candles."""
+        with CollectorLock.get(pair, gran):
+            if len(collector):
+                return
+        candles = download_candles(collector, count)
+        with CollectorLock.get(pair, gran):
+            # Does nothing if a chart got there first while we downloaded.
+            fill_collector(collector, candles)
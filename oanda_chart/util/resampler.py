@@ -0,0 +1,217 @@
+"""Build candles of a gran out of candles of a finer gran.
+
+An H4 candle is just four H1 candles rolled together: the open of the first,
+the highest high, the lowest low and the close of the last. So with the H1
+candles of a pair already downloaded, its H2, H4, H8 and D candles need not
+be downloaded at all. Likewise M2 and M4 from M1, and M10 from M5.
+
+Candles are bucketed the way Oanda aligns them for our requests: the
+CandleRequester asks for a daily alignment of 23:00 in Etc/GMT+1, which is
+midnight UTC, and candles shorter than a day start at multiples of their
+duration from there. Markets being closed for the weekend simply leaves some
+buckets short of candles (or empty, and then skipped), as with Oanda's own.
+
+A ResampledCollector stands in for the CandleCollector of the coarser gran.
+It keeps its candles in sync with the collector of the finer gran one tail
+bucket at a time, so following the live candle costs a few candles of work
+no matter how much history is held.
+"""
+
+
+from typing import List, Sequence
+
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, Gran, Ohlc
+from time_int import TimeInt
+
+from oanda_chart.util.collector_lock import CollectorLock
+
+# Seconds past midnight UTC our daily candles start (see module docstring).
+DAILY_ALIGNMENT = 0
+
+
+def bucket_time(time: int, gran: Gran) -> int:
+    """Get start time of the candle of gran that time falls in."""
+    return time - (time - DAILY_ALIGNMENT) % gran.duration
+
+
+def can_resample(gran: Gran, source_gran: Gran) -> bool:
+    """True if candles of gran can be built exactly from those of source_gran.
+
+    That is the case when source candles fit a whole number of times in a
+    candle of gran, which in turn starts at the same time every day.
+    """
+    return (
+        source_gran.duration < gran.duration <= Gran.D.duration
+        and gran.duration % source_gran.duration == 0
+        and Gran.D.duration % gran.duration == 0
+    )
+
+
+def resample(candles: Sequence[Candle], gran: Gran, source_gran: Gran) -> List[Candle]:
+    """Roll candles (oldest first) of source_gran up into candles of gran.
+
+    The last candle made is complete only when the source candles reach the
+    end of its bucket and the last of them is complete.
+    """
+    resampled = []
+    start = 0
+    count = len(candles)
+    while start < count:
+        bucket = bucket_time(int(candles[start].time), gran)
+        end = start + 1
+        while end < count and int(candles[end].time) < bucket + gran.duration:
+            end += 1
+        last = candles[end - 1]
+        complete = end < count or (
+            last.complete
+            and int(last.time) + source_gran.duration >= bucket + gran.duration
+        )
+        resampled.append(_roll(candles[start:end], bucket, complete))
+        start = end
+    return resampled
+
+
+class ResampledCollector:
+    """Stands in for the CandleCollector of gran, built from source_gran.
+
+    Only grab, update_recent and update_history are offered (which is all
+    GeoCandles, CandleRetention and the Prefetcher use). Like a real
+    collector it is not thread safe: hold the CollectorLock of pair and gran
+    while using it. The lock of pair and source_gran is taken as needed.
+    """
+
+    def __init__(
+        self, pair: Pair, gran: Gran, source: CandleCollector, source_gran: Gran
+    ):
+        """Initialize collector.
+
+        Args:
+            pair: the forex pair of the candles.
+            gran: the gran of candles to build.
+            source: collector of the candles to build them from.
+            source_gran: the (finer) gran of the source candles.
+
+        Raises:
+            ValueError: when gran cannot be built from source_gran.
+        """
+        if not can_resample(gran, source_gran):
+            raise ValueError(f"Cannot resample {source_gran} candles into {gran}")
+        self.pair: Pair = pair
+        self.gran: Gran = gran
+        self.source: CandleCollector = source
+        self.source_gran: Gran = source_gran
+        # Number of source candles in one candle of gran.
+        self.ratio: int = gran.duration // source_gran.duration
+        self._cache: List[Candle] = []
+        self.end_of_history: bool = False
+
+    def __len__(self):
+        return len(self._cache)
+
+    def grab(self, count: int) -> List[Candle]:
+        """Get most recent count candles (fewer if history runs out)."""
+        with CollectorLock.get(self.pair, self.source_gran):
+            if not self._cache:
+                self.source.grab(count * self.ratio)
+            self.update_recent()
+            self.update_history(count - len(self._cache))
+        return self._cache[-count:]
+
+    def update_recent(self) -> bool:
+        """Have the source fetch its newest candles, and rebuild the tail.
+
+        Only the candles of the last bucket we have, and any newer ones, are
+        rolled up again.
+
+        Returns:
+            True if the source fetched (it only does every so often).
+        """
+        with CollectorLock.get(self.pair, self.source_gran):
+            fetched = self.source.update_recent() if self._cache else False
+            source = self.source._cache
+            if not source:
+                return fetched
+            if not self._cache:
+                self._cache[:] = self._history(len(source))
+                return fetched
+            tail = bucket_time(int(self._cache[-1].time), self.gran)
+            start = len(source)
+            while start and int(source[start - 1].time) >= tail:
+                start -= 1
+            if start < len(source):
+                self._cache[-1:] = resample(source[start:], self.gran, self.source_gran)
+            return fetched
+
+    def update_history(self, count: int) -> bool:
+        """Prepend count older candles, having the source download as needed.
+
+        Returns:
+            True unless history ran out.
+        """
+        with CollectorLock.get(self.pair, self.source_gran):
+            while count > 0 and not self.end_of_history:
+                older = self._older_source_count()
+                if older < count * self.ratio + self.ratio:
+                    more = self.source.update_history(count * self.ratio + self.ratio)
+                    older = self._older_source_count()
+                    if not more:
+                        self.end_of_history = True
+                candles = self._history(older)
+                self._cache[:0] = candles
+                if not candles and not self.end_of_history:
+                    # Source gave us nothing older, nothing more to be had.
+                    self.end_of_history = True
+                count -= len(candles)
+        return not self.end_of_history
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _older_source_count(self) -> int:
+        """Number of source candles from before our first candle."""
+        source = self.source._cache
+        if not self._cache:
+            return len(source)
+        first = int(self._cache[0].time)
+        ndx = 0
+        while ndx < len(source) and int(source[ndx].time) < first:
+            ndx += 1
+        return ndx
+
+    def _history(self, count: int) -> List[Candle]:
+        """Roll up the first count source candles.
+
+        Unless the source is out of history, the first bucket is left out, as
+        source candles from the start of it may still be missing.
+        """
+        candles = resample(self.source._cache[:count], self.gran, self.source_gran)
+        if candles and not self.source.end_of_history:
+            del candles[0]
+        return candles
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _roll(candles: Sequence[Candle], time: int, complete: bool) -> Candle:
+    """Roll candles up into one candle at time."""
+    return Candle(
+        _roll_ohlc([_.ask for _ in candles]),
+        _roll_ohlc([_.bid for _ in candles]),
+        _roll_ohlc([_.mid for _ in candles]),
+        TimeInt(time),
+        complete,
+    )
+
+
+def _roll_ohlc(ohlcs: Sequence[Ohlc]) -> Ohlc:
+    return Ohlc(
+        ohlcs[0].o,
+        max(_.h for _ in ohlcs),
+        min(_.l for _ in ohlcs),
+        ohlcs[-1].c,
+    )
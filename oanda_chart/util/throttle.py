@@ -0,0 +1,55 @@
+"""Coalesce a burst of calls into one call every so often.
+
+Tk sends a <Motion> event for every pixel the mouse moves, often faster than
+anything can be drawn. A Throttle passes only the arguments of the latest
+call on, at most once per interval, using an after method (like that of
+any tkinter widget) to schedule it.
+
+Synopsis:
+    throttle = Throttle(widget.after, widget.after_cancel, 16, draw_hover)
+    widget.bind("<Motion>", throttle)
+"""
+
+
+from typing import Any, Callable, Optional, Tuple
+
+
+class Throttle:
+    def __init__(
+        self,
+        after: Callable[..., str],
+        after_cancel: Callable[[str], Any],
+        ms: int,
+        callback: Callable,
+    ):
+        """Initialize throttle.
+
+        Args:
+            after: schedules a call, like tkinter Misc.after(ms, func, *args).
+            after_cancel: cancels one, like tkinter Misc.after_cancel(id).
+            ms: milliseconds calls are held back to be coalesced.
+            callback: called with the arguments of the latest call.
+        """
+        self.after = after
+        self.after_cancel = after_cancel
+        self.ms: int = ms
+        self.callback: Callable = callback
+        self.args: Tuple = ()
+        self.after_id: Optional[str] = None
+
+    def __call__(self, *args):
+        self.args = args
+        if self.after_id is None:
+            self.after_id = self.after(self.ms, self._fire)
+
+    def cancel(self):
+        """Drop the call waiting to be made, if any."""
+        if self.after_id is not None:
+            self.after_cancel(self.after_id)
+            self.after_id = None
+        self.args = ()
+
+    def _fire(self):
+        self.after_id = None
+        args, self.args = self.args, ()
+        self.callback(*args)
@@ -0,0 +1,103 @@
+"""Tell when a widget can or can not be seen.
+
+Tk only sends Map and Unmap events to the window that is mapped or unmapped.
+When a notebook tab is switched, a toplevel minimized, or a frame scrolled out
+of a canvas, it is some ancestor of a chart that is unmapped, and the chart
+itself hears nothing. So a VisibilityWatch puts a bind tag of its own on the
+widget and every ancestor up to its toplevel, and on any Map or Unmap among
+them checks whether the widget is still viewable. Visibility events on the
+widget itself cover it being fully covered by other windows.
+"""
+
+
+from tkinter import Event, Misc, TclError, Widget
+from typing import Callable, List, Optional
+from uuid import uuid4
+
+
+class VisibilityWatch:
+
+    MAP = "<Map>"
+    UNMAP = "<Unmap>"
+    VISIBILITY = "<Visibility>"
+    FULLY_OBSCURED = "VisibilityFullyObscured"
+
+    def __init__(self, widget: Widget, callback: Callable[[bool], None]):
+        """Start watching widget.
+
+        Args:
+            widget: the widget to watch.
+            callback: called with True when widget becomes visible, and with
+                      False when it becomes hidden.
+        """
+        self.widget: Widget = widget
+        self.callback: Callable[[bool], None] = callback
+        self.tag: str = f"visibility{uuid4().hex}"
+        self.visible: bool = False
+        self.obscured: bool = False
+        self.check_id: Optional[str] = None
+        self.watched: List[Misc] = []
+        toplevel = widget.winfo_toplevel()
+        ancestor = widget
+        while ancestor is not None:
+            ancestor.bindtags((self.tag,) + ancestor.bindtags())
+            self.watched.append(ancestor)
+            ancestor = None if ancestor is toplevel else ancestor.master
+        widget.bind_class(self.tag, self.MAP, self.schedule_check)
+        widget.bind_class(self.tag, self.UNMAP, self.schedule_check)
+        self.visibility_id: str = widget.bind(
+            self.VISIBILITY, self.on_visibility, add="+"
+        )
+
+    def close(self):
+        """Stop watching, taking our bind tag back off the widgets."""
+        if self.check_id is not None:
+            self.widget.after_cancel(self.check_id)
+            self.check_id = None
+        for widget in self.watched:
+            try:
+                tags = widget.bindtags()
+            except TclError:
+                # Widget was already destroyed.
+                continue
+            widget.bindtags(tuple(_ for _ in tags if _ != self.tag))
+        self.watched = []
+        self.widget.unbind_class(self.tag, self.MAP)
+        self.widget.unbind_class(self.tag, self.UNMAP)
+        self._unbind_visibility()
+
+    def on_visibility(self, event: Event):
+        self.obscured = str(event.state) == self.FULLY_OBSCURED
+        self.schedule_check()
+
+    def schedule_check(self, event=None):
+        # Map and Unmap come in bursts (one per window), check once after.
+        if self.check_id is None:
+            self.check_id = self.widget.after_idle(self.check)
+
+    def check(self):
+        """Work out visibility now, calling back if it changed."""
+        self.check_id = None
+        visible = bool(self.widget.winfo_viewable()) and not self.obscured
+        if visible != self.visible:
+            self.visible = visible
+            self.callback(visible)
+
+    # ---------------------------------------------------------------------------
+    # Helpers
+    # ---------------------------------------------------------------------------
+
+    def _unbind_visibility(self):
+        """Take our Visibility binding off the widget, leaving any others."""
+        if self.visibility_id is None:
+            return
+        # (Misc.unbind with a funcid drops every binding of the sequence.)
+        try:
+            script = self.widget.bind(self.VISIBILITY)
+            lines = [_ for _ in script.split("\n") if self.visibility_id not in _]
+            self.widget.bind(self.VISIBILITY, "\n".join(lines))
+            self.widget.deletecommand(self.visibility_id)
+        except TclError:
+            # Widget was already destroyed (along with its commands).
+            pass
+        self.visibility_id = None
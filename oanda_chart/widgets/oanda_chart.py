@@ -1,25 +1,45 @@
 from math import ceil
 from tkinter import Frame, Widget
-from typing import Optional
+from typing import Any, Callable, Iterable, Optional, Tuple
 from uuid import uuid4
 
 from oanda_candles import Gran, Pair, QuoteKind
 
-from oanda_chart.env.const import Color
+from oanda_chart.annotations.annotation import Annotation, AnnotationKind
+from oanda_chart.env.const import Color, Const, RenderMode
 from oanda_chart.env.const import Event
 from oanda_chart.env.initializer import Initializer
 from oanda_chart.env.link_color import LinkColor
 from oanda_chart.geo.candle_offset import CandleOffset
 from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_pool import GeoPool
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.geo.geo_worker import GeoWorker
+from oanda_chart.indicators.indicator import IndicatorSpec
+from oanda_chart.render.scene import hover_scenes, selection_prims
 from oanda_chart.selectors.pair_flags import Geometry
 from oanda_chart.widgets.chart_canvas import ChartCanvas
 from oanda_chart.widgets.price_canvas import PriceCanvas
 from oanda_chart.widgets.scale_canvas import ScaleCanvas
 from oanda_chart.widgets.time_canvas import TimeCanvas
 from oanda_chart.util.syntax_candy import grid
+from oanda_chart.util.throttle import Throttle
+from oanda_chart.util.visibility_watch import VisibilityWatch
 
 
 class OandaChart(Frame):
+
+    # Milliseconds between checks for new snapshots while the worker is busy.
+    POLL_MS = 15
+    # Milliseconds mouse motion is coalesced over before moving the crosshair.
+    HOVER_MS = 16
+    # Milliseconds between refreshes of the newest candles: a fifth of the
+    # candle duration, kept between these bounds.
+    REFRESH_MS = 5000
+    MIN_REFRESH_MS = 1000
+    # Pixels from a level a right click can be to remove it (rather than add).
+    LEVEL_SNAP = 4
+
     def __init__(
         self,
         parent: Widget,
@@ -35,7 +55,17 @@ class OandaChart(Frame):
         Initializer.initialize(parent.winfo_toplevel())
         Frame.__init__(self, parent, background=Color.LINK_BG)
         self.top = Frame(self, background=Color.LINK_BG)
-        self.geo: Optional[GeoCandles] = None
+        # The GeoCandles and GeoPool belong to the worker thread, while the
+        # tkinter thread only ever looks at the latest snapshot.
+        self.worker: GeoWorker = GeoWorker()
+        self.geo_pool: GeoPool = GeoPool()
+        self.snapshot: Optional[GeoSnapshot] = None
+        self.loaded: bool = False
+        self.poll_id: Optional[str] = None
+        # While hidden, snapshots are not drawn and refreshes only keep the
+        # collector current. Stale means a catch-up render is owed on showing.
+        self.visible: bool = False
+        self.stale: bool = False
         self.chart = ChartCanvas(self, width, height)
         self.prices = PriceCanvas(self, height)
         self.times = TimeCanvas(self, width)
@@ -60,12 +90,28 @@ class OandaChart(Frame):
         self.pair: Optional[Pair] = None
         self.gran: Optional[Gran] = None
         self.quote_kind: Optional[QuoteKind] = None
+        self.indicator_specs: Tuple[IndicatorSpec, ...] = ()
+        self.render_mode: str = RenderMode.CANDLES
+        self.dense_offset: int = Const.DENSE_OFFSET
         self.marked_x: Optional[int] = None
         self.marked_y: Optional[int] = None
         self.price_mark: Optional[int] = None
         self.time_mark: Optional[int] = None
         self.time_event_count: Optional[int] = None
         self.run_id: Optional[str] = None
+        self.run_after_id: Optional[str] = None
+        # View coordinates of the mouse over the chart, None when not over it.
+        self.hover_xy: Optional[Tuple[int, int]] = None
+        # Whether the crosshair items on the canvases are showing.
+        self.hover_drawn: bool = False
+        self.hover_throttle = Throttle(
+            self.after, self.after_cancel, self.HOVER_MS, self.hover_move
+        )
+        # Start times of candles at either end of selection, None for none.
+        self.selection: Optional[Tuple[int, int]] = None
+        self.selection_throttle = Throttle(
+            self.after, self.after_cancel, self.HOVER_MS, self.selection_move
+        )
         if flags:
             grid(self.pair_flags, 0, 1)
         grid(self.pair_menu, 0, 2)
@@ -83,66 +129,218 @@ class OandaChart(Frame):
         # because otherwise we have no way of knowing the width and height
         # of the chart to draw geometry in.
         self.chart.bind(Event.RESIZE, self.resize)
+        self.visibility: Optional[VisibilityWatch] = VisibilityWatch(
+            self.chart, self.set_visible
+        )
+        self.bind(Event.DESTROY, self.dispose, add="+")
 
     def set_pair(self, pair: Pair):
         """Set the pair and reload data if its new."""
-        if pair != self.pair:
-            self.pair = pair
-            self.load_candles()
+        self.set_links(pair, self.gran, self.quote_kind)
 
     def set_gran(self, gran: Gran):
         """Set the granularity and reload data if its new."""
-        if gran != self.gran:
-            self.gran = gran
-            self.load_candles()
+        self.set_links(self.pair, gran, self.quote_kind)
 
     def set_quote_kind(self, quote_kind: QuoteKind):
         """Set the quote kind and reload data if its new."""
-        if quote_kind != self.quote_kind:
-            self.quote_kind = quote_kind
-            if self.geo is None:
-                self.load_candles()
-            else:
-                self.geo.update(quote_kind=quote_kind)
-                self.chart.redraw(self.geo)
+        self.set_links(self.pair, self.gran, quote_kind)
+
+    def set_indicators(self, specs: Iterable[IndicatorSpec]):
+        """Set the indicators drawn on the chart (replacing any before)."""
+        specs = self.indicator_specs = tuple(specs)
+        if self.loaded:
+            self.submit(lambda geo: geo.set_indicators(specs))
+
+    def set_render_mode(self, mode: str, dense_offset: Optional[int] = None):
+        """Set how candles are drawn.
+
+        Args:
+            mode: a RenderMode (candles, OHLC bars, close line or high/low area).
+            dense_offset: candle offsets below this (zoomed far out) are drawn
+                          as a close line whatever the mode, 0 to never switch,
+                          None to leave it as it was.
+        Raises:
+            ValueError: for an unknown mode.
+        """
+        if mode not in GeoCandles.RENDER_MODES:
+            raise ValueError(f"Unknown render mode: {mode}")
+        self.render_mode = mode
+        if dense_offset is not None:
+            self.dense_offset = dense_offset
+        dense_offset = self.dense_offset
+        if self.loaded:
+            self.submit(lambda geo: geo.set_render_mode(mode, dense_offset))
+
+    def set_links(
+        self,
+        pair: Optional[Pair],
+        gran: Optional[Gran],
+        quote_kind: Optional[QuoteKind],
+    ):
+        """Set pair, gran, and quote kind together, reloading at most once."""
+        reload = pair != self.pair or gran != self.gran
+        requote = quote_kind != self.quote_kind
+        self.pair = pair
+        self.gran = gran
+        self.quote_kind = quote_kind
+        if reload or (requote and not self.loaded):
+            self.load_candles()
+        elif requote:
+            self.submit(lambda geo: geo.update(quote_kind=quote_kind))
 
     def load_candles(self):
+        self.hide_hover()
+        self.remove_bindings()
+        self.snapshot = None
         if self.pair and self.gran and self.quote_kind:
-            self.remove_bindings()
-            if self.geo is None:
-                width = self.event_width
-                height = self.event_height
-            else:
-                width = self.geo.xandles.width
-                height = self.geo.yrids.height
-            self.geo = GeoCandles(
-                width=width,
-                height=height,
-                pair=self.pair,
-                gran=self.gran,
-                quote_kind=self.quote_kind,
-                offset=CandleOffset.DEFAULT,
-                ndx=0,
-                price_view=True,
-            )
-            self.chart.redraw(self.geo)
-            self.prices.redraw(self.geo)
-            self.scales.redraw(self.geo)
-            self.times.redraw(self.geo)
-            self.apply_bindings()
-            self.update_runner()
+            self.loaded = True
+            pair, gran, quote_kind = self.pair, self.gran, self.quote_kind
+            width, height = self.event_width, self.event_height
+            specs = self.indicator_specs
+            mode, dense_offset = self.render_mode, self.dense_offset
+            selecting = self.selection is not None
+
+            def factory() -> GeoCandles:
+                geo = self.geo_pool.get(pair, gran)
+                if geo is None:
+                    geo = GeoCandles(
+                        width=width,
+                        height=height,
+                        pair=pair,
+                        gran=gran,
+                        quote_kind=quote_kind,
+                        offset=CandleOffset.DEFAULT,
+                        ndx=0,
+                        price_view=True,
+                        retention=self.manager.retention,
+                    )
+                    self.geo_pool.put(geo)
+                else:
+                    geo.reactivate(width, height, quote_kind)
+                if geo.indicator_specs != specs:
+                    geo.set_indicators(specs)
+                geo.set_render_mode(mode, dense_offset)
+                if selecting:
+                    geo.update_stats_index(start=True)
+                return geo
+
+            self.worker.load(factory)
+            self.schedule_poll()
         else:
-            self.remove_bindings()
+            self.loaded = False
+            self.worker.load(lambda: None)
             self.chart.clear()
             self.prices.clear()
             self.scales.clear()
             self.times.clear()
 
+    def submit(self, job: Callable[[GeoCandles], Any]):
+        """Have the worker thread run job on the GeoCandles, then redraw."""
+        self.worker.submit(job)
+        self.schedule_poll()
+
+    def schedule_poll(self):
+        if self.poll_id is None:
+            self.poll_id = self.after(self.POLL_MS, self.poll)
+
+    def poll(self):
+        """Draw the newest snapshot from worker, keep polling while it is busy."""
+        self.poll_id = None
+        # Check busy before taking, so a snapshot published in between is not
+        # left behind when the worker goes idle.
+        busy = self.worker.busy()
+        try:
+            snapshot = self.worker.take()
+        finally:
+            if busy:
+                self.schedule_poll()
+        if snapshot is not None:
+            if self.snapshot is None:
+                self.apply_bindings()
+            self.snapshot = snapshot
+            if self.visible:
+                self.full_draw()
+            else:
+                self.stale = True
+            self.update_runner()
+
+    def set_visible(self, visible: bool):
+        """Called back when the chart is shown or hidden."""
+        self.visible = visible
+        if visible and self.stale:
+            # One refresh, drawn once, for everything missed while hidden.
+            self.stale = False
+            if self.loaded:
+                self.submit(lambda geo: geo.refresh())
+
+    def dispose(self, event=None):
+        """Let go of everything the chart holds (called when it is destroyed).
+
+        Pending after callbacks are cancelled (they would otherwise keep the
+        chart alive), the worker thread is ended, and the pooled GeoCandles
+        are dropped, after which candle history no other chart holds is
+        released by the retention policy.
+        """
+        if self.visibility is None:
+            return
+        self.run_id = None
+        for after_id in (self.poll_id, self.run_after_id):
+            if after_id is not None:
+                self.after_cancel(after_id)
+        self.poll_id = self.run_after_id = None
+        self.hover_throttle.cancel()
+        self.selection_throttle.cancel()
+        self.visibility.close()
+        self.visibility = None
+        self.snapshot = None
+        geo_pool = self.geo_pool
+        retention = self.manager.retention
+
+        def finish():
+            geo_pool.clear()
+            retention.release()
+
+        self.worker.close(finish)
+
+    def get_report(self) -> str:
+        """Get human readable report on chart geometry and its GeoPool.
+
+        (This method is meant to assist development and debugging).
+        """
+        geo = self.worker.geo
+        geo_report = "GeoCandles State: None\n" if geo is None else geo.get_report()
+        return geo_report + self.geo_pool.get_report() + self.get_render_report()
+
+    def get_render_report(self) -> str:
+        """Get human readable report on Tk calls the last render of each canvas took.
+
+        (This method is meant to assist development and debugging).
+        """
+        lines = list()
+        lines.append("Last Render Diff (+created ~moved *configured -deleted =kept):\n")
+        for name, canvas in [
+            ("chart", self.chart),
+            ("prices", self.prices),
+            ("times", self.times),
+            ("scales", self.scales),
+        ]:
+            stats = canvas.differ.last
+            lines.append(f"    {name:<6}: {stats} (size {stats.size})\n")
+        return "".join(lines)
+
     def apply_bindings(self):
         self.chart.bind(Event.LEFT_CLICK, self.scroll_start)
         self.chart.bind(Event.LEFT_DRAG, self.scroll_move)
         self.chart.bind(Event.LEFT_RELEASE, self.scroll_release)
         self.chart.bind(Event.MOUSE_WHEEL, self.squeeze_or_expand)
+        self.chart.bind(Event.MOTION, self.hover)
+        self.chart.bind(Event.LEAVE, self.hide_hover)
+        self.chart.bind(Event.RIGHT_CLICK, self.toggle_level)
+        self.chart.bind(Event.SHIFT_LEFT_CLICK, self.select_start)
+        self.chart.bind(Event.SHIFT_LEFT_DRAG, self.select_drag)
+        self.chart.bind(Event.SHIFT_LEFT_RELEASE, self.select_end)
+        self.chart.bind(Event.ESCAPE, self.clear_selection)
         self.scales.bind(Event.LEFT_CLICK, self.go_home)
         self.prices.bind(Event.LEFT_CLICK, self.prices_scroll_start)
         self.prices.bind(Event.LEFT_DRAG, self.prices_scroll_move)
@@ -162,13 +360,26 @@ class OandaChart(Frame):
         self.chart.unbind(Event.LEFT_DRAG)
         self.chart.unbind(Event.LEFT_RELEASE)
         self.chart.unbind(Event.MOUSE_WHEEL)
+        self.chart.unbind(Event.MOTION)
+        self.chart.unbind(Event.LEAVE)
+        self.chart.unbind(Event.RIGHT_CLICK)
+        self.chart.unbind(Event.SHIFT_LEFT_CLICK)
+        self.chart.unbind(Event.SHIFT_LEFT_DRAG)
+        self.chart.unbind(Event.SHIFT_LEFT_RELEASE)
+        self.chart.unbind(Event.ESCAPE)
         self.chart.unbind(Event.DOUBLE_CLICK)
         self.scales.unbind(Event.LEFT_CLICK)
         self.prices.unbind(Event.LEFT_CLICK)
         self.prices.unbind(Event.LEFT_DRAG)
         self.prices.unbind(Event.DOUBLE_CLICK)
+        self.chart.unbind(Event.LEFT)
+        self.chart.unbind(Event.RIGHT)
+        self.chart.unbind(Event.UP)
+        self.chart.unbind(Event.DOWN)
+        self.chart.unbind(Event.RETURN)
 
     def scroll_start(self, event):
+        self.hide_hover()
         self.marked_x = event.x
         self.marked_y = event.y
         self.chart.scan_mark(event.x, event.y)
@@ -176,18 +387,124 @@ class OandaChart(Frame):
         self.times.scan_mark(event.x, 0)
 
     def quick_draw(self):
-        self.chart.draw_badge(self.geo)
-        self.chart.draw_price_grid(self.geo)
-        self.chart.draw_time_grid(self.geo)
-        self.chart.draw_candles(self.geo)
+        self.chart.render(self.snapshot)
 
     def full_draw(self):
-        self.chart.redraw(self.geo)
-        self.prices.redraw(self.geo)
-        self.scales.redraw(self.geo)
-        self.times.redraw(self.geo)
+        self.chart.redraw(self.snapshot)
+        self.prices.redraw(self.snapshot)
+        self.scales.redraw(self.snapshot)
+        self.times.redraw(self.snapshot)
+        if self.hover_xy is not None or self.hover_drawn:
+            # The candle under the mouse may have moved or changed.
+            self.draw_hover()
+        self.draw_selection()
+
+    def hover(self, event):
+        self.hover_throttle(event.x, event.y)
+
+    def hover_move(self, x: int, y: int):
+        """Move crosshair to view coordinates x, y (throttled <Motion> handler)."""
+        self.hover_xy = (x, y)
+        self.draw_hover()
+
+    def hide_hover(self, event=None):
+        """Hide crosshair, tooltip and markers (the items are kept for reuse)."""
+        self.hover_throttle.cancel()
+        if self.hover_xy is None:
+            return
+        self.hover_xy = None
+        self.draw_hover()
+
+    def draw_hover(self):
+        """Bring crosshair items up to date with the mouse and snapshot.
+
+        Only ever moves the few crosshair items and changes their text, the
+        candles and everything else on the canvases are left alone.
+        """
+        if self.snapshot is None or not self.visible:
+            return
+        view_x = self.chart.canvasx(0)
+        view_y = self.chart.canvasy(0)
+        if self.hover_xy is None:
+            x = y = None
+        else:
+            x = view_x + self.hover_xy[0]
+            y = view_y + self.hover_xy[1]
+        scenes = hover_scenes(self.snapshot, x, y, view_x, view_y)
+        self.chart.hover(scenes.chart)
+        self.prices.hover(scenes.prices)
+        self.times.hover(scenes.times)
+        self.hover_drawn = self.hover_xy is not None
+
+    def select_start(self, event):
+        """Start selecting candles from the one under a shift click."""
+        # Not a pan, so the plain release that may follow does not shift.
+        self.marked_x = self.marked_y = None
+        self.chart.focus_force()
+        if self.snapshot is None:
+            return
+        candle = self.snapshot.candle_at_x(int(self.chart.canvasx(event.x)))
+        if candle is None:
+            return
+        self.hide_hover()
+        self.selection = (candle.candle.time, candle.candle.time)
+        if self.snapshot.stats_index is None:
+            # The stats come with the next snapshot.
+            self.submit(lambda geo: geo.update_stats_index(start=True))
+        self.draw_selection()
+
+    def select_drag(self, event):
+        self.selection_throttle(event.x)
+
+    def select_end(self, event):
+        self.selection_throttle.cancel()
+        self.selection_move(event.x)
+
+    def selection_move(self, x: int):
+        """Stretch selection to candle at view x (throttled drag handler)."""
+        if self.selection is None or self.snapshot is None:
+            return
+        candle = self.snapshot.candle_at_x(int(self.chart.canvasx(x)))
+        if candle is not None:
+            self.selection = (self.selection[0], candle.candle.time)
+            self.draw_selection()
+
+    def clear_selection(self, event=None):
+        self.selection_throttle.cancel()
+        self.selection = None
+        self.draw_selection()
+
+    def draw_selection(self):
+        """Bring selection box and stats up to date with the snapshot."""
+        if self.snapshot is None or not self.visible:
+            return
+        self.chart.select(
+            selection_prims(
+                self.snapshot,
+                self.selection,
+                self.chart.canvasx(0),
+                self.chart.canvasy(0),
+            )
+        )
+
+    def toggle_level(self, event):
+        """Remove the level line near a right click, or add one if none is."""
+        if self.snapshot is None:
+            return
+        y = self.chart.canvasy(event.y)
+        for annotation in self.snapshot.annotations:
+            if (
+                annotation.kind == AnnotationKind.LEVEL
+                and abs(annotation.coords[1] - y) <= self.LEVEL_SNAP
+            ):
+                self.manager.remove_annotation(self.pair, annotation.id)
+                return
+        fp = self.snapshot.y_to_fp(round(y))
+        self.manager.add_annotation(self.pair, Annotation.level(fp))
 
     def scroll_move(self, event):
+        if self.marked_x is None:
+            return
         self.update_runner()
         self.chart.scan_dragto(event.x, event.y, gain=1)
         self.prices.scan_dragto(0, event.y, gain=1)
@@ -195,34 +512,37 @@ class OandaChart(Frame):
         self.quick_draw()
 
     def step_up(self, event):
-        self.geo.update(price_view=False)
-        y_shift = -1 * ceil(self.geo.yrids.height / 4)
-        self.update_runner()
-        self.chart.scan_dragto(0, y_shift)
-        self.geo.shift(0, y_shift)
-        self.full_draw()
+        if self.snapshot is None:
+            return
+        self.step(0, -1 * ceil(self.snapshot.height / 4))
 
     def step_down(self, event):
-        self.geo.update(price_view=False)
-        y_shift = ceil(self.geo.yrids.height / 4)
-        self.update_runner()
-        self.chart.scan_dragto(0, y_shift)
-        self.geo.shift(0, y_shift)
-        self.full_draw()
+        if self.snapshot is None:
+            return
+        self.step(0, ceil(self.snapshot.height / 4))
 
     def step_left(self, event):
-        x_shift = -1 * ceil(self.geo.xandles.width / 4)
-        self.chart.scan_dragto(x_shift, 0)
-        self.update_runner()
-        self.geo.shift(x_shift, 0)
-        self.full_draw()
+        if self.snapshot is None:
+            return
+        self.step(-1 * ceil(self.snapshot.width / 4), 0)
 
     def step_right(self, event):
-        x_shift = ceil(self.geo.xandles.width / 4)
-        self.chart.scan_dragto(x_shift, 0)
-        self.geo.shift(x_shift, 0)
+        if self.snapshot is None:
+            return
+        self.step(ceil(self.snapshot.width / 4), 0)
+
+    def step(self, x_shift: int, y_shift: int):
+        """Step view by the given pixels (a vertical step ends price view)."""
+
+        def job(geo: GeoCandles):
+            with geo.transaction():
+                if y_shift:
+                    geo.update(price_view=False)
+                geo.shift(x_shift, y_shift)
+
+        self.chart.scan_dragto(x_shift, y_shift)
         self.update_runner()
-        self.full_draw()
+        self.submit(job)
 
     def prices_scroll_start(self, event):
         self.price_mark = event.y
@@ -234,103 +554,127 @@ class OandaChart(Frame):
     def prices_scroll_move(self, event):
         sensitivity = 500.0  # lower is more sensitive
         movement = event.y - self.price_mark
-        new_fpp = self.geo.yrids.fpp * (float(sensitivity + movement) / sensitivity)
-        if (movement > 0 and new_fpp > 175) or (movement < 0 and new_fpp < 0.05):
-            # Around 175 or larger even the entire chart of monthly candles are short.
-            # and the negative price part of chart is starting to show up. While for
-            # fpp's smaller than 0.05, even the lowest time frame candles are too tall
-            # to make out. So we disallow changing fpp beyond these limits.
-            return
-        self.geo.update(fpp=new_fpp)
+        ratio = float(sensitivity + movement) / sensitivity
+
+        def job(geo: GeoCandles):
+            new_fpp = geo.yrids.fpp * ratio
+            if (movement > 0 and new_fpp > 175) or (movement < 0 and new_fpp < 0.05):
+                # Around 175 or larger even the entire chart of monthly candles are
+                # short and the negative price part of chart is starting to show up.
+                # While for fpp's smaller than 0.05, even the lowest time frame
+                # candles are too tall to make out. So we disallow changing fpp
+                # beyond these limits.
+                return
+            geo.update(fpp=new_fpp)
+
         self.update_runner()
-        self.full_draw()
+        self.submit(job)
         self.price_mark = event.y
 
     def scroll_release(self, event):
         self.chart.focus_force()
+        if self.marked_x is None:
+            return
         shift_x = self.marked_x - event.x
         shift_y = self.marked_y - event.y
-        if abs(shift_y) > abs(shift_x) * 2 and abs(shift_y) > 100:
-            # User is trying to move vertically, so turn off price_view
-            self.geo.update(price_view=False)
+        # User is trying to move vertically if so, so turn off price_view
+        vertical = abs(shift_y) > abs(shift_x) * 2 and abs(shift_y) > 100
+
+        def job(geo: GeoCandles):
+            with geo.transaction():
+                if vertical:
+                    geo.update(price_view=False)
+                geo.shift(shift_x, shift_y)
+
         self.chart.scan_dragto(event.x, event.y, gain=1)
-        self.geo.shift(shift_x, shift_y)
         self.update_runner()
-        self.full_draw()
+        self.submit(job)
 
     def go_home(self, event):
-        self.geo.xandles.go_home()
-        self.geo.update(price_view=True)
-        self.chart.redraw(self.geo)
-        self.geo.yrids.view_set(self.geo.xandles)
         self.update_runner()
-        self.full_draw()
+        self.submit(lambda geo: geo.go_home())
 
     def resize(self, event):
-        self.event_width = event.width
-        self.event_height = event.height
-        if self.geo is None:
+        width = self.event_width = event.width
+        height = self.event_height = event.height
+        if not self.loaded:
             return
-        self.geo.update(
-            width=event.width, height=event.height, price_view=self.geo.price_view
+        self.submit(
+            lambda geo: geo.update(
+                width=width, height=height, price_view=geo.price_view
+            )
         )
-        self.update_runner()
-        self.full_draw()
 
     def squeeze_or_expand(self, event):
-        old_offset = self.geo.xandles.offset
         if event.delta > 0:
-            new_offset = CandleOffset(old_offset + 1)
+            self.change_offset(1)
         elif event.delta < 0:
-            new_offset = CandleOffset(old_offset - 1)
-        else:
-            return
-        self.geo.update(offset=new_offset, price_view=self.geo.price_view)
-        self.update_runner()
-        self.full_draw()
+            self.change_offset(-1)
 
     def times_squeeze_or_expand(self, event):
         delta = self.time_mark - event.x
-        old_offset = self.geo.xandles.offset
         # If we counted every event, mouse movement would be too sensitive, so
         # we enumerate the events and only move one out of 10 of them.
         self.time_event_count += 1
         if self.time_event_count % 10:
             return
         if delta > 0:
-            new_offset = CandleOffset(old_offset + 1)
+            self.change_offset(1)
         elif delta < 0:
-            new_offset = CandleOffset(old_offset - 1)
-        else:
-            return
-        self.geo.update(offset=new_offset, price_view=self.geo.price_view)
+            self.change_offset(-1)
+
+    def change_offset(self, step: int):
+        """Make candles wider (positive step) or narrower (negative step)."""
+
+        def job(geo: GeoCandles):
+            new_offset = CandleOffset(geo.xandles.offset + step)
+            geo.update(offset=new_offset, price_view=geo.price_view)
+
         self.update_runner()
-        self.full_draw()
+        self.submit(job)
 
     def default_squeeze(self, event):
         new_offset = CandleOffset.DEFAULT
-        self.geo.update(offset=new_offset, price_view=self.geo.price_view)
         self.update_runner()
-        self.full_draw()
+        self.submit(
+            lambda geo: geo.update(offset=new_offset, price_view=geo.price_view)
+        )
 
     def apply_price_view(self, event):
-        self.geo.update(price_view=True)
         self.update_runner()
-        self.full_draw()
+        self.submit(lambda geo: geo.update(price_view=True))
 
     def update_runner(self):
         if (
             self.run_id is None
-            and self.geo.xandles.showing_recent
+            and self.snapshot is not None
+            and self.snapshot.showing_recent
             and self.pair is not None
         ):
             run_id = self.run_id = str(uuid4())
-            self.after(100, self._inner_update_runner, run_id)
+            self.run_after_id = self.after(100, self._inner_update_runner, run_id)
 
     def _inner_update_runner(self, run_id: str):
-        if not self.geo.xandles.showing_recent or self.pair is None:
+        self.run_after_id = None
+        if (
+            self.snapshot is None
+            or not self.snapshot.showing_recent
+            or self.pair is None
+        ):
             self.run_id = None
         if self.run_id == run_id:
-            self.geo.refresh()
-            self.full_draw()
-            self.after(5000, self._inner_update_runner, run_id)
+            if self.visible:
+                self.submit(lambda geo: geo.refresh())
+            else:
+                self.stale = True
+                self.worker.submit(lambda geo: geo.keep_up(), snapshot=False)
+            self.run_after_id = self.after(
+                self.get_refresh_ms(), self._inner_update_runner, run_id
+            )
+
+    def get_refresh_ms(self) -> int:
+        """Get milliseconds between refreshes for the gran of the chart."""
+        if self.gran is None:
+            return self.REFRESH_MS
+        ms = self.gran.duration * 200
+        return max(self.MIN_REFRESH_MS, min(self.REFRESH_MS, ms))
@@ -1,11 +1,9 @@
 from tkinter import Canvas, Widget
 
-from forex_types import FracPips
-
-
 from oanda_chart.env.const import Color, Tag, Const
-from oanda_chart.env.fonts import Fonts
-from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render.differ import CanvasDiffer
+from oanda_chart.render.scene import scale_scene
 
 
 class ScaleCanvas(Canvas):
@@ -23,39 +21,11 @@ class ScaleCanvas(Canvas):
             highlightthickness=0,
             height=self.HEIGHT,
         )
+        self.differ = CanvasDiffer(self, batch=True)
 
     def clear(self):
         self.delete(Tag.SCALE_ITEM)
+        self.differ.forget()
 
-    def redraw(self, geo: GeoCandles):
-        self.delete(Tag.SCALE_ITEM)
-        if geo.yrids.scale is None or not geo.xandles.grid_list:
-            return
-        fp_grid: FracPips = geo.yrids.scale.interval
-        if fp_grid % 10:
-            pips = round(fp_grid / 10, 1)
-        else:
-            pips = round(fp_grid / 10)
-        pip_text = f"{pips} p"
-        time_text = geo.xandles.grid_list[0][1].name
-        self.create_line(0, 0, self.WIDTH, 0, fill=Color.SLASH, tags=Tag.SCALE_ITEM)
-        self.create_line(0, 0, 0, self.HEIGHT, fill=Color.SLASH, tags=Tag.SCALE_ITEM)
-        self.create_line(
-            0, 0, self.WIDTH, self.HEIGHT, fill=Color.SLASH, tags=Tag.SCALE_ITEM
-        )
-        self.create_text(
-            57,
-            8,
-            fill=Color.SCALE_TEXT,
-            font=Fonts.FIXED_10,
-            text=pip_text,
-            tags=Tag.SCALE_ITEM,
-        )
-        self.create_text(
-            29,
-            34,
-            fill=Color.SCALE_TEXT,
-            font=Fonts.FIXED_10,
-            text=time_text,
-            tags=Tag.SCALE_ITEM,
-        )
+    def redraw(self, snapshot: GeoSnapshot):
+        self.differ.apply(scale_scene(snapshot))
@@ -1,14 +1,11 @@
 from tkinter import Canvas, Widget
-from typing import Tuple, List
-from statistics import median
-
-from forex_types import Price, FracPips, Currency
-
+from typing import List
 
 from oanda_chart.env.const import Color, Tag, Const
-from oanda_chart.env.fonts import Fonts
-from oanda_chart.geo.scale_time import ScaleTime
-from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render.differ import CanvasDiffer
+from oanda_chart.render.prim import Prim
+from oanda_chart.render.scene import time_scene
 
 
 class TimeCanvas(Canvas):
@@ -25,47 +22,26 @@ class TimeCanvas(Canvas):
             highlightthickness=0,
             height=self.HEIGHT,
         )
+        self.differ = CanvasDiffer(self, batch=True)
+        # Crosshair items, kept apart so hovering never touches the rest.
+        self.hover_differ = CanvasDiffer(self, batch=True)
 
     def clear(self):
         self.delete(Tag.TIME_GRID)
         self.delete(Tag.TIME_TEXT)
+        self.delete(Tag.HOVER)
+        self.differ.forget()
+        self.hover_differ.forget()
 
-    def redraw(self, geo: GeoCandles):
-        self.clear()
-        scroll_width: int = geo.xandles.scroll_width
-        grid_list: List[Tuple[int, ScaleTime]] = geo.xandles.grid_list
-        if scroll_width is None or grid_list is None:
-            return
+    def redraw(self, snapshot: GeoSnapshot):
         self.configure(
-            scrollregion=(0, 0, scroll_width, self.HEIGHT), width=geo.xandles.width,
+            scrollregion=(0, 0, snapshot.scroll_width, self.HEIGHT),
+            width=snapshot.width,
         )
-        pixels_left: int = geo.xandles.pixels_left
-        widths = []
-        for ndx in range(1, len(grid_list)):
-            x_left, scale_time = grid_list[ndx - 1]
-            x_right, scale_time_right = grid_list[ndx]
-            upper_text, lower_text = scale_time.get_labels()
-            x_left += pixels_left
-            x_right += pixels_left
-            width = x_right - x_left
-            widths.append(width)
-            x = x_left + (width // 2)
-            self.create_text(
-                x,
-                10,
-                fill=Color.TIME_TEXT,
-                text=upper_text,
-                tags=Tag.TIME_TEXT,
-                font=Fonts.REGULAR,
-            )
-            self.create_text(
-                x,
-                30,
-                fill=Color.TIME_TEXT,
-                text=lower_text,
-                tags=Tag.TIME_TEXT,
-                font=Fonts.REGULAR,
-            )
-        median_width = median(widths) if widths else Const.MIN_TIME_GRID_WIDTH
-        # TODO ----
         self.xview_moveto(Const.ONE_THIRD)
+        if self.differ.apply(time_scene(snapshot)).created:
+            self.tag_raise(Tag.HOVER)
+
+    def hover(self, prims: List[Prim]):
+        """Bring crosshair items up to date (see scene.hover_scenes)."""
+        self.hover_differ.apply(prims)
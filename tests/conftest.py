@@ -0,0 +1,75 @@
+"""Synthetic candles so tests can run without an Oanda connection."""
+
+from typing import List
+
+import pytest
+from forex_types import Price
+from oanda_candles import Candle, CandleMeister, Gran, Ohlc
+from time_int import TimeInt
+
+from oanda_chart.annotations.annotation_hub import AnnotationHub
+
+# Sunday 2020-06-07 00:00 UTC
+START = TimeInt(1591488000)
+
+
+def make_candles(count: int, gran: Gran = Gran.H1, start: int = START) -> List[Candle]:
+    """Make count candles of gran, zig zagging around 1.1000 (last incomplete)."""
+    candles = []
+    for ndx in range(count):
+        base = 11000 + (ndx % 40) * 3 - (ndx % 7) * 5
+        o, c = base, base + (5 if ndx % 3 else -4)
+        h, l = max(o, c) + 6, min(o, c) - 6
+        prices = [Price(f"{_ / 10000:.4f}") for _ in (o, h, l, c)]
+        bid = Ohlc(*prices)
+        ask = Ohlc(*[_.add_pips(1) for _ in prices])
+        mid = Ohlc(*prices)
+        time = TimeInt(start + ndx * gran.duration)
+        candles.append(Candle(ask, bid, mid, time, ndx != count - 1))
+    return candles
+
+
+class FakeCollector:
+    """Stands in for CandleCollector, counting how often it is asked."""
+
+    def __init__(self, candles: List[Candle]):
+        self._cache = list(candles)
+        self.grab_count = 0
+        self.end_of_history = True
+
+    def __len__(self):
+        return len(self._cache)
+
+    def grab(self, count: int) -> List[Candle]:
+        self.grab_count += 1
+        return self._cache[-count:]
+
+    def update_recent(self) -> bool:
+        return False
+
+    def update_history(self, count: int) -> bool:
+        return False
+
+
+@pytest.fixture
+def fake_collectors(monkeypatch):
+    """Route CandleMeister.get_collector to FakeCollectors of 2000 candles."""
+    collectors = {}
+
+    def get_collector(pair, gran):
+        key = (pair, gran)
+        if key not in collectors:
+            collectors[key] = FakeCollector(make_candles(2000, gran))
+        return collectors[key]
+
+    monkeypatch.setattr(CandleMeister, "get_collector", get_collector)
+    return collectors
+
+
+@pytest.fixture(autouse=True)
+def annotation_directory(tmp_path):
+    """Keep annotations of tests in a temporary folder, not the work folder."""
+    directory = tmp_path.joinpath("annotations")
+    AnnotationHub.set_directory(directory)
+    yield directory
+    AnnotationHub.set_directory(AnnotationHub.DIRECTORY)
@@ -0,0 +1,112 @@
+import random
+
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.annotations.annotation import Annotation, AnnotationKind
+from oanda_chart.annotations.annotation_hub import AnnotationHub
+from oanda_chart.annotations.annotation_index import AnnotationIndex
+from oanda_chart.env.const import Tag
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render.scene import chart_scene
+from tests.conftest import START
+
+
+def brute_query(annotations, time1, time2, fp_low, fp_high):
+    found = set()
+    for annotation in annotations:
+        low, high = annotation.price_range()
+        if high < fp_low or low > fp_high:
+            continue
+        if annotation.kind == AnnotationKind.LEVEL or (
+            annotation.time1 <= time2 and annotation.time2 >= time1
+        ):
+            found.add(annotation.id)
+    return found
+
+
+def random_annotations(rng, count):
+    annotations = []
+    for _ in range(count):
+        if rng.random() < 0.3:
+            annotations.append(Annotation.level(rng.randrange(100_000, 120_000)))
+        else:
+            time1 = START + rng.randrange(0, 3_000_000)
+            span = rng.choice([60, 3_600, 86_400, 2_000_000])
+            annotations.append(
+                Annotation.trend(
+                    time1,
+                    rng.randrange(100_000, 120_000),
+                    time1 + rng.randrange(0, span),
+                    rng.randrange(100_000, 120_000),
+                )
+            )
+    return annotations
+
+
+def test_index_query_matches_brute_force():
+    rng = random.Random(7)
+    annotations = random_annotations(rng, 500)
+    index = AnnotationIndex(annotations)
+    for annotation in annotations[:100]:
+        assert index.remove(annotation.id)
+    assert not index.remove(annotations[0].id)
+    kept = annotations[100:]
+    assert len(index) == len(kept)
+    for _ in range(200):
+        time1 = START + rng.randrange(-100_000, 3_000_000)
+        time2 = time1 + rng.randrange(0, 500_000)
+        fp_low = rng.randrange(95_000, 120_000)
+        fp_high = fp_low + rng.randrange(0, 5_000)
+        found = index.query(time1, time2, fp_low, fp_high)
+        assert len(found) == len({_.id for _ in found})
+        assert {_.id for _ in found} == brute_query(kept, time1, time2, fp_low, fp_high)
+
+
+def test_annotations_saved_and_shared(annotation_directory):
+    level = Annotation.level(110_250)
+    trend = Annotation.trend(START + 7200, 110_000, START, 110_300, color="#FF0000")
+    assert trend.time1 == START and trend.fp1 == 110_300
+    annotations = AnnotationHub.get(Pair.EUR_USD)
+    assert AnnotationHub.get(Pair.EUR_USD) is annotations
+    annotations.add(level)
+    annotations.add(trend)
+    assert annotation_directory.joinpath("EUR_USD.json").exists()
+    # Load them again from disk.
+    AnnotationHub.set_directory(annotation_directory)
+    loaded = AnnotationHub.get(Pair.EUR_USD).get_all()
+    assert sorted(loaded) == sorted([level, trend])
+    assert AnnotationHub.get(Pair.GBP_USD).get_all() == []
+
+
+def test_snapshot_projects_annotations_in_region(fake_collectors):
+    h1 = GeoCandles(pair=Pair.EUR_USD, gran=Gran.H1, width=700, height=400)
+    m5 = GeoCandles(pair=Pair.EUR_USD, gran=Gran.M5, width=700, height=400)
+    assert h1.annotations is m5.annotations
+    yrids = h1.yrids
+    xandles = h1.xandles
+    inside = Annotation.level((yrids.scroll_bot + yrids.scroll_top) // 2)
+    above = Annotation.level(yrids.scroll_top + 100)
+    candle = xandles.candles[xandles.end_ndx - 10]
+    trend = Annotation.trend(
+        candle.time, yrids.scroll_bot, candle.time + 7200, yrids.scroll_top
+    )
+    long_ago = Annotation.trend(START - 86_400 * 30, 110_000, START, 110_000)
+    for annotation in (inside, above, trend, long_ago):
+        h1.annotations.add(annotation)
+    snapshot = GeoSnapshot.take(h1)
+    shown = {_.id: _ for _ in snapshot.annotations}
+    assert set(shown) == {inside.id, trend.id}
+    y = yrids.fp_to_y(inside.fp1)
+    assert shown[inside.id].coords == (0, y, xandles.scroll_width, y)
+    x1, y1, x2, y2 = shown[trend.id].coords
+    ndx = xandles.end_ndx - 10 - xandles.start_ndx
+    assert x1 == xandles.pixels_left + ndx * xandles.offset + xandles.offset.wick()
+    assert x2 == x1 + 2 * xandles.offset
+    assert (y1, y2) == (
+        yrids.fp_to_y(yrids.scroll_bot),
+        yrids.fp_to_y(yrids.scroll_top),
+    )
+    lines = [_ for _ in chart_scene(snapshot, 0, 0) if _.key[0] == Tag.ANNOTATION]
+    assert len(lines) == 2
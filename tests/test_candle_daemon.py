@@ -0,0 +1,230 @@
+import multiprocessing
+import socket
+from types import SimpleNamespace
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Candle, CandleCollector, Gran
+from oanda_candles.candle_requester import CandleRequester
+
+from oanda_chart.chart_manager import ChartManager
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.service.candle_daemon import CandleDaemon
+from oanda_chart.service.daemon_client import DaemonClient, DaemonCollector
+from oanda_chart.service.protocol import (
+    DaemonError,
+    Flag,
+    Op,
+    pack_candles,
+    pack_error,
+    pack_request,
+    read_response,
+    unpack_request,
+)
+from oanda_chart.util.candle_source import CandleSource
+from tests.conftest import FakeCollector, make_candles
+
+# Stands in for the CandleClient a CandleRequester is made with.
+CLIENT = SimpleNamespace(session=None, real=False, token="")
+
+
+class SyntheticRequester(CandleRequester):
+    """Answers the requests of a CandleCollector from a series, not Oanda."""
+
+    def __init__(self, series, now):
+        super().__init__(CLIENT, Pair.EUR_USD, Gran.H1)
+        self.series = series
+        self.now = now
+        self.sent = 0
+
+    def revealed(self):
+        last = self.series[self.now - 1]
+        incomplete = Candle(last.ask, last.bid, last.mid, last.time, False)
+        return self.series[: self.now - 1] + [incomplete]
+
+    def _request(self, count=None, before=None, after=None):
+        candles = self.revealed()
+        if after is not None:
+            candles = [_ for _ in candles if _.time >= after][:count]
+        elif before is not None:
+            candles = [_ for _ in candles if _.time < before][-count:]
+        else:
+            candles = candles[-count:]
+        self.sent += len(candles)
+        return candles
+
+
+def synthetic_upstream(requesters):
+    """Get upstream making real CandleCollectors of synthetic candles."""
+
+    def upstream(pair, gran):
+        if pair == Pair.GBP_USD:
+            raise ConnectionError("No route to Oanda")
+        collector = CandleCollector(CLIENT, pair, gran)
+        collector.requester = SyntheticRequester(make_candles(3000, gran), 2000)
+        requesters.append(collector.requester)
+        return collector
+
+    return upstream
+
+
+def serve_synthetic(path, directory, conn):
+    """Run in another process: a daemon on a synthetic upstream, driven by conn.
+
+    The daemon takes CollectorLocks, so it cannot share a process with clients
+    that hold them while waiting on it.
+    """
+    requesters = []
+    daemon = CandleDaemon(path, synthetic_upstream(requesters), directory).start()
+    conn.send(None)
+    while True:
+        command, value = conn.recv()
+        if command == "sent":
+            conn.send([_.sent for _ in requesters])
+        elif command == "now":
+            # Reveal candles up to now, and let collectors look for them.
+            for requester in requesters:
+                requester.now = value
+            for collector in daemon.collectors.values():
+                collector.last_update -= 10
+            conn.send(None)
+        else:
+            daemon.close()
+            conn.send(None)
+            return
+
+
+class SyntheticDaemon:
+    def __init__(self, tmp_path):
+        self.path = str(tmp_path.joinpath("candles.sock"))
+        self.directory = tmp_path.joinpath("cache")
+        self.process = None
+        self.conn = None
+
+    def start(self):
+        context = multiprocessing.get_context("spawn")
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=serve_synthetic, args=(self.path, self.directory, child_conn)
+        )
+        self.process.start()
+        self.conn.recv()
+
+    def command(self, command, value=None):
+        self.conn.send((command, value))
+        return self.conn.recv()
+
+    def close(self):
+        if self.process is not None:
+            self.command("close")
+            self.process.join(10)
+            self.process = None
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    daemon = SyntheticDaemon(tmp_path)
+    daemon.start()
+    yield daemon
+    daemon.close()
+    CandleSource.set_provider(None)
+
+
+def grab_from_daemon(path, conn):
+    """Run in another process: send back the newest candles from the daemon."""
+    collector = DaemonClient(path)(Pair.EUR_USD, Gran.H1)
+    conn.send([_.to_tuple() for _ in collector.grab(100)])
+
+
+def test_protocol_round_trip():
+    request = pack_request(Op.SINCE, Pair.AUD_CAD, Gran.M15, 7, 1591488000)
+    assert unpack_request(request) == (Op.SINCE, Pair.AUD_CAD, Gran.M15, 7, 1591488000)
+    with pytest.raises(ValueError):
+        unpack_request(pack_request(Op.GET, Pair.AUD_CAD, "X9", 7))
+    candles = make_candles(50)
+    a, b = socket.socketpair()
+    a.sendall(pack_candles(candles, Flag.END_OF_HISTORY) + pack_error("no candles"))
+    assert read_response(b) == (Flag.END_OF_HISTORY, candles)
+    with pytest.raises(DaemonError, match="no candles"):
+        read_response(b)
+    a.close()
+    with pytest.raises(EOFError):
+        read_response(b)
+    b.close()
+
+
+def test_processes_share_one_fetcher(daemon):
+    series = make_candles(3000)
+    revealed = SyntheticRequester(series, 2000).revealed()
+    first = DaemonClient(daemon.path)(Pair.EUR_USD, Gran.H1)
+    candles = first.grab(500)
+    assert candles == revealed[-500:] and daemon.command("sent") == [500]
+    # Another process gets the same candles, without the daemon fetching.
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=grab_from_daemon, args=(daemon.path, child_conn))
+    process.start()
+    assert conn.recv() == [_.to_tuple() for _ in candles[-100:]]
+    process.join(10)
+    assert daemon.command("sent") == [500]
+    # Older candles are only sent when asked for.
+    assert first.update_history(300)
+    assert first._cache == revealed[-800:] and daemon.command("sent") == [800]
+    # Newer ones, from the last candle on.
+    daemon.command("now", 2005)
+    first.last_update -= 10
+    assert first.update_recent()
+    assert first._cache == SyntheticRequester(series, 2005).revealed()[-805:]
+    assert first._cache[-1].time == series[2004].time
+    # Errors getting candles reach the client.
+    with pytest.raises(DaemonError, match="No route"):
+        DaemonClient(daemon.path)(Pair.GBP_USD, Gran.H1).grab(10)
+
+
+def test_chart_manager_uses_daemon(daemon):
+    ChartManager(None, provider=DaemonClient(daemon.path))
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    assert isinstance(geo.collector, DaemonCollector)
+    assert geo.xandles.candles[-1].time == make_candles(2000)[-1].time
+
+
+def test_restart_from_disk(daemon):
+    candles = DaemonClient(daemon.path)(Pair.EUR_USD, Gran.H1).grab(500)
+    daemon.close()
+    daemon.start()
+    again = DaemonClient(daemon.path)(Pair.EUR_USD, Gran.H1).grab(500)
+    assert again == candles
+    # Only the last stored candle and the incomplete one were fetched again.
+    assert daemon.command("sent") == [2]
+
+
+def answer(daemon, *request):
+    """Get flags and candles of the answer of an in-process daemon."""
+    a, b = socket.socketpair()
+    a.sendall(daemon.answer(pack_request(*request)))
+    try:
+        return read_response(b)
+    finally:
+        a.close()
+        b.close()
+
+
+def test_since_reaches_back_to_client(tmp_path):
+    path = str(tmp_path.joinpath("candles.sock"))
+    revealed = SyntheticRequester(make_candles(3000), 2000).revealed()
+    since = revealed[-500].time
+    # A daemon that just started (storing nothing) holds fewer than that.
+    daemon = CandleDaemon(path, synthetic_upstream([]), directory=None)
+    _, candles = answer(daemon, Op.SINCE, Pair.EUR_USD, Gran.H1, 0, since)
+    assert candles == revealed[-500:]
+
+
+
+def test_store_only_plain_collectors(tmp_path):
+    path = str(tmp_path.joinpath("candles.sock"))
+    # Not a CandleCollector, like a ResampledCollector.
+    upstream = lambda pair, gran: FakeCollector(make_candles(100, gran))
+    daemon = CandleDaemon(path, upstream, tmp_path.joinpath("cache"))
+    _, candles = answer(daemon, Op.GET, Pair.EUR_USD, Gran.H4, 50)
+    assert len(candles) == 50
+    assert not daemon.store.path(Pair.EUR_USD, Gran.H4).exists()
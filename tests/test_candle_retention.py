@@ -0,0 +1,130 @@
+import gc
+from types import SimpleNamespace
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.util.candle_retention import CandleRetention
+from tests.conftest import FakeCollector, make_candles
+
+
+def make_geo(retention, pair=Pair.EUR_USD, gran=Gran.H1) -> GeoCandles:
+    return GeoCandles(pair=pair, gran=gran, width=700, height=400, retention=retention)
+
+
+def times(candles):
+    return [int(_.time) for _ in candles]
+
+
+def test_pair_budget_keeps_window_and_margin(fake_collectors):
+    retention = CandleRetention(pair_budget=500, margin=100)
+    geo = make_geo(retention)
+    need = retention.need((geo.pair, geo.gran))
+    assert need > 0
+    assert len(geo.collector) == need + 100
+    # Whatever the chart shows is still there.
+    assert geo.xandles.candles[-1] is geo.collector._cache[-1]
+
+
+def test_under_budget_is_left_alone(fake_collectors):
+    retention = CandleRetention()
+    geo = make_geo(retention)
+    assert len(geo.collector) == 2000
+
+
+def test_spill_and_restore(fake_collectors, tmp_path):
+    retention = CandleRetention(
+        pair_budget=500, margin=100, spill=True, spill_dir=tmp_path
+    )
+    geo = make_geo(retention)
+    collector = geo.collector
+    original = times(make_candles(2000))
+    dropped = 2000 - len(collector)
+    assert retention.spilled[(geo.pair, geo.gran)] == dropped
+    restored = retention.restore((geo.pair, geo.gran), collector, 1800)
+    assert restored == 1800 - (2000 - dropped)
+    assert times(collector._cache) == original[-1800:]
+    assert retention.spilled[(geo.pair, geo.gran)] == 200
+
+
+def test_spill_appends_chunks(fake_collectors, tmp_path):
+    retention = CandleRetention(
+        pair_budget=500, margin=0, spill=True, spill_dir=tmp_path
+    )
+    key = (Pair.EUR_USD, Gran.H1)
+    collector = fake_collectors[key] = FakeCollector(make_candles(2000))
+    original = times(collector._cache)
+    retention._trim(key, collector, 1500)
+    first = retention.chunks[key][0]
+    written = first.stat().st_mtime_ns
+    retention._trim(key, collector, 1000)
+    # The second trim went to a chunk of its own, the first was left as is.
+    assert len(retention.chunks[key]) == 2
+    assert first.stat().st_mtime_ns == written
+    assert retention.spilled[key] == 1000
+    # Restoring across both chunks leaves part of the first.
+    assert retention.restore(key, collector, 1800) == 800
+    assert times(collector._cache) == original[-1800:]
+    assert retention.chunks[key] == [first] and retention.spilled[key] == 200
+
+
+def test_collectors_without_own_list_left_alone(tmp_path):
+    class CopyingCollector(FakeCollector):
+        @property
+        def _cache(self):
+            return list(self.candles)
+
+        @_cache.setter
+        def _cache(self, candles):
+            self.candles = candles
+
+    retention = CandleRetention(pair_budget=500, spill=True, spill_dir=tmp_path)
+    collector = CopyingCollector(make_candles(2000))
+    holder = SimpleNamespace(pair=Pair.EUR_USD, gran=Gran.H1)
+    retention.hold(holder, collector, 300)
+    assert len(collector) == 2000
+    assert not retention.collectors and not retention.spilled
+
+
+def test_spill_folder_removed_with_retention(fake_collectors, tmp_path):
+    retention = CandleRetention(pair_budget=500, spill=True, spill_dir=tmp_path)
+    geo = make_geo(retention)
+    assert any(tmp_path.iterdir())
+    del geo, retention
+    gc.collect()
+    assert not any(tmp_path.iterdir())
+
+
+def test_total_budget_trims_least_recently_used(fake_collectors):
+    retention = CandleRetention(total_budget=4500, margin=100)
+    old = make_geo(retention, pair=Pair.GBP_USD)
+    held = make_geo(retention, pair=Pair.USD_JPY)
+    assert retention.candle_count() == 4000
+    del old
+    gc.collect()
+    make_geo(retention, pair=Pair.EUR_USD)
+    # GBP_USD has no chart left so only its margin is kept.
+    assert len(fake_collectors[(Pair.GBP_USD, Gran.H1)]) == 100
+    assert len(held.collector) == 2000
+    assert retention.candle_count() <= 4500
+
+
+def test_total_budget_never_cuts_a_window(fake_collectors):
+    retention = CandleRetention(total_budget=10, margin=0)
+    geos = [make_geo(retention, pair=pair) for pair in (Pair.EUR_USD, Pair.AUD_USD)]
+    for geo in geos:
+        need = retention.need((geo.pair, geo.gran))
+        assert len(geo.collector) == need
+        assert times(geo.xandles.candles[-need:]) == times(geo.collector._cache)
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_report(fake_collectors, tmp_path, spill):
+    retention = CandleRetention(pair_budget=500, spill=spill, spill_dir=tmp_path)
+    geo = make_geo(retention)
+    report = retention.get_report()
+    assert "EUR_USD" in report
+    assert f"{retention.need((geo.pair, geo.gran))} needed" in report
+    assert (" 0 spilled" in report) != spill
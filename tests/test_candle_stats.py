@@ -0,0 +1,79 @@
+import random
+
+import pytest
+from forex_types import Pair
+from oanda_candles import QuoteKind
+
+from oanda_chart.env.const import Tag
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render.scene import selection_prims
+from oanda_chart.util.candle_stats import CandleStatsIndex
+from tests.conftest import make_candles
+
+
+def brute_stats(candles, quote_kind):
+    ohlcs = [_.quote(quote_kind) for _ in candles]
+    ranges = [_.h_fp - _.l_fp for _ in ohlcs]
+    return (
+        len(candles),
+        candles[0].time,
+        candles[-1].time,
+        min(_.l_fp for _ in ohlcs),
+        max(_.h_fp for _ in ohlcs),
+        (ohlcs[-1].c_fp - ohlcs[0].o_fp) / 10,
+        sum(ranges) / len(ranges) / 10,
+    )
+
+
+def test_stats_match_brute_force():
+    candles = make_candles(700)
+    # Grow the index in uneven steps, as refreshes would.
+    index = CandleStatsIndex(QuoteKind.BID)
+    for end in (1, 2, 5, 64, 65, 300, 700):
+        index.extend(candles[:end])
+    assert len(index) == 699
+    assert index.extend(candles) == 0
+    rng = random.Random(3)
+    for _ in range(300):
+        start = rng.randrange(0, 699)
+        end = rng.randrange(start + 1, 700)
+        stats = index.stats(start, end)
+        assert tuple(stats) == pytest.approx(
+            brute_stats(candles[start:end], QuoteKind.BID)
+        )
+    assert index.stats(5, 5) is None
+
+
+def test_query_by_time_includes_incomplete_tail():
+    candles = make_candles(100)
+    index = CandleStatsIndex(QuoteKind.MID, candles)
+    tail = candles[-1]
+    assert not tail.complete
+    stats = index.query(candles[-1].time, candles[40].time, len(index), tail)
+    assert tuple(stats) == pytest.approx(brute_stats(candles[40:], QuoteKind.MID))
+    # Only the tail, and a count that leaves later candles out.
+    only_tail = index.query(tail.time, tail.time, len(index), tail)
+    assert tuple(only_tail) == pytest.approx(brute_stats([tail], QuoteKind.MID))
+    stats = index.query(candles[0].time, candles[-1].time, 50)
+    assert stats.count == 50
+
+
+def test_snapshot_selection(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    snapshot = GeoSnapshot.take(geo)
+    first = snapshot.candles[10].candle
+    last = snapshot.candles[30].candle
+    # No stats until a selection starts the index.
+    assert snapshot.selection_stats(first.time, last.time) is None
+    geo.update_stats_index(start=True)
+    snapshot = GeoSnapshot.take(geo)
+    stats = snapshot.selection_stats(last.time, first.time)
+    assert stats.count == 21 and stats.time1 == first.time
+    box, text = selection_prims(snapshot, (last.time, first.time), 0, 0)
+    assert box.key == (Tag.SELECTION, "box")
+    assert box.coords[0] == snapshot.candles[10].x
+    assert box.coords[2] == snapshot.candles[30].x + snapshot.offset
+    assert dict(text.options)["text"].startswith("21 candles")
+    hidden = selection_prims(snapshot, None, 0, 0)
+    assert [dict(_.options)["state"] for _ in hidden] == ["hidden", "hidden"]
@@ -0,0 +1,83 @@
+import gc
+
+from forex_types import Pair
+from oanda_candles import Gran, QuoteKind
+
+from oanda_chart import ChartManager, LinkColor
+from oanda_chart.util.candle_source import CandleSource
+from tests.conftest import FakeCollector, make_candles
+
+
+class FakeChart:
+    """Records the link values a ChartManager pushes to it."""
+
+    def __init__(self, color: LinkColor):
+        self.pair_color = self.gran_color = self.quote_kind_color = color
+        self.calls = []
+
+    def set_links(self, pair, gran, quote_kind):
+        self.calls.append((pair, gran, quote_kind))
+
+
+def test_set_without_batch_updates_each_time():
+    manager = ChartManager("no-token")
+    chart = FakeChart(LinkColor.RED)
+    manager.charts.add(chart)
+    manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+    manager.set_gran(LinkColor.RED, Gran.H4)
+    assert len(chart.calls) == 2
+
+
+def test_batch_updates_each_chart_once():
+    manager = ChartManager("no-token")
+    red = FakeChart(LinkColor.RED)
+    blue = FakeChart(LinkColor.BLUE)
+    green = FakeChart(LinkColor.GREEN)
+    manager.charts.update([red, blue, green])
+    with manager.batch():
+        manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+        manager.set_gran(LinkColor.RED, Gran.H4)
+        manager.set_quote_kind(LinkColor.RED, QuoteKind.BID)
+        with manager.batch():
+            manager.set_pair(LinkColor.BLUE, Pair.GBP_USD)
+        manager.set_gran(LinkColor.BLUE, Gran.D)
+        assert not red.calls and not blue.calls
+    assert red.calls == [(Pair.EUR_USD, Gran.H4, QuoteKind.BID)]
+    assert blue.calls == [(Pair.GBP_USD, Gran.D, None)]
+    assert not green.calls
+
+
+def test_charts_are_held_weakly():
+    manager = ChartManager("no-token")
+    chart = FakeChart(LinkColor.RED)
+    manager.charts.add(chart)
+    with manager.batch():
+        manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+        del chart
+        gc.collect()
+    assert not manager.charts
+    assert not manager.pending_charts
+
+
+def test_discard_chart_stops_updates():
+    manager = ChartManager("no-token")
+    chart = FakeChart(LinkColor.RED)
+    manager.charts.add(chart)
+    manager.discard_chart(chart)
+    manager.set_pair(LinkColor.RED, Pair.EUR_USD)
+    assert not chart.calls
+
+
+def test_managers_leave_candle_source_alone_unless_told():
+    ChartManager(None, provider=lambda pair, gran: FakeCollector(make_candles(10)))
+    try:
+        collector = CandleSource.get_collector(Pair.EUR_USD, Gran.H1)
+        # Another manager in the process keeps the provider and collectors.
+        ChartManager("no-token")
+        assert CandleSource.get_collector(Pair.EUR_USD, Gran.H1) is collector
+        resample = CandleSource.get_resample()
+        ChartManager("no-token", resample=not resample)
+        assert bool(CandleSource.get_resample()) != bool(resample)
+        CandleSource.set_resample(resample)
+    finally:
+        CandleSource.set_provider(None)
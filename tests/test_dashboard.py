@@ -0,0 +1,190 @@
+import multiprocessing
+from multiprocessing import Pipe
+from multiprocessing.shared_memory import SharedMemory
+from time import sleep
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Candle, Gran
+
+from oanda_chart.chart_manager import ChartManager
+from oanda_chart.dashboard.dashboard import Dashboard
+from oanda_chart.dashboard.shared_candles import (
+    SharedCandleReader,
+    SharedCandleWriter,
+    block_size,
+)
+from oanda_chart.dashboard.window import SharedProvider
+from oanda_chart.env.link_color import LinkColor
+from tests.conftest import make_candles
+
+
+def read_block(name, conn):
+    """Run in another process: send back the candles of a block as tuples."""
+    reader = SharedCandleReader(name)
+    candles, end_of_history = reader.read()
+    conn.send(([_.to_tuple() for _ in candles], end_of_history))
+    reader.close()
+
+
+def grab_shared(session, conn, results):
+    """Run in another process: grab candles the dashboard shares, as a window."""
+    collector = SharedProvider(session, 1000, conn)(Pair.EUR_USD, Gran.H1)
+    first = [_.to_tuple() for _ in collector.grab(300)]
+    more = collector.update_history(500)
+    history = [_.to_tuple() for _ in collector._cache]
+    collector.update_history(5000)
+    results.send((first, more, history, len(collector)))
+
+
+@pytest.fixture
+def writer():
+    writer = SharedCandleWriter(f"oc_test_{id(object())}", capacity=256)
+    yield writer
+    writer.close()
+
+
+def test_publish_and_read_back(writer):
+    candles = make_candles(300)
+    assert writer.publish(candles[:200], end_of_history=True) == 200
+    reader = SharedCandleReader(writer.name)
+    read, end_of_history = reader.read()
+    assert read == candles[:200] and end_of_history
+    # Nothing new, nothing written and the same list read.
+    assert writer.publish(candles[:200], end_of_history=True) == 0
+    assert reader.read()[0] is read
+    # The incomplete last candle completed and one more: only those written,
+    # and only those made again by the reader.
+    last = candles[199]
+    done = Candle(last.ask, last.bid, last.mid, last.time, True)
+    assert writer.publish(candles[:199] + [done, candles[200]], False) == 2
+    again, end_of_history = reader.read()
+    assert again[:199] == read[:199] and again[0] is read[0]
+    assert again[199].complete and again[200] == candles[200]
+    assert not end_of_history
+    # Past capacity only the newest are kept.
+    assert writer.publish(candles, False) == 256
+    assert reader.read()[0] == candles[-256:]
+    reader.close()
+
+
+def test_block_not_set_up_is_not_read():
+    name = f"oc_test_{id(object())}"
+    # Created, but its writer has not written the capacity yet.
+    memory = SharedMemory(name, create=True, size=block_size(16))
+    try:
+        with pytest.raises(FileNotFoundError):
+            SharedCandleReader(name)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def test_read_in_other_process(writer):
+    candles = make_candles(100, Gran.M5)
+    writer.publish(candles, end_of_history=False)
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=read_block, args=(writer.name, child_conn))
+    process.start()
+    tuples, end_of_history = conn.recv()
+    process.join(10)
+    assert tuples == [_.to_tuple() for _ in candles] and not end_of_history
+    # The reading process ending left the block in place.
+    reader = SharedCandleReader(writer.name)
+    assert reader.read()[0] == candles
+    reader.close()
+
+
+def test_window_process_gets_candles(fake_collectors):
+    manager = ChartManager("no-token")
+    dashboard = Dashboard(manager, capacity=1000)
+    context = multiprocessing.get_context("spawn")
+    conn, window_conn = context.Pipe()
+    dashboard.attach(conn)
+    results, child_results = context.Pipe()
+    process = context.Process(
+        target=grab_shared, args=(dashboard.session, window_conn, child_results)
+    )
+    process.start()
+    try:
+        first, more, history, ended = results.recv()
+        process.join(10)
+    finally:
+        dashboard.close()
+    expected = [_.to_tuple() for _ in fake_collectors[(Pair.EUR_USD, Gran.H1)]._cache]
+    assert first == expected[-300:]
+    # More history was published when asked for, up to capacity.
+    assert more and history == expected[-800:]
+    assert ended == 1000
+
+
+def test_links_between_dashboard_and_windows():
+    manager = ChartManager("no-token")
+    dashboard = Dashboard(manager)
+    conn, window_conn = Pipe()
+    dashboard.attach(conn)
+    try:
+        # Link changes go to the windows...
+        manager.set_pair(LinkColor.RED, Pair.GBP_USD)
+        assert window_conn.recv() == ("link", "pair", "red", "GBP_USD")
+        # ...and come back from them, without being echoed.
+        window_conn.send(("link", "gran", "red", "H4"))
+        for _ in range(500):
+            if dashboard.poll_links():
+                break
+            sleep(0.01)
+        assert manager.get_gran(LinkColor.RED) == Gran.H4
+        assert not window_conn.poll(0.1)
+        # Windows opened later start with the current links.
+        assert ("link", "gran", "red", "H4") in dashboard.links()
+    finally:
+        dashboard.close()
+    assert window_conn.recv() == ("close",)
+
+
+def wait_until(condition):
+    for _ in range(500):
+        if condition():
+            return True
+        sleep(0.01)
+    return False
+
+
+def test_unwanted_candles_stop_being_published(fake_collectors):
+    manager = ChartManager("no-token")
+    dashboard = Dashboard(manager, capacity=1000)
+    conn, window_conn = Pipe()
+    other_conn, other_window_conn = Pipe()
+    dashboard.attach(conn)
+    dashboard.attach(other_conn)
+    key = (Pair.EUR_USD, Gran.H1)
+    try:
+        provider = SharedProvider(dashboard.session, 1000, window_conn)
+        collector = provider(*key)
+        # (Not grab, which holds the CollectorLock the dashboard takes here.)
+        collector.wait_for(300)
+        assert len(collector) == 300
+        other_window_conn.send(("want", "EUR_USD", "H1", 500))
+        assert wait_until(lambda: dashboard.wanted(key) == 500)
+        reader = SharedCandleReader(dashboard.writers[key].name)
+        # One window moving off it leaves it published for the other...
+        provider.keep_only((Pair.GBP_USD, Gran.H1))
+        assert wait_until(lambda: key not in dashboard.wants[conn])
+        assert key in dashboard.writers and not reader.closed()
+        # ...and once that one is gone, it is removed.
+        other_window_conn.close()
+        assert wait_until(lambda: key not in dashboard.writers)
+        assert reader.closed() and dashboard.wanted(key) == 0
+        reader.close()
+        # Asking again publishes it anew, and the collector finds it there.
+        collector.wait_for(300)
+
+        def attached():
+            collector.update_recent()
+            return collector.reader is not None and not collector.reader.closed()
+
+        assert wait_until(attached) and key in dashboard.writers
+        collector.reader.close()
+    finally:
+        dashboard.close()
@@ -0,0 +1,106 @@
+import pytest
+from forex_types import Pair
+
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.xandles import Xandles
+from oanda_chart.geo.yrids import Yrids
+
+
+class Counter:
+    """Counts calls of Xandles.update and Yrids.update (the resolves)."""
+
+    def __init__(self, monkeypatch):
+        self.xandles = 0
+        self.yrids = 0
+        x_update = Xandles.update
+        y_update = Yrids.update
+
+        def count_x(xandles, *args, **kwargs):
+            self.xandles += 1
+            return x_update(xandles, *args, **kwargs)
+
+        def count_y(yrids, *args, **kwargs):
+            self.yrids += 1
+            return y_update(yrids, *args, **kwargs)
+
+        monkeypatch.setattr(Xandles, "update", count_x)
+        monkeypatch.setattr(Yrids, "update", count_y)
+
+    def reset(self):
+        self.xandles = self.yrids = 0
+
+
+@pytest.fixture
+def geo(fake_collectors):
+    return GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+
+
+@pytest.fixture
+def counter(monkeypatch):
+    return Counter(monkeypatch)
+
+
+def assert_single_resolve(geo, counter):
+    assert counter.xandles == 1
+    assert counter.yrids == 1
+    assert geo.collector.grab_count == 1
+    counter.reset()
+    geo.collector.grab_count = 0
+
+
+def test_shift_resolves_once(geo, counter):
+    geo.collector.grab_count = 0
+    geo.shift(-300, 0)
+    assert_single_resolve(geo, counter)
+    geo.update(price_view=False)
+    counter.reset()
+    geo.collector.grab_count = 0
+    geo.shift(200, 50)
+    assert_single_resolve(geo, counter)
+
+
+def test_step_transaction_resolves_once(geo, counter):
+    geo.collector.grab_count = 0
+    mid = geo.yrids.mid
+    with geo.transaction():
+        geo.update(price_view=False)
+        geo.shift(0, 100)
+        assert counter.xandles == counter.yrids == 0
+    assert_single_resolve(geo, counter)
+    assert not geo.price_view
+    assert geo.yrids.mid == mid - round(100 * geo.yrids.fpp)
+
+
+def test_go_home_resolves_once(geo, counter):
+    geo.update(offset=CandleOffset(4), ndx=300, price_view=False)
+    counter.reset()
+    geo.collector.grab_count = 0
+    geo.go_home()
+    assert_single_resolve(geo, counter)
+    assert geo.xandles.ndx == 0
+    assert geo.xandles.offset == CandleOffset.DEFAULT
+    assert geo.price_view
+
+
+def test_refresh_resolves_once(geo, counter):
+    geo.collector.grab_count = 0
+    geo.refresh()
+    assert_single_resolve(geo, counter)
+
+
+def test_shift_is_clamped_to_candles(geo):
+    geo.shift(100_000, 0)
+    assert geo.xandles.ndx == 0
+    geo.shift(-100_000, 0)
+    assert 0 < geo.xandles.ndx < len(geo.collector)
+
+
+def test_failed_transaction_is_dropped(geo):
+    ndx = geo.xandles.ndx
+    with pytest.raises(ValueError):
+        with geo.transaction():
+            geo.shift(-300, 0)
+            raise ValueError("user code failed")
+    assert geo.xandles.ndx == ndx
+    assert not geo.pending
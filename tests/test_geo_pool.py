@@ -0,0 +1,38 @@
+from forex_types import Pair
+from oanda_candles import Gran, QuoteKind
+
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_pool import GeoPool
+
+
+def test_pool_evicts_least_recently_used(fake_collectors):
+    pool = GeoPool(size=2)
+    eur = GeoCandles(pair=Pair.EUR_USD)
+    gbp = GeoCandles(pair=Pair.GBP_USD)
+    pool.put(eur)
+    pool.put(gbp)
+    assert pool.get(Pair.EUR_USD, Gran.H1) is eur
+    pool.put(GeoCandles(pair=Pair.AUD_USD))
+    assert pool.get(Pair.GBP_USD, Gran.H1) is None
+    assert pool.get(Pair.EUR_USD, Gran.H1) is eur
+    assert len(pool) == 2
+
+
+def test_reactivate_keeps_view_state(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, offset=CandleOffset(6), ndx=120)
+    geo.reactivate(800, 500, QuoteKind.BID)
+    assert geo.xandles.ndx == 120
+    assert geo.xandles.offset == 6
+    assert geo.xandles.width == 800
+    assert geo.yrids.height == 500
+    assert geo.quote_kind == QuoteKind.BID
+
+
+def test_report_accounts_for_candles(fake_collectors):
+    pool = GeoPool()
+    pool.put(GeoCandles(pair=Pair.EUR_USD))
+    count = pool.candle_count()
+    assert count > 0
+    assert pool.estimate_bytes() == count * GeoPool.CANDLE_BYTES
+    assert f"{count} candles" in pool.get_report()
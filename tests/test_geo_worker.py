@@ -0,0 +1,143 @@
+import gc
+import time
+import tracemalloc
+import weakref
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_worker import GeoWorker
+from oanda_chart.util.candle_retention import CandleRetention
+
+
+def wait(worker: GeoWorker):
+    deadline = time.time() + 5
+    while worker.busy():
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def worker(fake_collectors):
+    worker = GeoWorker()
+    worker.load(lambda: GeoCandles(pair=Pair.EUR_USD, width=700, height=400))
+    wait(worker)
+    return worker
+
+
+def test_load_publishes_snapshot(worker):
+    snapshot = worker.take()
+    assert snapshot.pair == Pair.EUR_USD
+    assert snapshot.width == 700
+    assert snapshot.candles
+    assert snapshot.badge[0] == "EurUsd"
+    assert worker.take() is None
+
+
+def test_only_newest_snapshot_is_kept(worker):
+    worker.take()
+    for _ in range(5):
+        worker.submit(lambda geo: geo.shift(-70, 0))
+    wait(worker)
+    snapshot = worker.take()
+    assert snapshot.ndx == worker.geo.xandles.ndx > 0
+    assert worker.take() is None
+
+
+def test_snapshot_candle_lookup(worker):
+    snapshot = worker.take()
+    first = snapshot.candles[0]
+    assert snapshot.candle_at_x(first.x) == first
+    assert snapshot.candle_at_x(snapshot.pixels_left - 1) is None
+    assert snapshot.y_to_fp(0) == snapshot.scroll_top
+
+
+def test_jobs_of_old_load_are_skipped(worker):
+    worker.take()
+    worker.load(lambda: None)
+    worker.submit(lambda geo: pytest.fail("job ran without geo"))
+    wait(worker)
+    assert worker.geo is None
+    assert worker.take() is None
+
+
+def test_job_error_raised_on_take(worker):
+    def job(geo):
+        raise ValueError("bad job")
+
+    worker.submit(job)
+    wait(worker)
+    with pytest.raises(ValueError):
+        worker.take()
+
+
+def test_failed_load_drops_old_geo(worker):
+    worker.take()
+
+    def factory():
+        raise ConnectionError("download failed")
+
+    worker.load(factory)
+    worker.submit(lambda geo: pytest.fail("job ran on geo of old load"))
+    wait(worker)
+    assert worker.geo is None
+    with pytest.raises(ConnectionError):
+        worker.take()
+    assert worker.take() is None
+
+
+def test_bookkeeping_job_takes_no_snapshot(worker):
+    worker.take()
+    worker.submit(lambda geo: geo.keep_up(), snapshot=False)
+    wait(worker)
+    assert worker.take() is None
+    assert worker.geo.collector.grab_count > 1
+
+
+def test_snapshot_owed_by_earlier_job_is_taken(worker):
+    worker.take()
+    worker.submit(lambda geo: (time.sleep(0.05), geo.shift(-70, 0)))
+    worker.submit(lambda geo: geo.keep_up(), snapshot=False)
+    wait(worker)
+    snapshot = worker.take()
+    assert snapshot.ndx == worker.geo.xandles.ndx > 0
+
+
+def test_close_ends_thread_and_drops_geo(worker):
+    geo = weakref.ref(worker.geo)
+    finished = []
+    worker.close(lambda: finished.append(True))
+    worker.submit(lambda geo: pytest.fail("job ran after close"))
+    worker._thread.join(5)
+    assert not worker._thread.is_alive()
+    assert finished and worker.geo is None
+    gc.collect()
+    assert geo() is None
+
+
+def test_close_reclaims_candle_memory(fake_collectors):
+    retention = CandleRetention(margin=100)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        worker = GeoWorker()
+        worker.load(
+            lambda: GeoCandles(
+                pair=Pair.GBP_USD, width=700, height=400, retention=retention
+            )
+        )
+        wait(worker)
+        worker.take()
+        loaded = tracemalloc.get_traced_memory()[0]
+        worker.close(retention.release)
+        worker._thread.join(5)
+        del worker
+        gc.collect()
+        released = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Collector history no chart holds is trimmed to the margin.
+    assert len(fake_collectors[(Pair.GBP_USD, Gran.H1)]) == 100
+    assert released - baseline < (loaded - baseline) / 4
@@ -0,0 +1,88 @@
+import multiprocessing
+from xml.etree import ElementTree
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Gran
+
+from oanda_chart.env.const import CandleColor, Const, RenderMode
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.render import headless
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+@pytest.fixture
+def snapshot(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    return GeoSnapshot.take(geo)
+
+
+def test_svg_has_chart_layout(snapshot):
+    root = ElementTree.fromstring(headless.render_svg(snapshot))
+    assert root.get("width") == str(700 + Const.PRICE_CANVAS_WIDTH)
+    assert root.get("height") == str(400 + Const.TIME_CANVAS_HEIGHT)
+    groups = root.findall(f"{SVG}g")
+    assert len(groups) == 4
+    bodies = [
+        _
+        for _ in groups[0].iter(f"{SVG}rect")
+        if _.get("fill") in (CandleColor.BULL, CandleColor.BEAR)
+    ]
+    assert 0 < len(bodies) <= len(snapshot.candles)
+
+
+def test_svg_has_labels(snapshot):
+    root = ElementTree.fromstring(headless.render_svg(snapshot))
+    texts = {_.text for _ in root.iter(f"{SVG}text")}
+    assert "EurUsd" in texts
+    assert {_.pips for _ in snapshot.price_grid} <= texts
+    assert {_.upper for _ in snapshot.time_labels} <= texts
+
+
+def test_svg_of_line_and_area(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    for mode, tag in [(RenderMode.LINE, "polyline"), (RenderMode.AREA, "polygon")]:
+        geo.set_render_mode(mode)
+        root = ElementTree.fromstring(headless.render_svg(GeoSnapshot.take(geo)))
+        shapes = list(root.iter(f"{SVG}{tag}"))
+        assert len(shapes) == 1
+        assert shapes[0].get("points").count(",") > 100
+
+
+def test_save_goes_by_suffix(snapshot, tmp_path):
+    path = headless.save_snapshot(snapshot, tmp_path.joinpath("chart.svg"))
+    assert path.read_text().startswith("<svg")
+    with pytest.raises(ValueError):
+        headless.save_snapshot(snapshot, tmp_path.joinpath("chart.gif"))
+
+
+def test_png(snapshot):
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError, match="Pillow"):
+            headless.render_png(snapshot)
+        return
+    assert headless.render_png(snapshot).startswith(b"\x89PNG")
+
+
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="fake collectors only reach forked processes",
+)
+def test_export_charts_in_process_pool(fake_collectors, tmp_path):
+    paths = headless.export_charts(
+        tmp_path,
+        pairs=[Pair.EUR_USD, Pair.GBP_USD],
+        grans=[Gran.H1, Gran.D],
+        processes=2,
+    )
+    assert [_.name for _ in paths] == [
+        "EUR_USD_H1.svg",
+        "EUR_USD_D.svg",
+        "GBP_USD_H1.svg",
+        "GBP_USD_D.svg",
+    ]
+    assert all(_.read_text().startswith("<svg") for _ in paths)
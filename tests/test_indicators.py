@@ -0,0 +1,170 @@
+import gc
+from math import isclose, isnan
+from statistics import mean, pstdev
+
+import pytest
+from forex_types import FracPips, Pair
+from oanda_candles import Candle, Gran, QuoteKind
+
+from oanda_chart.env.const import IndicatorColor, Tag
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot
+from oanda_chart.indicators.indicator import (
+    IndicatorKind,
+    IndicatorSpec,
+    make_indicator,
+)
+from oanda_chart.indicators.indicator_hub import IndicatorHub
+from oanda_chart.render.prim import Shape
+from oanda_chart.render.scene import chart_scene
+from tests.conftest import make_candles
+
+SPECS = [
+    IndicatorSpec(IndicatorKind.SMA, 20),
+    IndicatorSpec(IndicatorKind.EMA, 12),
+    IndicatorSpec(IndicatorKind.BOLLINGER, 20),
+    IndicatorSpec(IndicatorKind.RSI, 14),
+    IndicatorSpec(IndicatorKind.ATR, 14),
+]
+
+
+def closes(candles):
+    return [int(FracPips.from_price(_.mid.c)) for _ in candles]
+
+
+def assert_same(left, right):
+    assert list(left.times) == list(right.times)
+    for line in left.LINES:
+        for ndx in range(len(left)):
+            a = left.value_of(line, ndx)
+            b = right.value_of(line, ndx)
+            assert (isnan(a) and isnan(b)) or isclose(a, b, abs_tol=1e-6)
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=lambda _: _.name)
+def test_incremental_matches_full(spec):
+    candles = make_candles(300)
+    incremental = make_indicator(spec, QuoteKind.MID)
+    incremental.update(candles[:200])
+    # A new candle, then the tail changing, then a few more candles.
+    assert incremental.update(candles[:201]) == 2
+    other = candles[157]
+    changed = Candle(other.ask, other.bid, other.mid, candles[200].time, False)
+    assert incremental.update(candles[:200] + [changed]) == 1
+    assert incremental.update(candles) == 100
+    full = make_indicator(spec, QuoteKind.MID)
+    assert full.update(candles) == 300
+    assert_same(incremental, full)
+
+
+def test_sma_and_bollinger_values():
+    candles = make_candles(100)
+    prices = closes(candles)
+    sma = make_indicator(IndicatorSpec(IndicatorKind.SMA, 20), QuoteKind.MID)
+    bands = make_indicator(IndicatorSpec(IndicatorKind.BOLLINGER, 20), QuoteKind.MID)
+    sma.update(candles)
+    bands.update(candles)
+    assert isnan(sma.value_of("value", 18))
+    for ndx in (19, 50, 99):
+        window = prices[ndx - 19 : ndx + 1]
+        assert isclose(sma.value_of("value", ndx), mean(window))
+        assert isclose(bands.value_of("middle", ndx), mean(window))
+        upper = mean(window) + 2 * pstdev(window)
+        assert isclose(bands.value_of("upper", ndx), upper, abs_tol=1e-6)
+
+
+def test_rsi_and_atr_ranges():
+    candles = make_candles(200)
+    rsi = make_indicator(IndicatorSpec(IndicatorKind.RSI, 14), QuoteKind.BID)
+    atr = make_indicator(IndicatorSpec(IndicatorKind.ATR, 14), QuoteKind.BID)
+    rsi.update(candles)
+    atr.update(candles)
+    assert all(0 <= _ <= 100 for _ in rsi.lines["value"][14:])
+    # make_candles gives every candle a range of at least 12 frac pips.
+    assert all(_ >= 12 for _ in atr.lines["value"][13:])
+
+
+def test_older_history_recomputes():
+    candles = make_candles(300)
+    sma = make_indicator(IndicatorSpec(IndicatorKind.SMA, 20), QuoteKind.MID)
+    sma.update(candles[100:])
+    assert sma.update(candles) == 300
+    assert sma.times[0] == int(candles[0].time)
+
+
+def test_resumes_from_first_candle():
+    candles = make_candles(300)
+    sma = make_indicator(IndicatorSpec(IndicatorKind.SMA, 20), QuoteKind.MID)
+    sma.update(candles[:200])
+    # Trimmed history that starts with the last candle seen.
+    assert sma.update(candles[199:]) == 101
+    assert len(sma) == 300 and sma.times[0] == int(candles[0].time)
+
+
+def test_bad_spec():
+    with pytest.raises(ValueError):
+        make_indicator(IndicatorSpec("MACD", 20), QuoteKind.MID)
+    with pytest.raises(ValueError):
+        make_indicator(IndicatorSpec(IndicatorKind.SMA, 0), QuoteKind.MID)
+
+
+def test_hub_shares_while_used():
+    spec = IndicatorSpec(IndicatorKind.EMA, 50)
+    first = IndicatorHub.get(Pair.EUR_USD, Gran.H1, QuoteKind.MID, spec)
+    again = IndicatorHub.get(
+        Pair.EUR_USD, Gran.H1, QuoteKind.MID, spec._replace(color="white")
+    )
+    other = IndicatorHub.get(Pair.EUR_USD, Gran.H1, QuoteKind.BID, spec)
+    assert first is again
+    assert other is not first
+    count = IndicatorHub.count()
+    del first, again, other
+    gc.collect()
+    assert IndicatorHub.count() == count - 2
+
+
+def test_charts_share_and_draw_indicators(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    twin = GeoCandles(pair=Pair.EUR_USD, width=300, height=400)
+    geo.set_indicators(SPECS)
+    twin.set_indicators(SPECS[:1])
+    assert twin.indicators[0] is geo.indicators[0]
+    snapshot = GeoSnapshot.take(geo)
+    names = [_.name for _ in snapshot.indicators]
+    assert names[:3] == ["SMA 20", "EMA 12", "BB 20 middle"]
+    assert len(names) == 7
+    sma = snapshot.indicators[0]
+    assert sma.overlay and sma.segments
+    assert sma.segments[0][0] == snapshot.candles.left + geo.xandles.offset.wick()
+    rsi = snapshot.indicators[5]
+    assert not rsi.overlay
+    assert all(0 <= y <= 1 for y in rsi.segments[0][1::2])
+    prims = [_ for _ in chart_scene(snapshot, 0, 0) if _.layer == Tag.INDICATOR]
+    assert len(prims) == sum(len(_.segments) for _ in snapshot.indicators) + 1
+
+
+def test_custom_color_is_drawn(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    twin = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    geo.set_indicators([SPECS[0]._replace(color="#123456")])
+    twin.set_indicators(SPECS[:1])
+    # Still the one shared indicator, drawn in each chart's own color.
+    assert twin.indicators[0] is geo.indicators[0]
+    for chart, color in [(geo, "#123456"), (twin, IndicatorColor.SMA)]:
+        snapshot = GeoSnapshot.take(chart)
+        prims = [_ for _ in chart_scene(snapshot, 0, 0) if _.layer == Tag.INDICATOR]
+        fills = {dict(_.options).get("fill") for _ in prims if _.shape == Shape.LINE}
+        assert fills == {color}
+
+
+def test_refresh_steps_only_the_tail(fake_collectors):
+    geo = GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+    geo.set_indicators(SPECS[:1])
+    collector = fake_collectors[(Pair.EUR_USD, Gran.H1)]
+    collector._cache.append(make_candles(2001)[-1])
+    sma = geo.indicators[0]
+    steps = []
+    update = sma.update
+    sma.update = lambda candles: steps.append(update(candles))
+    geo.refresh()
+    assert steps == [2]
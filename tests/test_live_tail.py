@@ -0,0 +1,120 @@
+import pytest
+from forex_types import Pair
+from oanda_candles import Candle, CandleMeister, Gran
+
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.util import live_tail
+from oanda_chart.util.candle_retention import CandleRetention
+from oanda_chart.util.candle_source import CandleSource
+from oanda_chart.util.live_tail import CandleRing, LiveTailCollector
+from tests.conftest import make_candles
+
+
+class StreamRequester:
+    """Stands in for a CandleRequester of a series that comes out over time."""
+
+    def __init__(self, series, now):
+        self.series = series
+        self.now = now
+        self.requests = 0
+
+    def revealed(self):
+        last = self.series[self.now - 1]
+        incomplete = Candle(last.ask, last.bid, last.mid, last.time, False)
+        return self.series[: self.now - 1] + [incomplete]
+
+    def get(self, count):
+        self.requests += 1
+        return self.revealed()[-count:]
+
+    def extend(self, candles):
+        self.requests += 1
+        candles[-1:] = [_ for _ in self.revealed() if _.time >= candles[-1].time]
+        return candles[-1].complete
+
+
+class StreamCollector:
+    """Stands in for the plain CandleCollector a live tail gets requests from."""
+
+    def __init__(self, requester):
+        self.requester = requester
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(live_tail, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """Route CandleMeister.get_collector to a stream of 500 S5 candles."""
+    requester = StreamRequester(make_candles(500, Gran.S5), 300)
+    monkeypatch.setattr(
+        CandleMeister, "get_collector", lambda pair, gran: StreamCollector(requester)
+    )
+    yield requester
+    # Drop the live tails handed out.
+    CandleSource.set_resample(CandleSource.get_resample())
+
+
+def test_ring_overwrites_oldest():
+    candles = make_candles(10, Gran.S5)
+    ring = CandleRing(4)
+    assert ring.tail(3) == [] and ring.last is None
+    assert ring.merge(candles[:3]) == 3
+    assert ring.tail(10) == candles[:3]
+    ring.merge(candles[3:7])
+    assert list(ring) == candles[3:7]
+    assert ring.tail(2) == candles[5:7]
+    assert ring[0] is candles[3] and ring[-1] is candles[6]
+    # Older candles are skipped, one of the same time replaces the newest.
+    slots = list(ring.slots)
+    last = candles[6]
+    update = Candle(last.ask, last.bid, last.mid, last.time, False)
+    assert ring.merge([candles[2], update]) == 1
+    assert ring.tail(4) == candles[3:6] + [update]
+    assert sum(a is not b for a, b in zip(slots, ring.slots)) == 1
+
+
+def test_live_tail_stays_bounded(clock):
+    requester = StreamRequester(make_candles(500, Gran.S5), 50)
+    collector = LiveTailCollector(
+        Pair.EUR_USD, Gran.S5, StreamCollector(requester), capacity=64
+    )
+    assert collector.interval == 1.0
+    candles = collector.grab(500)
+    assert len(candles) == 50 and not candles[-1].complete
+    # Too soon to ask again.
+    requester.now = 52
+    collector.grab(10)
+    assert requester.requests == 1
+    for now in range(52, 500, 3):
+        requester.now = now
+        clock[0] += 1.0
+        candles = collector.grab(500)
+        assert len(collector) <= 64
+        assert candles[-1].time == requester.series[now - 1].time
+        assert not candles[-1].complete
+        assert all(_.complete for _ in candles[:-1])
+    times = [_.time for _ in candles]
+    assert len(candles) == 64 and times == sorted(set(times))
+    assert collector.update_history(100) is False
+
+
+def test_seconds_chart_on_live_tail(clock, stream):
+    retention = CandleRetention()
+    geo = GeoCandles(pair=Pair.EUR_USD, gran=Gran.S5, retention=retention)
+    assert isinstance(geo.collector, LiveTailCollector)
+    assert CandleSource.get_collector(Pair.EUR_USD, Gran.S5) is geo.collector
+    # Live tails are bounded already, the retention is left out of it.
+    assert geo.retention is None
+    times = geo.xandles.times
+    stream.now = 310
+    clock[0] += 1.0
+    geo.refresh()
+    # The times array was brought up to date rather than built again.
+    assert geo.xandles.times is times
+    assert times[-1] == stream.series[309].time
+    assert len(times) == len(geo.xandles.candles) == 310
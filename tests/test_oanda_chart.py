@@ -1,5 +1,56 @@
+import subprocess
+import sys
+import tkinter
+
+import pytest
+import tk_oddbox
+
 from oanda_chart import __version__
+from oanda_chart.env.initializer import Initializer
 
 
 def test_version():
     assert __version__ == "0.1.3"
+
+
+def test_exports_are_lazy():
+    code = (
+        "import sys, oanda_chart; "
+        "assert 'tkinter' not in sys.modules; "
+        "assert 'oanda_chart.chart_manager' not in sys.modules; "
+        "from oanda_chart import ChartManager, LinkColor, Pair; "
+        "assert 'oanda_chart.chart_manager' in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_unknown_export_raises():
+    import oanda_chart
+
+    with pytest.raises(AttributeError):
+        oanda_chart.NoSuchThing
+
+
+def test_images_decoded_on_first_lookup(monkeypatch):
+    decoded = []
+
+    def photo_image(master, file):
+        decoded.append(file.stem)
+        return file.stem
+
+    monkeypatch.setattr(tkinter, "PhotoImage", photo_image)
+    monkeypatch.setattr(tk_oddbox.ImageLoader, "images", {})
+    monkeypatch.setattr(tk_oddbox.Images, "EUR_on", None, raising=False)
+    monkeypatch.setattr(Initializer, "initialized", False)
+    monkeypatch.setattr(Initializer, "root", None)
+    Initializer.initialize(None)
+    # Every image can be had, none decoded yet (or put in tk_oddbox.Images).
+    assert "EUR_on" in Initializer.image_names()
+    assert len(Initializer.image_names()) == 24
+    assert not decoded and "EUR_on" not in tk_oddbox.Images
+    assert Initializer.get_image("EUR_on") == "EUR_on" and decoded == ["EUR_on"]
+    assert Initializer.get_image("EUR_on") == "EUR_on" and decoded == ["EUR_on"]
+    assert tk_oddbox.Images["EUR_on"] == "EUR_on"
+    assert tk_oddbox.Images.EUR_on == "EUR_on"
+    with pytest.raises(KeyError):
+        Initializer.get_image("XYZ_on")
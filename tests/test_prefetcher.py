@@ -0,0 +1,185 @@
+from threading import Event
+from types import SimpleNamespace
+from typing import Optional
+
+from forex_types import Currency, Pair
+from oanda_candles import CandleCollector, CandleMeister, Gran
+
+from oanda_chart import ChartManager, LinkColor
+from oanda_chart.selectors.gran_menu import GranMenu
+from oanda_chart.selectors.pair_flags import PairFlags
+from oanda_chart.selectors.selector import PairSelector
+from oanda_chart.util.candle_source import download_candles, fill_collector
+from oanda_chart.util.collector_lock import CollectorLock
+from oanda_chart.util.prefetcher import Prefetcher
+from tests.conftest import FakeCollector, make_candles
+
+
+def test_warm_up_order_starts_with_neighbours():
+    order = GranMenu.get_warm_up_order(Gran.H1)
+    assert Gran.H1 not in order
+    assert set(order[:2]) == {Gran.H2, Gran.M30}
+    assert order[-1] == Gran.M
+
+
+def test_prefetch_warms_collectors(fake_collectors):
+    prefetcher = Prefetcher(min_interval=0.0)
+    keys = [(Pair.EUR_USD, Gran.H4), (Pair.EUR_USD, Gran.D)]
+    prefetcher.prefetch(keys)
+    prefetcher.queue.join()
+    assert set(prefetcher.warmed) == set(keys)
+    assert prefetcher.cached_candles() == 4000
+
+
+def test_prefetch_respects_candle_cap(fake_collectors):
+    prefetcher = Prefetcher(min_interval=0.0, max_candles=3000)
+    keys = [(Pair.EUR_USD, gran) for gran in (Gran.H4, Gran.D, Gran.W)]
+    prefetcher.prefetch(keys)
+    prefetcher.queue.join()
+    assert list(prefetcher.warmed) == [(Pair.EUR_USD, Gran.H4), (Pair.EUR_USD, Gran.D)]
+
+
+def test_cap_follows_collectors_as_they_shrink(fake_collectors):
+    prefetcher = Prefetcher(min_interval=0.0, max_candles=3000)
+    prefetcher.prefetch([(Pair.EUR_USD, Gran.H4), (Pair.EUR_USD, Gran.D)])
+    prefetcher.queue.join()
+    # Trimmed (by a CandleRetention, say), which makes room to warm more.
+    for collector in fake_collectors.values():
+        del collector._cache[:-500]
+    assert prefetcher.cached_candles() == 1000
+    prefetcher.prefetch([(Pair.EUR_USD, Gran.W)])
+    prefetcher.queue.join()
+    assert (Pair.EUR_USD, Gran.W) in prefetcher.warmed
+
+
+def test_failed_job_does_not_stop_worker(fake_collectors, caplog):
+    broken = fake_collectors[(Pair.EUR_USD, Gran.H4)] = FakeCollector([])
+
+    def grab(count):
+        raise ValueError("Bad candle")
+
+    broken.grab = grab
+    prefetcher = Prefetcher(min_interval=0.0)
+    prefetcher.prefetch([(Pair.EUR_USD, Gran.H4), (Pair.EUR_USD, Gran.D)])
+    prefetcher.queue.join()
+    assert list(prefetcher.warmed) == [(Pair.EUR_USD, Gran.D)]
+    assert "Bad candle" in caplog.text
+
+
+class SlowRequester:
+    """Stands in for a CandleRequester whose download waits to be let go."""
+
+    def __init__(self):
+        self.started = Event()
+        self.finish = Event()
+
+    def get(self, count):
+        self.started.set()
+        self.finish.wait(5)
+        return make_candles(count)
+
+
+def test_download_does_not_hold_collector_lock(monkeypatch):
+    client = SimpleNamespace(session=None, real=False, token="")
+    collector = CandleCollector(client, Pair.EUR_USD, Gran.H1)
+    collector.requester = SlowRequester()
+    monkeypatch.setattr(CandleMeister, "get_collector", lambda pair, gran: collector)
+    prefetcher = Prefetcher(min_interval=0.0)
+    prefetcher.prefetch([(Pair.EUR_USD, Gran.H1)])
+    assert collector.requester.started.wait(5)
+    # A chart of the same pair and gran gets the lock mid download.
+    lock = CollectorLock.get(Pair.EUR_USD, Gran.H1)
+    assert lock.acquire(timeout=1)
+    lock.release()
+    collector.requester.finish.set()
+    prefetcher.queue.join()
+    assert len(collector) == prefetcher.pull_size
+    assert prefetcher.warmed == {(Pair.EUR_USD, Gran.H1): collector}
+
+
+def test_anchor_prefetches_seven_pairs(fake_collectors):
+    manager = ChartManager("no-token")
+    manager.prefetcher = Prefetcher(min_interval=0.0)
+    manager.set_gran(LinkColor.ChartDefault, Gran.H4)
+    manager.prefetch_anchor(LinkColor.ChartDefault, Currency.USD)
+    manager.prefetcher.queue.join()
+    assert len(manager.prefetcher.warmed) == 7
+    assert (Pair.EUR_USD, Gran.H4) in manager.prefetcher.warmed
+    assert (Pair.USD_JPY, Gran.H4) in manager.prefetcher.warmed
+
+
+class AnchorSelector:
+    """Stands in for PairFlags, taking the base of a pair as its anchor."""
+
+    def __init__(self, color):
+        self.color = color
+        self.anchor = None
+
+    def set_pair(self, pair: Optional[Pair]):
+        self.anchor = None if pair is None else pair.base
+
+    def get_anchor(self) -> Optional[Currency]:
+        return self.anchor
+
+
+def test_pair_set_elsewhere_prefetches_anchor(fake_collectors):
+    manager = ChartManager("no-token")
+    manager.prefetcher = Prefetcher(min_interval=0.0)
+    selector = AnchorSelector(LinkColor.ChartDefault)
+    manager.pair_selectors.add(selector)
+    manager.set_gran(LinkColor.ChartDefault, Gran.H4)
+    manager.set_pair(LinkColor.ChartDefault, Pair.GBP_USD)
+    manager.prefetcher.queue.join()
+    assert len(manager.prefetcher.warmed) == 7
+    assert (Pair.GBP_JPY, Gran.H4) in manager.prefetcher.warmed
+
+
+class FlagsStandIn(AnchorSelector):
+    """PairFlags without the widgets, to follow its clicks through."""
+
+    apply_values = PairFlags.apply_values
+    prefetch_anchor = PairFlags.prefetch_anchor
+    apply_pair = PairSelector.apply_pair
+    get_pair = PairSelector.get_pair
+    set_pair = PairFlags.set_pair
+
+    def __init__(self, manager, color):
+        AnchorSelector.__init__(self, color)
+        self.manager = manager
+        self.on = None
+
+    def _update_labels(self):
+        pass
+
+
+def test_anchor_click_prefetches_once(fake_collectors):
+    manager = ChartManager("no-token")
+    manager.prefetcher = Prefetcher(min_interval=0.0)
+    flags = FlagsStandIn(manager, LinkColor.ChartDefault)
+    manager.pair_selectors.add(flags)
+    manager.set_gran(LinkColor.ChartDefault, Gran.H4)
+    channel = ("anchor", LinkColor.ChartDefault)
+    # Picking the anchor, then the currency to pair it with.
+    flags.anchor = Currency.USD
+    flags.apply_values()
+    assert manager.prefetcher.generations[channel] == 1
+    flags.on = Currency.EUR
+    flags.apply_values()
+    assert manager.get_pair(LinkColor.ChartDefault) == Pair.EUR_USD
+    assert manager.prefetcher.generations[channel] == 2
+    manager.prefetcher.queue.join()
+
+
+def test_fill_collector_matches_candle_collector():
+    client = SimpleNamespace(session=None, real=False, token="")
+    collector = CandleCollector(client, Pair.EUR_USD, Gran.H1)
+    collector.requester = SlowRequester()
+    collector.requester.finish.set()
+    candles = download_candles(collector, 500)
+    assert len(candles) == 500 and len(collector) == 0
+    assert fill_collector(collector, candles)
+    assert not fill_collector(collector, make_candles(10))
+    # Stored as if grab had downloaded them, so none newer are asked for yet.
+    collector.requester = None
+    assert not collector.update_recent()
+    assert collector._cache == candles
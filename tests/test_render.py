@@ -0,0 +1,294 @@
+import pytest
+from forex_types import Pair
+
+from oanda_chart.env.const import (
+    CandleColor,
+    RenderMode,
+    Tag,
+    UnfinishedCandleColor,
+)
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.geo.geo_snapshot import GeoSnapshot, price_parse
+from oanda_chart.render.differ import CanvasDiffer
+from oanda_chart.render.prim import Prim
+from oanda_chart.render.scene import (
+    chart_scene,
+    hover_scenes,
+    price_scene,
+    time_scene,
+)
+
+
+class FakeCanvas:
+    """Records the tkinter Canvas calls a CanvasDiffer makes."""
+
+    def __init__(self):
+        self.next_id = 0
+        self.items = {}
+        self.calls = []
+
+    def _create(self, shape, coords, options):
+        self.next_id += 1
+        self.items[self.next_id] = (shape, coords, options)
+        self.calls.append(("create", self.next_id))
+        return self.next_id
+
+    def create_line(self, *coords, **options):
+        return self._create("line", coords, options)
+
+    def create_polygon(self, *coords, **options):
+        return self._create("polygon", coords, options)
+
+    def create_rectangle(self, *coords, **options):
+        return self._create("rectangle", coords, options)
+
+    def create_text(self, *coords, **options):
+        return self._create("text", coords, options)
+
+    def coords(self, item, *coords):
+        shape, _, options = self.items[item]
+        self.items[item] = (shape, coords, options)
+        self.calls.append(("coords", item))
+
+    def move(self, tag, dx, dy):
+        for item, (shape, coords, options) in self.items.items():
+            if options["tags"] == tag:
+                coords = tuple(c + (dy if n % 2 else dx) for n, c in enumerate(coords))
+                self.items[item] = (shape, coords, options)
+        self.calls.append(("move", tag, dx, dy))
+
+    def itemconfigure(self, item, **changes):
+        shape, coords, options = self.items[item]
+        self.items[item] = (shape, coords, {**options, **changes})
+        self.calls.append(("itemconfigure", item, changes))
+
+    def delete(self, *items):
+        for item in items:
+            del self.items[item]
+        self.calls.append(("delete",) + items)
+
+    def tag_raise(self, tag):
+        self.calls.append(("tag_raise", tag))
+
+
+@pytest.fixture
+def canvas():
+    return FakeCanvas()
+
+
+@pytest.fixture
+def geo(fake_collectors):
+    return GeoCandles(pair=Pair.EUR_USD, width=700, height=400)
+
+
+def test_unchanged_scene_costs_nothing(canvas):
+    differ = CanvasDiffer(canvas)
+    scene = [Prim.line(("a", n), n, 0, n, 10, fill="red") for n in range(5)]
+    assert differ.apply(scene).created == 5
+    canvas.calls.clear()
+    stats = differ.apply(list(scene))
+    assert stats.size == 0
+    assert stats.kept == 5
+    assert not canvas.calls
+
+
+def test_minimal_calls(canvas):
+    differ = CanvasDiffer(canvas)
+    differ.apply([Prim.line(("a", n), n, 0, n, 10, fill="red") for n in range(4)])
+    canvas.calls.clear()
+    stats = differ.apply(
+        [
+            Prim.line(("a", 0), 0, 0, 0, 10, fill="red"),
+            Prim.line(("a", 1), 5, 0, 5, 10, fill="red"),
+            Prim.line(("a", 2), 2, 0, 2, 10, fill="blue"),
+            Prim.rectangle(("a", 3), 3, 0, 4, 10, fill="red"),
+        ]
+    )
+    assert (stats.created, stats.moved, stats.configured, stats.deleted) == (
+        1,
+        1,
+        1,
+        1,
+    )
+    assert ("itemconfigure", 3, {"fill": "blue"}) in canvas.calls
+    shapes = sorted(shape for shape, _, _ in canvas.items.values())
+    assert shapes == ["line", "line", "line", "rectangle"]
+
+
+def test_deletes_in_one_call_and_keeps_layer_order(canvas):
+    differ = CanvasDiffer(canvas)
+    differ.apply([Prim.line(("a", n), n, 0, n, 1) for n in range(3)])
+    canvas.calls.clear()
+    differ.apply([Prim.line(("a", 0), 0, 0, 0, 1), Prim.text(("b", 0), 1, 1)])
+    assert [call for call in canvas.calls if call[0] == "delete"] == [("delete", 2, 3)]
+    assert canvas.calls[-1] == ("tag_raise", "b")
+
+
+def test_layer_moves_with_one_call(canvas):
+    differ = CanvasDiffer(canvas)
+    differ.apply([Prim.line(("a", n), n, 0, n, 10) for n in range(5)])
+    canvas.calls.clear()
+    scene = [Prim.line(("a", n), n + 3, 2, n + 3, 12) for n in range(5)]
+    scene[4] = Prim.line(("a", 4), 0, 0, 1, 1)
+    stats = differ.apply(scene)
+    assert (stats.shifted, stats.moved) == (4, 1)
+    assert canvas.calls[0] == ("move", "a", 3, 2)
+    assert sorted(coords for _, coords, _ in canvas.items.values()) == sorted(
+        prim.coords for prim in scene
+    )
+
+
+def test_interleaved_layer_moves_once(canvas):
+    differ = CanvasDiffer(canvas)
+    differ.apply(
+        [Prim.line((layer, n), n, 0, n, 10) for n in range(4) for layer in "ab"]
+    )
+    canvas.calls.clear()
+    scene = [
+        Prim.line((layer, n), n + 3, 2, n + 3, 12) for n in range(4) for layer in "ab"
+    ]
+    stats = differ.apply(scene)
+    assert stats.shifted == 8 and stats.size == 0
+    assert canvas.calls == [("move", "a", 3, 2), ("move", "b", 3, 2)]
+    assert sorted(coords for _, coords, _ in canvas.items.values()) == sorted(
+        prim.coords for prim in scene
+    )
+
+
+def test_scroll_shifts_candles(canvas, geo):
+    differ = CanvasDiffer(canvas)
+    differ.apply(chart_scene(GeoSnapshot.take(geo), 0, 0))
+    geo.update(ndx=geo.xandles.ndx + 3, price_view=False)
+    stats = differ.apply(chart_scene(GeoSnapshot.take(geo), 0, 0))
+    candles = sum(1 for item in differ.items if item[0] == Tag.CANDLE)
+    # Three candles scroll into view and the rest move with their layer.
+    assert stats.shifted >= candles - 2 * 3
+    assert stats.moved < 2 * 3 + 20
+
+
+def test_drag_keeps_item_count_constant(canvas, geo):
+    differ = CanvasDiffer(canvas)
+    snapshot = GeoSnapshot.take(geo)
+    differ.apply(chart_scene(snapshot, 0, 0))
+    count = len(canvas.items)
+    for step in range(1, 50):
+        stats = differ.apply(chart_scene(snapshot, -step * 7, step * 3))
+        assert (stats.created, stats.deleted, stats.shifted) == (0, 0, 2)
+        assert len(canvas.items) == count
+
+
+def test_price_grid_items_persist(canvas, geo):
+    differ = CanvasDiffer(canvas)
+    geo.update(price_view=False)
+    differ.apply(price_scene(GeoSnapshot.take(geo)))
+    lines = len(differ.items)
+    geo.shift(0, 35)
+    stats = differ.apply(price_scene(GeoSnapshot.take(geo)))
+    # Items are only added or removed for the change in number of lines.
+    assert stats.created + stats.deleted == abs(len(differ.items) - lines)
+
+
+def test_scenes_have_unique_keys(geo):
+    snapshot = GeoSnapshot.take(geo)
+    for scene in [
+        chart_scene(snapshot, 0, 0),
+        price_scene(snapshot),
+        time_scene(snapshot),
+    ]:
+        keys = [prim.key for prim in scene]
+        assert len(keys) == len(set(keys))
+
+
+@pytest.mark.parametrize(
+    "mode, per_candle, fixed",
+    [
+        (RenderMode.CANDLES, 2, 0),
+        (RenderMode.BARS, 1, 0),
+        (RenderMode.LINE, 0, 1),
+        (RenderMode.AREA, 0, 1),
+    ],
+)
+def test_render_mode_items(geo, mode, per_candle, fixed):
+    geo.set_render_mode(mode)
+    snapshot = GeoSnapshot.take(geo)
+    assert snapshot.render_mode == mode
+    prims = [_ for _ in chart_scene(snapshot, 0, 0) if _.layer == Tag.CANDLE]
+    assert len(prims) == len(snapshot.candles) * per_candle + fixed
+    if mode == RenderMode.LINE:
+        assert len(prims[0].coords) == 2 * len(snapshot.candles)
+        assert prims[0].coords[1::2] == tuple(snapshot.candles.c)
+    elif mode == RenderMode.AREA:
+        ys = prims[0].coords[1::2]
+        assert ys == tuple(snapshot.candles.h) + tuple(reversed(snapshot.candles.l))
+
+
+def test_candle_colors_follow_prices(geo):
+    snapshot = GeoSnapshot.take(geo)
+    bodies = [
+        _
+        for _ in chart_scene(snapshot, 0, 0)
+        if _.key[0] == Tag.CANDLE and _.key[2] == "body"
+    ]
+    assert len(bodies) == len(snapshot.candles)
+    for body, snap in zip(bodies, snapshot.candles):
+        quote = snap.candle.quote(geo.quote_kind)
+        color = CandleColor if snap.candle.complete else UnfinishedCandleColor
+        fill = dict(body.options)["fill"]
+        if quote.c > quote.o:
+            assert fill == color.BULL and body.coords[1] >= body.coords[3]
+        elif quote.c < quote.o:
+            assert fill == color.BEAR
+        else:
+            assert fill == color.DOJI
+
+
+def test_dense_offset_switches_to_line(canvas, geo):
+    differ = CanvasDiffer(canvas)
+    geo.set_render_mode(RenderMode.BARS, dense_offset=4)
+    differ.apply(chart_scene(GeoSnapshot.take(geo), 0, 0))
+    geo.update(offset=CandleOffset(3))
+    snapshot = GeoSnapshot.take(geo)
+    assert snapshot.render_mode == RenderMode.LINE
+    differ.apply(chart_scene(snapshot, 0, 0))
+    assert sum(1 for key in differ.items if key[0] == Tag.CANDLE) == 1
+    geo.set_render_mode(RenderMode.BARS, dense_offset=0)
+    assert GeoSnapshot.take(geo).render_mode == RenderMode.BARS
+
+
+def test_bad_render_mode(geo):
+    with pytest.raises(ValueError):
+        geo.set_render_mode("heikin ashi")
+
+
+def test_hover_only_moves_and_retexts_items(canvas, geo):
+    differ = CanvasDiffer(canvas)
+    snapshot = GeoSnapshot.take(geo)
+    candle = snapshot.candles[-5]
+    stats = differ.apply(hover_scenes(snapshot, candle.x + 1, 300, 0, 0).chart)
+    assert stats.created == 3
+    for x, y in [(candle.x + 12, 310), (candle.x + 30, 200), (None, None)]:
+        stats = differ.apply(hover_scenes(snapshot, x, y, 0, 0).chart)
+        assert (stats.created, stats.deleted) == (0, 0)
+    hidden = [options["state"] for _, _, options in canvas.items.values()]
+    assert hidden == ["hidden"] * 3
+
+
+def test_hover_snaps_to_candle(geo):
+    snapshot = GeoSnapshot.take(geo)
+    candle = snapshot.candles[-3]
+    middle = candle.x + snapshot.offset.wick()
+    scenes = hover_scenes(snapshot, candle.x + 1, 250, 0, 0)
+    vertical, horizontal, tooltip = scenes.chart
+    assert vertical.coords[0] == vertical.coords[2] == middle
+    assert horizontal.coords[1] == 250
+    text = dict(tooltip.options)["text"]
+    assert f"C {candle.candle.mid.c}" in text
+    price = "".join(price_parse(snapshot.y_to_fp(250), Pair.EUR_USD.quote))
+    assert dict(scenes.prices[1].options)["text"] == price
+    assert scenes.times[1].coords[0] == middle
+    # Off the candles, the crosshair follows the mouse with no tooltip.
+    x = snapshot.pixels_right + 5
+    vertical, _, tooltip = hover_scenes(snapshot, x, 250, 0, 0).chart
+    assert vertical.coords[0] == x
+    assert dict(tooltip.options)["state"] == "hidden"
@@ -0,0 +1,136 @@
+from typing import List
+
+import pytest
+from forex_types import Pair
+from oanda_candles import Candle, Gran
+
+from oanda_chart.geo.geo_candles import GeoCandles
+from oanda_chart.util.candle_source import CandleSource
+from oanda_chart.util.resampler import ResampledCollector, bucket_time, resample
+from tests.conftest import START, make_candles
+
+
+class SeriesCollector:
+    """Stands in for a CandleCollector of a series that comes out over time.
+
+    Only the first `now` candles of the series exist so far (the last of them
+    incomplete), and history is only had by asking for it.
+    """
+
+    def __init__(self, series: List[Candle], now: int):
+        self.series = series
+        self.now = now
+        self._cache: List[Candle] = []
+        self.end_of_history = False
+
+    def __len__(self):
+        return len(self._cache)
+
+    def revealed(self) -> List[Candle]:
+        last = self.series[self.now - 1]
+        tail = Candle(last.ask, last.bid, last.mid, last.time, False)
+        return self.series[: self.now - 1] + [tail]
+
+    def grab(self, count: int) -> List[Candle]:
+        if not self._cache:
+            self._cache = self.revealed()[-count:]
+        self.update_recent()
+        self.update_history(count - len(self._cache))
+        return self._cache[-count:]
+
+    def update_recent(self) -> bool:
+        last_time = self._cache[-1].time
+        self._cache[-1:] = [_ for _ in self.revealed() if _.time >= last_time]
+        return True
+
+    def update_history(self, count: int) -> bool:
+        if count <= 0:
+            return True
+        older = [_ for _ in self.revealed() if _.time < self._cache[0].time]
+        self._cache[:0] = older[-count:]
+        if len(older) <= count:
+            self.end_of_history = True
+        return not self.end_of_history
+
+
+@pytest.fixture
+def resampling():
+    CandleSource.set_resample(CandleSource.RESAMPLE)
+    yield
+    CandleSource.set_resample({})
+
+
+def test_resample_h1_into_h4():
+    candles = make_candles(100)
+    h4 = resample(candles, Gran.H4, Gran.H1)
+    assert len(h4) == 25
+    assert [int(_.time) for _ in h4[:2]] == [START, START + 4 * 3600]
+    first = candles[:4]
+    assert h4[0].bid.o == first[0].bid.o
+    assert h4[0].bid.h == max(_.bid.h for _ in first)
+    assert h4[0].ask.l == min(_.ask.l for _ in first)
+    assert h4[0].mid.c == first[-1].mid.c
+    assert all(_.complete for _ in h4[:-1])
+    assert not h4[-1].complete
+
+
+def test_buckets_align_to_midnight_utc():
+    # Four hours before START (Sunday midnight UTC) is Saturday 20:00.
+    candles = make_candles(20, start=START - 4 * 3600)
+    days = resample(candles, Gran.D, Gran.H1)
+    assert [int(_.time) for _ in days] == [START - 24 * 3600, START]
+    assert bucket_time(START + 5 * 3600, Gran.H8) == START
+    assert bucket_time(START + 9 * 3600, Gran.H8) == START + 8 * 3600
+    # A bucket followed by others is complete, though only 4 hours of it came.
+    assert days[0].complete and not days[1].complete
+
+
+def test_tail_follows_source():
+    series = make_candles(2000)
+    source = SeriesCollector(series, now=1001)
+    collector = ResampledCollector(Pair.EUR_USD, Gran.H4, source, Gran.H1)
+    collector.grab(100)
+    for now in (1002, 1003, 1010, 1100):
+        source.now = now
+        collector.update_recent()
+        expected = resample(source._cache, Gran.H4, Gran.H1)
+        assert collector._cache[-100:] == expected[-100:]
+    assert not collector._cache[-1].complete
+
+
+def test_history_is_pulled_from_source():
+    series = make_candles(2000)
+    source = SeriesCollector(series, now=2000)
+    collector = ResampledCollector(Pair.EUR_USD, Gran.H8, source, Gran.H1)
+    assert len(collector.grab(50)) == 50
+    assert collector.grab(200) == resample(source._cache, Gran.H8, Gran.H1)[-200:]
+    # Asking for more than there is stops at the start of history.
+    assert len(collector.grab(1000)) == 250
+    assert collector.end_of_history
+
+
+def test_bad_resample():
+    with pytest.raises(ValueError):
+        CandleSource.set_resample({Gran.H3: Gran.H2})
+    with pytest.raises(ValueError):
+        CandleSource.set_resample({Gran.W: Gran.D})
+
+
+def test_source_shares_collectors(fake_collectors, resampling):
+    h4 = CandleSource.get_collector(Pair.EUR_USD, Gran.H4)
+    assert isinstance(h4, ResampledCollector)
+    assert CandleSource.get_collector(Pair.EUR_USD, Gran.H4) is h4
+    assert h4.source is fake_collectors[(Pair.EUR_USD, Gran.H1)]
+    assert (
+        CandleSource.get_collector(Pair.EUR_USD, Gran.H3)
+        is fake_collectors[(Pair.EUR_USD, Gran.H3)]
+    )
+
+
+def test_charts_only_download_source_gran(fake_collectors, resampling):
+    for gran in (Gran.H1, Gran.H2, Gran.H4, Gran.D):
+        geo = GeoCandles(pair=Pair.EUR_USD, gran=gran, width=700, height=400)
+        assert geo.candle_count()
+    assert list(fake_collectors) == [(Pair.EUR_USD, Gran.H1)]
+    hours = geo.collector.source._cache
+    assert geo.xandles.candles[-1] == resample(hours[-24:], Gran.D, Gran.H1)[-1]
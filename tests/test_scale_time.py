@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from time_int import TimeInt
+
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.scale_time import ScaleTimeManager
+from oanda_chart.geo.xandles import Xandles
+from tests.conftest import make_candles
+
+
+def reference_grid(scale_time_cls, times, offset):
+    """Grid found by looking at scale time of every candle."""
+    grid_list = []
+    grid_adjust = offset.grid_adjust()
+    prev_scale_time = scale_time_cls(times[0])
+    grid_list.append((-grid_adjust, prev_scale_time))
+    gap_left = False
+    for ndx, time in enumerate(times[1:]):
+        scale_time = scale_time_cls(time)
+        if scale_time != prev_scale_time:
+            grid_list.append((((ndx + 1) * offset) - grid_adjust, scale_time))
+            prev_scale_time = scale_time
+            gap_left = False
+        else:
+            gap_left = True
+    if gap_left:
+        grid_list.append((((ndx + 1) * offset) - grid_adjust, scale_time))
+    return grid_list
+
+
+def random_times(step, count, seed):
+    """Sorted times step apart, with random gaps (like weekends) mixed in."""
+    rand = random.Random(seed)
+    time = TimeInt(1_262_304_000 + rand.randrange(0, 400 * 86400, step))
+    times = []
+    for _ in range(count):
+        times.append(time)
+        gap = step * (rand.choice([1, 1, 1, 1, 2, 3, 50]))
+        time = TimeInt(time + gap)
+    return times
+
+
+@pytest.mark.parametrize("scale_time_cls", ScaleTimeManager.SCALES)
+@pytest.mark.parametrize("step", [60, 300, 3600, 14400, 86400, 604800])
+def test_grid_matches_per_candle_scan(scale_time_cls, step):
+    times = random_times(step, 400, seed=step)
+    offset = CandleOffset(6)
+    for start, end in [(0, 400), (17, 18), (5, 60), (390, 400)]:
+        expected = reference_grid(scale_time_cls, times[start:end], offset)
+        found = scale_time_cls.get_grid(times, offset, start, end)
+        assert [(p, s.time) for p, s in found] == [(p, s.time) for p, s in expected]
+
+
+def test_xandles_grid_does_no_per_candle_truncation(monkeypatch):
+    candles = make_candles(2000)
+    xandles = Xandles(offset=CandleOffset(6), width=700, candles=candles, ndx=40)
+    calls = []
+    trunc = TimeInt.trunc
+
+    def counted_trunc(self, *args, **kwargs):
+        calls.append(self)
+        return trunc(self, *args, **kwargs)
+
+    monkeypatch.setattr(TimeInt, "trunc", counted_trunc)
+    xandles.update(ndx=50)
+    assert len(calls) <= 3 * len(xandles.grid_list)
+    assert len(calls) < len(xandles.display_list) / 4
@@ -0,0 +1,132 @@
+from tkinter import Tcl, TclError
+
+import pytest
+
+from oanda_chart.render.differ import CanvasDiffer
+from oanda_chart.render.prim import Prim
+from oanda_chart.render.tcl_batch import TclBatch, tcl_word
+
+
+class TclCanvas:
+    """Tcl command standing in for a canvas widget, records what it is sent."""
+
+    def __init__(self):
+        self.tk = Tcl()
+        self.calls = []
+        self.next_id = 0
+        self.tk.createcommand(".c", self.command)
+
+    def __str__(self):
+        return ".c"
+
+    def command(self, *args):
+        self.calls.append(args)
+        if args[0] == "create":
+            self.next_id += 1
+            return self.next_id
+        return ""
+
+
+@pytest.fixture
+def canvas():
+    return TclCanvas()
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "plain",
+        "#00FF00",
+        "two words",
+        "{brace",
+        "a[b]$c;d",
+        'q"uote',
+        "back\\",
+        "\n\t",
+        "",
+    ],
+)
+def test_tcl_word_round_trip(canvas, value):
+    assert canvas.tk.eval(f"set x {tcl_word(value)}") == value
+
+
+def test_tcl_word_tuple_is_list(canvas):
+    font = ("Courier New", 12, "bold")
+    result = canvas.tk.eval(f"set x {tcl_word(font)}")
+    assert canvas.tk.splitlist(result) == ("Courier New", "12", "bold")
+
+
+class CountingTk:
+    def __init__(self, tk):
+        self.tk = tk
+        self.evals = 0
+
+    def eval(self, script):
+        self.evals += 1
+        return self.tk.eval(script)
+
+
+def test_one_eval_per_frame(canvas):
+    canvas.tk = CountingTk(canvas.tk)
+    batch = TclBatch(canvas)
+    batch.create("line", (0, 1, 2, 3), (("fill", "red"), ("tags", "candle")))
+    batch.create("text", (5, 5), (("font", ("Times", 45, "bold")), ("text", "EUR USD")))
+    batch.coords(7, (1, 2))
+    batch.delete([8, 9])
+    assert batch.flush() == [1, 2]
+    assert canvas.tk.evals == 1
+    assert batch.flush() == []
+    assert canvas.tk.evals == 1
+
+
+def test_differ_in_batch_mode(canvas):
+    differ = CanvasDiffer(canvas, batch=True)
+    scene = [Prim.line(("a", n), n, 0, n, 10, fill="red") for n in range(3)]
+    scene.append(Prim.text(("b", 0), 1, 1, text="two words", font=("Times", 20)))
+    assert differ.apply(scene).created == 4
+    assert [differ.items[prim.key][0] for prim in scene] == [1, 2, 3, 4]
+    assert canvas.calls[3] == (
+        "create",
+        "text",
+        "1",
+        "1",
+        "-font",
+        "Times 20",
+        "-tags",
+        "b",
+        "-text",
+        "two words",
+    )
+    canvas.calls.clear()
+    stats = differ.apply([Prim.line(("a", 0), 0, 5, 0, 10, fill="blue")])
+    assert (stats.moved, stats.configured, stats.deleted) == (1, 1, 3)
+    assert canvas.calls == [
+        ("coords", "1", "0", "5", "0", "10"),
+        ("itemconfigure", "1", "-fill", "blue"),
+        ("delete", "2", "3", "4"),
+    ]
+
+
+def test_failed_frame_is_redrawn_from_scratch(canvas):
+    differ = CanvasDiffer(canvas, batch=True)
+    scene = [Prim.line(("a", n), n, 0, n, 10) for n in range(3)]
+    differ.apply(scene)
+    command = canvas.command
+
+    def failing(*args):
+        if args[0] == "itemconfigure":
+            raise ValueError("bad option")
+        return command(*args)
+
+    canvas.tk.createcommand(".c", failing)
+    scene.append(Prim.text(("b", 0), 1, 1, text="new"))
+    scene[0] = Prim.line(("a", 0), 0, 0, 0, 10, fill="blue")
+    with pytest.raises(TclError):
+        differ.apply(scene)
+    # What was drawn is deleted and forgotten.
+    assert not differ.items
+    assert canvas.calls[-1] == ("delete", "a", "b")
+    canvas.tk.createcommand(".c", command)
+    canvas.calls.clear()
+    assert differ.apply(scene).created == 4
+    assert [_[0] for _ in canvas.calls] == ["create"] * 4 + ["raise"]
@@ -0,0 +1,47 @@
+from oanda_chart.util.throttle import Throttle
+
+
+class FakeAfter:
+    """Holds after callbacks until run is called."""
+
+    def __init__(self):
+        self.pending = {}
+        self.count = 0
+
+    def after(self, ms, func, *args):
+        self.count += 1
+        after_id = f"after#{self.count}"
+        self.pending[after_id] = (func, args)
+        return after_id
+
+    def after_cancel(self, after_id):
+        del self.pending[after_id]
+
+    def run(self):
+        pending, self.pending = self.pending, {}
+        for func, args in pending.values():
+            func(*args)
+
+
+def test_burst_is_coalesced_into_latest_call():
+    timer = FakeAfter()
+    calls = []
+    throttle = Throttle(timer.after, timer.after_cancel, 16, lambda *a: calls.append(a))
+    for x in range(100):
+        throttle(x, x * 2)
+    assert len(timer.pending) == 1
+    timer.run()
+    assert calls == [(99, 198)]
+    throttle(5, 6)
+    timer.run()
+    assert calls == [(99, 198), (5, 6)]
+
+
+def test_cancel_drops_pending_call():
+    timer = FakeAfter()
+    calls = []
+    throttle = Throttle(timer.after, timer.after_cancel, 16, lambda *a: calls.append(a))
+    throttle(1, 2)
+    throttle.cancel()
+    timer.run()
+    assert not calls and throttle.after_id is None
@@ -0,0 +1,37 @@
+import pytest
+
+from oanda_chart.geo.candle_offset import CandleOffset
+from oanda_chart.geo.xandles import Xandles
+from oanda_chart.geo.yrids import Yrids
+from tests.conftest import make_candles
+
+
+@pytest.fixture
+def xandles():
+    return Xandles(
+        offset=CandleOffset(5), width=700, candles=make_candles(2000), ndx=30
+    )
+
+
+def test_display_is_slice_of_candles(xandles):
+    display_list = xandles.display_list
+    assert len(display_list) == xandles.display_count
+    assert [candle for _, candle in display_list] == xandles.candles[
+        xandles.start_ndx : xandles.end_ndx
+    ]
+    for n, (x, candle) in enumerate(display_list):
+        assert x == xandles.pixels_left + n * xandles.offset
+        assert xandles.candle_at_x(x + 1) is candle
+    assert xandles.get_candle(0) is display_list[-1][1]
+
+
+def test_grid_arrays(xandles):
+    assert xandles.grid_list == list(zip(xandles.grid_pixels, xandles.grid_scales))
+    assert xandles.grid_pixels.typecode == "i"
+
+
+def test_compact_layout(xandles):
+    yrids = Yrids(height=400, mid=11000)
+    for geo in (xandles, yrids):
+        assert not hasattr(geo, "__dict__")
+    assert yrids.grid_list == list(zip(yrids.grid_fps, yrids.grid_ys))